@@ -50,6 +50,7 @@ class DisasterMLService
             
             // Call enhanced ML API
             $response = Http::timeout($this->timeout)
+                ->withHeaders(['X-Request-Timeout-Ms' => $this->timeout * 1000])
                 ->post($this->apiUrl . '/verify_disaster', $requestData);
             
             if ($response->successful()) {
@@ -65,6 +66,10 @@ class DisasterMLService
                 return $this->formatVerificationResult($result);
             } else {
                 // Handle API errors
+                if ($response->status() === 503) {
+                    return $this->serviceBusyResult($response);
+                }
+                
                 $errorData = $response->json();
                 
                 if ($response->status() === 403 && isset($errorData['error']) && $errorData['error'] === 'IMAGE_NOT_FRESH_CAPTURE') {
@@ -98,6 +103,194 @@ class DisasterMLService
         }
     }
 
+    /**
+     * Verify disaster image sending the raw file instead of base64 JSON
+     * (smaller request, no base64 encoding/decoding on either side)
+     * 
+     * @param UploadedFile $image - Captured image
+     * @param array $captureMetadata - Metadata from mobile capture
+     * @param array $userLocation - User's GPS location
+     * @return array
+     */
+    public function verifyDisasterImageBinary(UploadedFile $image, $captureMetadata = [], $userLocation = []): array
+    {
+        try {
+            $metadata = array_merge($captureMetadata, [
+                'submission_time' => Carbon::now()->toISOString(),
+                'client_type' => 'mobile_app'
+            ]);
+            
+            // Metadata and location travel as JSON headers, the body is the file itself
+            $response = Http::timeout($this->timeout)
+                ->withHeaders([
+                    'X-Capture-Metadata' => json_encode((object) $metadata),
+                    'X-User-Location' => json_encode((object) $userLocation),
+                    'X-Request-Timeout-Ms' => $this->timeout * 1000
+                ])
+                ->withBody(file_get_contents($image->getRealPath()), 'application/octet-stream')
+                ->post($this->apiUrl . '/verify_disaster_binary');
+            
+            if ($response->successful()) {
+                $result = $response->json();
+                
+                Log::info('Disaster image verification completed', [
+                    'is_authentic' => $result['disaster_analysis']['is_authentic'] ?? false,
+                    'capture_validated' => $result['capture_validation']['is_fresh_capture'] ?? false,
+                    'authenticity_score' => $result['disaster_analysis']['authenticity_score'] ?? 0
+                ]);
+                
+                return $this->formatVerificationResult($result);
+            }
+            
+            if ($response->status() === 503) {
+                return $this->serviceBusyResult($response);
+            }
+            
+            $errorData = $response->json();
+            
+            if ($response->status() === 403 && isset($errorData['error']) && $errorData['error'] === 'IMAGE_NOT_FRESH_CAPTURE') {
+                return [
+                    'success' => false,
+                    'error_type' => 'NOT_FRESH_CAPTURE',
+                    'message' => 'Please take a fresh photo of the current disaster situation. Uploaded images from gallery are not allowed.',
+                    'requirements' => [
+                        'capture_method' => 'real_time_camera_only',
+                        'max_age' => '5_minutes',
+                        'gallery_uploads' => 'prohibited'
+                    ]
+                ];
+            }
+            
+            throw new Exception('ML API error: ' . $response->body());
+            
+        } catch (Exception $e) {
+            Log::error('Disaster ML verification failed', [
+                'error' => $e->getMessage(),
+                'trace' => $e->getTraceAsString()
+            ]);
+            
+            return [
+                'success' => false,
+                'error_type' => 'VERIFICATION_FAILED',
+                'message' => 'Unable to verify image authenticity. Please try again.',
+                'technical_error' => $e->getMessage()
+            ];
+        }
+    }
+
+    /**
+     * Verify an image already saved to the public disk by its storage path
+     * The ML API reads the file from the shared storage root, so nothing is re-uploaded
+     * 
+     * @param string $storagePath - Path returned by UploadedFile::store(), relative to the public disk
+     * @param array $captureMetadata - Metadata from mobile capture
+     * @param array $userLocation - User's GPS location
+     * @return array
+     */
+    public function verifyStoredImage(string $storagePath, $captureMetadata = [], $userLocation = []): array
+    {
+        try {
+            $response = Http::timeout($this->timeout)
+                ->withHeaders(['X-Request-Timeout-Ms' => $this->timeout * 1000])
+                ->post($this->apiUrl . '/verify_disaster_path', [
+                    'path' => $storagePath,
+                    'metadata' => array_merge($captureMetadata, [
+                        'submission_time' => Carbon::now()->toISOString(),
+                        'client_type' => 'mobile_app'
+                    ]),
+                    'location' => $userLocation
+                ]);
+            
+            if ($response->successful()) {
+                return $this->formatVerificationResult($response->json());
+            }
+            
+            if ($response->status() === 503) {
+                return $this->serviceBusyResult($response);
+            }
+            
+            $errorData = $response->json();
+            
+            if ($response->status() === 403 && isset($errorData['error']) && $errorData['error'] === 'IMAGE_NOT_FRESH_CAPTURE') {
+                return [
+                    'success' => false,
+                    'error_type' => 'NOT_FRESH_CAPTURE',
+                    'message' => 'Please take a fresh photo of the current disaster situation. Uploaded images from gallery are not allowed.',
+                    'requirements' => [
+                        'capture_method' => 'real_time_camera_only',
+                        'max_age' => '5_minutes',
+                        'gallery_uploads' => 'prohibited'
+                    ]
+                ];
+            }
+            
+            throw new Exception('ML API error: ' . $response->body());
+            
+        } catch (Exception $e) {
+            Log::error('Disaster ML verification failed', [
+                'storage_path' => $storagePath,
+                'error' => $e->getMessage()
+            ]);
+            
+            return [
+                'success' => false,
+                'error_type' => 'VERIFICATION_FAILED',
+                'message' => 'Unable to verify image authenticity. Please try again.',
+                'technical_error' => $e->getMessage()
+            ];
+        }
+    }
+
+    /**
+     * Verify several stored images of one incident in a single call
+     * 
+     * @param array $storagePaths - Paths relative to the public disk
+     * @return array
+     */
+    public function verifyStoredImages(array $storagePaths, $captureMetadata = [], $userLocation = []): array
+    {
+        try {
+            $response = Http::timeout($this->timeout)
+                ->withHeaders(['X-Request-Timeout-Ms' => $this->timeout * 1000])
+                ->post($this->apiUrl . '/verify_disaster_batch', [
+                    'images' => array_map(fn ($path) => ['path' => $path], array_values($storagePaths)),
+                    'metadata' => array_merge($captureMetadata, [
+                        'submission_time' => Carbon::now()->toISOString(),
+                        'client_type' => 'mobile_app'
+                    ]),
+                    'location' => $userLocation
+                ]);
+            
+            if ($response->status() === 503) {
+                return $this->serviceBusyResult($response);
+            }
+            
+            if (!$response->successful()) {
+                throw new Exception('ML API error: ' . $response->body());
+            }
+            
+            return [
+                'success' => true,
+                'results' => array_map(function ($result) {
+                    return ($result['success'] ?? false) ? $this->formatVerificationResult($result) : $result;
+                }, $response->json('results') ?? [])
+            ];
+            
+        } catch (Exception $e) {
+            Log::error('Disaster ML batch verification failed', [
+                'image_count' => count($storagePaths),
+                'error' => $e->getMessage()
+            ]);
+            
+            return [
+                'success' => false,
+                'error_type' => 'VERIFICATION_FAILED',
+                'message' => 'Unable to verify image authenticity. Please try again.',
+                'technical_error' => $e->getMessage()
+            ];
+        }
+    }
+
     /**
      * Legacy method for uploaded file verification (still available for testing)
      */
@@ -184,6 +377,19 @@ class DisasterMLService
         ];
     }
 
+    /**
+     * ML API is shedding load; tell the caller when to retry instead of failing the report
+     */
+    private function serviceBusyResult($response): array
+    {
+        return [
+            'success' => false,
+            'error_type' => 'SERVICE_BUSY',
+            'message' => 'Verification service is busy. Your report will be retried shortly.',
+            'retry_after' => (int) ($response->header('Retry-After') ?: 5)
+        ];
+    }
+
     /**
      * Format legacy result for backward compatibility
      */
@@ -325,12 +531,150 @@ class DisasterMLService
     }
 
     /**
-     * Check if ML API is available
+     * Queue a report's images for asynchronous verification
+     * 
+     * @param array $base64Images - Base64 encoded images
+     * @param string|null $callbackUrl - Receives the finished job (host must be in serving.jobs.callback_allowed_hosts)
+     * @param array $captureMetadata - Metadata from mobile capture
+     * @param array $userLocation - User's GPS location
+     * @return array
+     */
+    public function submitVerificationJob(array $base64Images, ?string $callbackUrl = null, $captureMetadata = [], $userLocation = []): array
+    {
+        try {
+            $requestData = [
+                'kind' => 'verify',
+                'images' => array_values($base64Images),
+                'metadata' => array_merge($captureMetadata, [
+                    'submission_time' => Carbon::now()->toISOString(),
+                    'client_type' => 'mobile_app'
+                ]),
+                'location' => $userLocation
+            ];
+            if ($callbackUrl !== null) {
+                $requestData['callback_url'] = $callbackUrl;
+            }
+            
+            $response = Http::timeout($this->timeout)->post($this->apiUrl . '/jobs', $requestData);
+            
+            if ($response->status() === 202) {
+                return [
+                    'success' => true,
+                    'job_id' => $response->json('job_id'),
+                    'status' => $response->json('status')
+                ];
+            }
+            
+            if ($response->status() === 503) {
+                return $this->serviceBusyResult($response);
+            }
+            
+            throw new Exception('ML API error: ' . $response->body());
+            
+        } catch (Exception $e) {
+            Log::error('Disaster ML job submission failed', [
+                'error' => $e->getMessage()
+            ]);
+            
+            return [
+                'success' => false,
+                'error_type' => 'VERIFICATION_FAILED',
+                'message' => 'Unable to queue images for verification. Please try again.',
+                'technical_error' => $e->getMessage()
+            ];
+        }
+    }
+
+    /**
+     * Status of a verification job; with $waitSeconds the API holds the request until the job finishes
+     */
+    public function getVerificationJob(string $jobId, int $waitSeconds = 0): array
+    {
+        try {
+            $response = Http::timeout($this->timeout + $waitSeconds)
+                ->get($this->apiUrl . '/jobs/' . urlencode($jobId), ['wait' => $waitSeconds]);
+            
+            if ($response->status() === 404) {
+                return [
+                    'success' => false,
+                    'error_type' => 'JOB_NOT_FOUND',
+                    'message' => 'Verification job is unknown or its result has expired.'
+                ];
+            }
+            
+            if (!$response->successful()) {
+                throw new Exception('ML API error: ' . $response->body());
+            }
+            
+            return $this->formatJobResult($response->json());
+            
+        } catch (Exception $e) {
+            Log::error('Disaster ML job lookup failed', [
+                'job_id' => $jobId,
+                'error' => $e->getMessage()
+            ]);
+            
+            return [
+                'success' => false,
+                'error_type' => 'VERIFICATION_FAILED',
+                'message' => 'Unable to fetch verification result. Please try again.',
+                'technical_error' => $e->getMessage()
+            ];
+        }
+    }
+
+    /**
+     * Check a job callback's X-DisasterLink-Signature and format its body
+     * Returns null when the signature does not match the shared secret
+     */
+    public function verifyJobCallback(string $payload, ?string $signature): ?array
+    {
+        $secret = config('disaster.ml_callback_secret');
+        if ($secret) {
+            $expected = 'sha256=' . hash_hmac('sha256', $payload, $secret);
+            if ($signature === null || !hash_equals($expected, $signature)) {
+                Log::warning('Rejected ML job callback with invalid signature');
+                return null;
+            }
+        }
+        
+        return $this->formatJobResult(json_decode($payload, true) ?? []);
+    }
+
+    /**
+     * Format a job; finished verify jobs get one formatted verification per image
+     */
+    private function formatJobResult(array $job): array
+    {
+        $formatted = [
+            'success' => true,
+            'job_id' => $job['job_id'] ?? null,
+            'status' => $job['status'] ?? 'unknown',
+            'finished' => in_array($job['status'] ?? null, ['succeeded', 'failed'], true)
+        ];
+        
+        if (($job['status'] ?? null) === 'failed') {
+            $formatted['error'] = $job['error'] ?? 'Verification job failed';
+        }
+        
+        if (($job['status'] ?? null) === 'succeeded' && ($job['kind'] ?? 'verify') === 'verify') {
+            $formatted['results'] = array_map(function ($result) {
+                return ($result['success'] ?? false) ? $this->formatVerificationResult($result) : $result;
+            }, $job['result']['results'] ?? []);
+        } elseif (($job['status'] ?? null) === 'succeeded') {
+            $formatted['results'] = $job['result']['results'] ?? [];
+        }
+        
+        return $formatted;
+    }
+
+    /**
+     * Check if ML API is available (model loaded and warmed up)
      */
     public function isApiAvailable(): bool
     {
         try {
-            $response = Http::timeout(5)->get($this->apiUrl . '/health');
+            $response = Http::timeout(5)->get($this->apiUrl . '/health/ready');
             return $response->successful();
         } catch (Exception $e) {
             return false;
@@ -367,6 +711,7 @@ class DisasterMLService
 
     /**
      * Convert uploaded file to base64 for API
+     * (only needed for /verify_disaster; verifyDisasterImageBinary sends the file as-is)
      */
     public function imageToBase64(UploadedFile $image): string
     {
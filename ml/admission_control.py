@@ -0,0 +1,103 @@
+"""
+DisasterLink ML API - Admission Control and Request Deadlines
+Bounds the number of prediction requests inside the server (the rest are shed
+with 503 + Retry-After) and gives every request a deadline, so work for
+clients that have already timed out is dropped before decode and inference.
+"""
+
+import math
+import threading
+import time
+from contextvars import ContextVar
+
+import serving_metrics
+
+# Remaining time budget the client is willing to wait, in milliseconds
+TIMEOUT_HEADER = 'X-Request-Timeout-Ms'
+
+# Deadline (time.monotonic()) of the request being handled in this thread / task
+_request_deadline = ContextVar('request_deadline', default=None)
+
+def start_deadline(headers, default_timeout_ms, arrived_at=None):
+    """
+    Set the current request's deadline from the timeout header, or the default
+    budget when absent or malformed (including nan and inf). A header of 0 or
+    less means the client's budget is already spent, so the request expires at
+    once; only a default of 0 disables the deadline. Returns a token for
+    end_deadline().
+    """
+    arrived_at = time.monotonic() if arrived_at is None else arrived_at
+    deadline = arrived_at + default_timeout_ms / 1000 if default_timeout_ms else None
+    value = headers.get(TIMEOUT_HEADER)
+    if value:
+        try:
+            timeout_ms = float(value)
+        except ValueError:
+            timeout_ms = math.nan
+        if math.isfinite(timeout_ms):
+            deadline = arrived_at + max(0.0, timeout_ms) / 1000
+    return _request_deadline.set(deadline)
+
+def end_deadline(token):
+    _request_deadline.reset(token)
+
+def current_deadline():
+    return _request_deadline.get()
+
+def deadline_passed(deadline=None, stage=None):
+    """True once the deadline (default: the current request's) has passed; counted under stage"""
+    deadline = current_deadline() if deadline is None else deadline
+    if deadline is None or time.monotonic() < deadline:
+        return False
+    if stage:
+        serving_metrics.REQUESTS_EXPIRED.inc(stage=stage)
+    return True
+
+def deadline_exceeded_result(stage):
+    """Prediction result for work dropped because its client gave up"""
+    return {
+        'prediction': None,
+        'confidence': None,
+        'error': f'Request deadline exceeded before {stage}',
+        'status': 'error',
+        'deadline_exceeded': True
+    }
+
+class AdmissionController:
+    """
+    Counts admitted prediction requests. Once max_pending are inside the
+    server, new ones are refused immediately instead of queueing behind work
+    that would finish after the client's timeout anyway.
+    """
+
+    def __init__(self, max_pending=64, retry_after_seconds=5):
+        self.max_pending = max(1, int(max_pending))
+        self.retry_after_seconds = retry_after_seconds
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def try_admit(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                return False
+            self._pending += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._pending -= 1
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def retry_after(self):
+        """Retry-After header value in whole seconds"""
+        return str(max(1, math.ceil(self.retry_after_seconds)))
+
+    def get_stats(self):
+        return {
+            'pending': self._pending,
+            'max_pending': self.max_pending,
+            'retry_after_seconds': self.retry_after_seconds
+        }
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+DisasterLink ML - Inference Backend Benchmark
+Checks each optimized backend (TorchScript, INT8, ONNX Runtime) against the
+eager model on a sample of test images (probability difference and prediction
+agreement, each backend using its own preprocessing), then compares
+forward-pass latency at the serving batch sizes and the cold-start time and
+memory of a fresh process loading each backend.
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from benchmark_preprocessing import load_test_samples
+
+# Run in a fresh interpreter: import + load time and peak RSS of one backend
+STARTUP_PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+backend, model, onnx_model, int8_model = sys.argv[1:5]
+if backend == 'onnx':
+    from onnx_classifier import OnnxImageClassifier
+    OnnxImageClassifier(onnx_model, cache_config={'enabled': False})
+else:
+    from disaster_classifier import DisasterImageClassifier
+    DisasterImageClassifier(model, cache_config={'enabled': False}, backend=backend, quantized_model_path=int8_model)
+startup_s = time.perf_counter() - start
+try:
+    # Peak RSS of this process image (ru_maxrss would include the parent's peak before exec)
+    with open('/proc/self/status') as f:
+        max_rss_mb = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:')) / 1024
+except OSError:
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({
+    'startup_s': startup_s,
+    'max_rss_mb': max_rss_mb,
+    'torch_imported': 'torch' in sys.modules
+}))
+"""
+
+def create_backend(name, args):
+    cache_config = {'enabled': False}
+    if name == 'onnx':
+        from onnx_classifier import OnnxImageClassifier
+        return OnnxImageClassifier(args.onnx_model, cache_config=cache_config)
+
+    from disaster_classifier import DisasterImageClassifier
+    classifier = DisasterImageClassifier(args.model, cache_config=cache_config, backend=name,
+                                         backend_cache_dir=args.cache_dir, quantized_model_path=args.int8_model)
+    if classifier.backend != name:
+        sys.exit(f"❌ {name} backend unavailable (compilation failed or outputs differed), see log")
+    return classifier
+
+def probabilities(classifier, tensors, batch_size=32):
+    """P(real) for every preprocessed image"""
+    result = []
+    for i in range(0, len(tensors), batch_size):
+        result.extend(r['probabilities']['real'] for r in classifier.predict_preprocessed(tensors[i:i + batch_size]))
+    return np.array(result)
+
+def time_forward(classifier, tensors, batch_size, iterations):
+    """Median forward-pass latency for one batch size, in milliseconds"""
+    batch = (tensors * ((batch_size // len(tensors)) + 1))[:batch_size]
+    classifier.predict_preprocessed(batch)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        classifier.predict_preprocessed(batch)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+def measure_startup(name, args):
+    """Cold start of one backend in a new process"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(Path(__file__).parent),
+                                                                     os.environ.get('PYTHONPATH')])))
+    output = subprocess.run(
+        [sys.executable, '-c', STARTUP_PROBE, name, args.model, args.onnx_model, args.int8_model],
+        capture_output=True, text=True, check=True, env=env
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare optimized inference backends against eager')
+    parser.add_argument('--backends', nargs='+', default=['torchscript'], choices=['torchscript', 'int8', 'onnx'])
+    parser.add_argument('--model', default='disaster_authenticity_model.pth')
+    parser.add_argument('--onnx-model', default='disaster_authenticity_model.onnx')
+    parser.add_argument('--int8-model', default='disaster_authenticity_model_int8.pt')
+    parser.add_argument('--dataset-dir', default='disaster_authenticity_dataset')
+    parser.add_argument('--samples', type=int, default=200, help='Test images for the equivalence check')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 16])
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--tolerance', type=float, default=1e-3,
+                        help='Maximum allowed probability difference (INT8 is only checked for agreement)')
+    parser.add_argument('--cache-dir', default='compiled_models')
+    parser.add_argument('--output', default='backend_benchmark.json')
+    args = parser.parse_args()
+
+    print("📊 DisasterLink inference backend benchmark")
+    samples = load_test_samples(args.dataset_dir, args.samples)
+    images = [image_bytes for image_bytes, _ in samples]
+    print(f"🖼️  Loaded {len(images)} test images")
+
+    def preprocess_all(classifier):
+        return [classifier.preprocess_image(Image.open(io.BytesIO(image_bytes))) for image_bytes in images]
+
+    eager = create_backend('eager', args)
+    eager_tensors = preprocess_all(eager)
+    eager_probs = probabilities(eager, eager_tensors)
+    eager_latency = {bs: time_forward(eager, eager_tensors, bs, args.iterations) for bs in args.batch_sizes}
+
+    report = {'samples': len(images), 'eager': {'latency_ms': eager_latency, 'startup': measure_startup('eager', args)}}
+    all_passed = True
+    for name in args.backends:
+        candidate = create_backend(name, args)
+        tensors = preprocess_all(candidate)
+        candidate_probs = probabilities(candidate, tensors)
+
+        max_diff = float(np.abs(eager_probs - candidate_probs).max())
+        agreement = float(((eager_probs >= 0.5) == (candidate_probs >= 0.5)).mean())
+        passed = agreement == 1.0 if name == 'int8' else max_diff <= args.tolerance
+        all_passed = all_passed and passed
+        print(f"\n{'✅' if passed else '❌'} {name} vs eager: max probability difference {max_diff:.2e}, "
+              f"prediction agreement {agreement * 100:.2f}%")
+
+        latency = {bs: time_forward(candidate, tensors, bs, args.iterations) for bs in args.batch_sizes}
+        startup = measure_startup(name, args)
+        print(f"{'Batch':<8}{'Eager':>12}{name:>14}{'Speedup':>10}")
+        for bs in args.batch_sizes:
+            print(f"{bs:<8}{eager_latency[bs]:>10.1f}ms{latency[bs]:>12.1f}ms{eager_latency[bs] / latency[bs]:>9.2f}x")
+        print(f"Cold start: {startup['startup_s']:.2f}s / {startup['max_rss_mb']:.0f}MB RSS "
+              f"(eager {report['eager']['startup']['startup_s']:.2f}s / "
+              f"{report['eager']['startup']['max_rss_mb']:.0f}MB), torch imported: {startup['torch_imported']}")
+
+        report[name] = {
+            'max_probability_difference': max_diff,
+            'prediction_agreement': agreement,
+            'equivalent': passed,
+            'latency_ms': latency,
+            'speedup': {bs: eager_latency[bs] / latency[bs] for bs in args.batch_sizes},
+            'startup': startup
+        }
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Report saved to {args.output}")
+    if not all_passed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
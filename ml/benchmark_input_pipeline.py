@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+DisasterLink ML - Input Pipeline Benchmark
+Compares the previous torchvision transform (Resize, ToTensor, Normalize,
+unsqueeze, torch.cat, NCHW model under no_grad) against fused uint8
+preprocessing into pooled channels-last buffers under inference_mode:
+allocations per request, preprocessing latency and end-to-end latency
+per batch size. Uses synthetic photos, so no dataset is needed.
+"""
+
+import argparse
+import copy
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import torch
+import torchvision.transforms as transforms
+from PIL import Image
+from torch.profiler import profile, ProfilerActivity
+
+from disaster_classifier import DisasterImageClassifier
+from preprocessing import IMAGENET_MEAN, IMAGENET_STD
+
+legacy_transform = transforms.Compose([
+    transforms.Resize((224, 224)),
+    transforms.ToTensor(),
+    transforms.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD)
+])
+
+def synthetic_photos(count, size, seed=42):
+    """Smooth random images with sensor-like noise (decoded, ready for preprocessing)"""
+    rng = np.random.default_rng(seed)
+    width, height = size
+    photos = []
+    for _ in range(count):
+        base = Image.fromarray(rng.integers(0, 255, (height // 16, width // 16, 3), dtype=np.uint8))
+        pixels = np.asarray(base.resize((width, height), Image.BICUBIC)).astype(np.int16)
+        pixels += rng.integers(-12, 12, pixels.shape, dtype=np.int16)
+        photos.append(Image.fromarray(pixels.clip(0, 255).astype(np.uint8)))
+    return photos
+
+def legacy_predict(model, images):
+    tensors = [legacy_transform(image).unsqueeze(0) for image in images]
+    with torch.no_grad():
+        return torch.softmax(model(torch.cat(tensors, dim=0)), dim=1).numpy()
+
+def fused_predict(classifier, images):
+    return classifier.predict_preprocessed([classifier.preprocess_image(image) for image in images])
+
+def fill_pooled_buffer(classifier, images):
+    """Normalize images into a pooled buffer the way predict_preprocessed does"""
+    buffer = classifier.input_pool.acquire(len(images))
+    with torch.inference_mode():
+        for index, image in enumerate(images):
+            classifier.input_pool.fill(buffer, index, image)
+    return buffer
+
+def count_allocations(fn):
+    """Tensor allocations (count, bytes) seen by the profiler plus peak NumPy/Python bytes (tracemalloc)"""
+    fn()
+    tracemalloc.start()
+    with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+        fn()
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    sizes = [event.self_cpu_memory_usage for event in prof.events() if event.self_cpu_memory_usage > 0]
+    return len(sizes), sum(sizes), python_peak
+
+def median_ms(fn, iterations):
+    fn()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fused pooled preprocessing against the torchvision transform')
+    parser.add_argument('--model', default='disaster_authenticity_model.pth')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 16])
+    parser.add_argument('--image-size', default='640x480', help='Decoded image size before preprocessing (WxH)')
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--output', default='input_pipeline_benchmark.json')
+    args = parser.parse_args()
+
+    print("📊 DisasterLink input pipeline benchmark")
+    classifier = DisasterImageClassifier(args.model, cache_config={'enabled': False}, reduced_decode=False)
+    # The previous serving path: contiguous (NCHW) weights
+    legacy_model = copy.deepcopy(classifier.model).to(memory_format=torch.contiguous_format)
+    size = tuple(int(value) for value in args.image_size.lower().split('x'))
+    photos = synthetic_photos(max(args.batch_sizes), size)
+    print(f"🖼️  {len(photos)} synthetic {size[0]}x{size[1]} photos, {torch.get_num_threads()} torch threads")
+
+    image = photos[0]
+    preprocess = {
+        'legacy_ms': median_ms(lambda: legacy_transform(image).unsqueeze(0), args.iterations * 10),
+        'fused_ms': median_ms(lambda: classifier.preprocess_image(image), args.iterations * 10)
+    }
+
+    report = {'image_size': list(size), 'threads': torch.get_num_threads(), 'preprocess_per_image': preprocess, 'batches': {}}
+    print(f"\n{'Path':<8}{'Batch':>6}{'Tensor allocs/req':>19}{'Tensor MB/req':>15}{'NumPy MB/req':>14}{'Prep+forward':>14}")
+    for batch_size in args.batch_sizes:
+        batch = photos[:batch_size]
+        runs = {
+            'legacy': lambda: legacy_predict(legacy_model, batch),
+            'fused': lambda: fused_predict(classifier, batch)
+        }
+        # The forward pass allocates the same activations on both paths; count the input side alone
+        input_only = {
+            'legacy': lambda: torch.cat([legacy_transform(photo).unsqueeze(0) for photo in batch], dim=0),
+            'fused': lambda: classifier.input_pool.release(
+                fill_pooled_buffer(classifier, [classifier.preprocess_image(photo) for photo in batch]))
+        }
+        results = {}
+        for path in ('legacy', 'fused'):
+            allocations, tensor_bytes, python_peak = count_allocations(input_only[path])
+            results[path] = {
+                'tensor_allocations_per_request': allocations / batch_size,
+                'tensor_bytes_per_request': tensor_bytes / batch_size,
+                'numpy_peak_bytes_per_request': python_peak / batch_size,
+                'end_to_end_ms': median_ms(runs[path], args.iterations)
+            }
+            r = results[path]
+            print(f"{path:<8}{batch_size:>6}{r['tensor_allocations_per_request']:>19.2f}"
+                  f"{r['tensor_bytes_per_request'] / 2**20:>15.3f}{r['numpy_peak_bytes_per_request'] / 2**20:>14.3f}"
+                  f"{r['end_to_end_ms']:>12.1f}ms")
+        results['speedup'] = results['legacy']['end_to_end_ms'] / results['fused']['end_to_end_ms']
+        report['batches'][str(batch_size)] = results
+
+    print(f"\n⚡ Preprocessing per image: {preprocess['legacy_ms']:.2f} ms → {preprocess['fused_ms']:.2f} ms "
+          f"(resize only; normalization runs in the batch fill)")
+    for batch_size, results in report['batches'].items():
+        print(f"⚡ Batch {batch_size}: {results['speedup']:.2f}x end to end")
+    report['buffer_pool'] = classifier.input_pool.get_stats()
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Report saved to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+DisasterLink ML - Multi-process Serving Benchmark
+Starts the pre-fork server with 1..N workers (weights loaded once, shared),
+drives /predict_base64 with concurrent clients and reports throughput,
+latency and per-worker memory for each worker count.
+"""
+
+import argparse
+import base64
+import io
+import json
+import threading
+import time
+
+import numpy as np
+import requests
+from PIL import Image
+
+from serve_multiprocess import PreforkServer, available_cores, print_memory_report
+
+def make_payloads(count, size=(640, 480), seed=42):
+    """Distinct random JPEGs so no request is answered from a cache"""
+    rng = np.random.default_rng(seed)
+    payloads = []
+    for _ in range(count):
+        pixels = rng.integers(0, 256, size=(size[1], size[0], 3), dtype=np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, format='JPEG', quality=85)
+        payloads.append(json.dumps({'image': base64.b64encode(buffer.getvalue()).decode()}))
+    return payloads
+
+def drive_load(url, payloads, concurrency, duration):
+    """Closed-loop load: each client sends its next request as soon as the previous one returns"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(offset):
+        session = requests.Session()
+        local_latencies = []
+        local_errors = 0
+        i = offset
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = session.post(url, data=payloads[i % len(payloads)],
+                                        headers={'Content-Type': 'application/json'}, timeout=60)
+                if response.status_code != 200:
+                    local_errors += 1
+            except requests.RequestException:
+                local_errors += 1
+            local_latencies.append(time.perf_counter() - start)
+            i += concurrency
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    start = time.perf_counter()
+    clients = [threading.Thread(target=client, args=(offset,)) for offset in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latency_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'throughput': len(latencies) / elapsed,
+        'latency_ms_p50': float(np.percentile(latency_ms, 50)),
+        'latency_ms_p95': float(np.percentile(latency_ms, 95)),
+        'latency_ms_p99': float(np.percentile(latency_ms, 99))
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pre-fork serving from 1 to N workers')
+    parser.add_argument('--max-workers', type=int, default=available_cores())
+    parser.add_argument('--threads-per-worker', type=int, default=None,
+                        help='torch intra-op threads per worker (default: cores / workers)')
+    parser.add_argument('--clients-per-worker', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds of load per worker count')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--output', default='multiprocess_benchmark.json')
+    args = parser.parse_args()
+
+    print("📊 DisasterLink multi-process serving benchmark")
+    server = PreforkServer('127.0.0.1', args.port, threads_per_worker=args.threads_per_worker)
+    server.load_model(cache_config={'enabled': False})
+    server.bind()
+    url = f'http://127.0.0.1:{server.port}/predict_base64'
+    payloads = make_payloads(64)
+
+    results = []
+    try:
+        for workers in range(1, args.max_workers + 1):
+            server.start(workers)
+            concurrency = workers * args.clients_per_worker
+            print(f"\n🚀 {workers} worker(s), {concurrency} concurrent clients")
+            load = drive_load(url, payloads, concurrency, args.duration)
+            memory = server.memory_report()
+            print_memory_report(memory, server.shared_bytes)
+            server.stop()
+
+            worker_memory = list(memory['workers'].values())
+            results.append(dict(
+                load,
+                workers=workers,
+                concurrency=concurrency,
+                worker_rss_mb=[m.get('rss', 0) / 1024 / 1024 for m in worker_memory],
+                worker_private_mb=[m.get('uss', 0) / 1024 / 1024 for m in worker_memory],
+                total_pss_mb=(sum(m.get('pss', 0) for m in worker_memory)
+                              + (memory['parent'] or {}).get('pss', 0)) / 1024 / 1024
+            ))
+    finally:
+        server.close()
+
+    baseline = results[0]['throughput'] if results and results[0]['throughput'] else 0.0
+    print(f"\n{'Workers':<9}{'Req/s':>9}{'Scaling':>9}{'p50':>10}{'p99':>10}{'Errors':>8}{'Total PSS':>12}")
+    for result in results:
+        scaling = result['throughput'] / baseline if baseline else 0.0
+        result['scaling'] = scaling
+        print(f"{result['workers']:<9}{result['throughput']:>9.1f}{scaling:>8.2f}x"
+              f"{result['latency_ms_p50']:>8.0f}ms{result['latency_ms_p99']:>8.0f}ms"
+              f"{result['errors']:>8}{result['total_pss_mb']:>10.0f}MB")
+
+    report = {
+        'shared_weights_mb': server.shared_bytes / 1024 / 1024,
+        'cores': available_cores(),
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Report saved to {args.output}")
+
+if __name__ == '__main__':
+    main()
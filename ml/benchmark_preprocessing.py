@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+DisasterLink ML - Preprocessing Benchmark
+Compares full-resolution decoding against reduced-resolution (JPEG DCT scaling)
+decoding on the test split: preprocessing latency and model accuracy.
+"""
+
+import argparse
+import io
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from disaster_classifier import DisasterImageClassifier
+
+def load_test_samples(dataset_dir, num_samples, seed=42):
+    """Read a reproducible sample of the test split into memory"""
+    test_df = pd.read_csv(Path(dataset_dir) / 'test_dataset.csv')
+    if num_samples and num_samples < len(test_df):
+        test_df = test_df.sample(n=num_samples, random_state=seed)
+
+    samples = []
+    for _, row in test_df.iterrows():
+        try:
+            with open(row['image_path'], 'rb') as f:
+                samples.append((f.read(), 1 if row['authenticity'] == 'real' else 0))
+        except OSError as e:
+            print(f"⚠️  Skipping {row['image_path']}: {e}")
+    return samples
+
+def run_mode(classifier, samples, reduced_decode, batch_size=32):
+    """Preprocess every sample in one decoding mode, then score it"""
+    classifier.reduced_decode = reduced_decode
+    decode_times = []
+    tensors = []
+
+    for image_bytes, _ in samples:
+        start = time.perf_counter()
+        image = Image.open(io.BytesIO(image_bytes))
+        tensors.append(classifier.preprocess_image(image))
+        decode_times.append(time.perf_counter() - start)
+
+    probabilities = []
+    forward_times = []
+    for i in range(0, len(tensors), batch_size):
+        results = classifier.predict_preprocessed(tensors[i:i + batch_size])
+        forward_times.append(results[0]['prediction_time'] / len(results))
+        probabilities.extend(result['probabilities']['real'] for result in results)
+
+    labels = np.array([label for _, label in samples])
+    probabilities = np.array(probabilities)
+    predictions = (probabilities >= 0.5).astype(int)
+    decode_ms = np.array(decode_times) * 1000
+
+    return {
+        'reduced_decode': reduced_decode,
+        'samples': len(samples),
+        'accuracy': float((predictions == labels).mean()),
+        'decode_ms_mean': float(decode_ms.mean()),
+        'decode_ms_p50': float(np.percentile(decode_ms, 50)),
+        'decode_ms_p95': float(np.percentile(decode_ms, 95)),
+        'forward_ms_per_image': float(np.mean(forward_times) * 1000),
+        '_probabilities': probabilities,
+        '_predictions': predictions
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark full vs reduced-resolution decoding')
+    parser.add_argument('--model', default='disaster_authenticity_model.pth')
+    parser.add_argument('--dataset-dir', default='disaster_authenticity_dataset')
+    parser.add_argument('--samples', type=int, default=500, help='Test images to use (0 = all)')
+    parser.add_argument('--output', default='preprocessing_benchmark.json')
+    args = parser.parse_args()
+
+    print("📊 DisasterLink preprocessing benchmark")
+    classifier = DisasterImageClassifier(args.model, cache_config={'enabled': False})
+    samples = load_test_samples(args.dataset_dir, args.samples)
+    print(f"🖼️  Loaded {len(samples)} test images")
+
+    full = run_mode(classifier, samples, reduced_decode=False)
+    reduced = run_mode(classifier, samples, reduced_decode=True)
+
+    agreement = float((full.pop('_predictions') == reduced.pop('_predictions')).mean())
+    max_prob_diff = float(np.abs(full.pop('_probabilities') - reduced.pop('_probabilities')).max())
+
+    print(f"\n{'Mode':<10}{'Accuracy':>10}{'Decode mean':>14}{'Decode p95':>13}{'Forward/img':>14}")
+    for name, result in [('full', full), ('reduced', reduced)]:
+        print(f"{name:<10}{result['accuracy'] * 100:>9.2f}%{result['decode_ms_mean']:>12.2f}ms"
+              f"{result['decode_ms_p95']:>11.2f}ms{result['forward_ms_per_image']:>12.2f}ms")
+
+    speedup = full['decode_ms_mean'] / reduced['decode_ms_mean'] if reduced['decode_ms_mean'] else 0.0
+    print(f"\n⚡ Decode speedup: {speedup:.2f}x")
+    print(f"🎯 Accuracy change: {(reduced['accuracy'] - full['accuracy']) * 100:+.2f} points")
+    print(f"🤝 Prediction agreement: {agreement * 100:.2f}% (max probability difference {max_prob_diff:.4f})")
+
+    report = {
+        'full': full,
+        'reduced': reduced,
+        'decode_speedup': speedup,
+        'prediction_agreement': agreement,
+        'max_probability_difference': max_prob_diff
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Report saved to {args.output}")
+
+if __name__ == '__main__':
+    main()
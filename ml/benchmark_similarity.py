@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+DisasterLink ML - Similarity Search Benchmark
+Builds the IVF embedding index (embedding_index.py) over synthetic
+embeddings at several sizes and reports build time, recall@k against exact
+search and query latency for a range of nprobe values.
+
+Synthetic vectors mimic the model's penultimate layer: non-negative (post-ReLU)
+and clustered, since photos of the same scene or disaster type land close
+together.
+
+Usage:
+  py benchmark_similarity.py --sizes 100000 1000000
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from embedding_index import EmbeddingIndex
+
+def synthetic_embeddings(count, dim, clusters, rng, chunk_size=100000):
+    """Yield chunks of clustered, non-negative embeddings"""
+    centers = np.maximum(rng.normal(0, 1, size=(clusters, dim)), 0).astype(np.float32)
+    for start in range(0, count, chunk_size):
+        size = min(chunk_size, count - start)
+        members = centers[rng.integers(0, clusters, size)]
+        yield np.maximum(members + rng.normal(0, 0.35, size=(size, dim)).astype(np.float32), 0)
+
+def benchmark_size(count, args, rng):
+    directory = tempfile.mkdtemp(prefix='embedding_index_')
+    try:
+        index = EmbeddingIndex(directory, args.dim, 'benchmark', nlist=args.nlist,
+                               flush_interval_seconds=0, auto_train=False)
+        start = time.perf_counter()
+        inserted = 0
+        for chunk in synthetic_embeddings(count, args.dim, args.clusters, rng):
+            ids = [f'{inserted + i:064x}' for i in range(len(chunk))]
+            index.add_batch(chunk, ids, np.zeros(len(chunk), dtype=np.float32))
+            inserted += len(chunk)
+        insert_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index.train()
+        train_time = time.perf_counter() - start
+        index.flush()
+
+        queries = next(synthetic_embeddings(args.queries, args.dim, args.clusters, rng))
+        exact = [set(index.search_positions(query, args.k, exact=True).tolist()) for query in queries]
+
+        exact_times = []
+        for query in queries[:20]:
+            start = time.perf_counter()
+            index.search_positions(query, args.k, exact=True)
+            exact_times.append(time.perf_counter() - start)
+
+        results = {
+            'vectors': count,
+            'insert_time_s': insert_time,
+            'train_time_s': train_time,
+            'build_time_s': insert_time + train_time,
+            'disk_mb': index.get_stats()['disk_bytes'] / 1024 / 1024,
+            'largest_list': index.get_stats()['largest_list'],
+            'exact_search_ms': float(np.median(exact_times) * 1000),
+            'nprobe': {}
+        }
+        print(f"\n📦 {count:,} vectors: build {results['build_time_s']:.1f}s "
+              f"(insert {insert_time:.1f}s, k-means {train_time:.1f}s), exact search {results['exact_search_ms']:.1f}ms")
+        print(f"{'nprobe':<8}{'recall@' + str(args.k):>10}{'p50':>10}{'p99':>10}")
+
+        for nprobe in args.nprobe:
+            latencies = []
+            found = 0
+            for query, truth in zip(queries, exact):
+                start = time.perf_counter()
+                positions = index.search_positions(query, args.k, nprobe=nprobe)
+                latencies.append(time.perf_counter() - start)
+                found += len(truth & set(positions.tolist()))
+            latency_ms = np.array(latencies) * 1000
+            row = {
+                'recall': found / (len(queries) * args.k),
+                'latency_ms_p50': float(np.percentile(latency_ms, 50)),
+                'latency_ms_p99': float(np.percentile(latency_ms, 99))
+            }
+            results['nprobe'][str(nprobe)] = row
+            print(f"{nprobe:<8}{row['recall']:>10.3f}{row['latency_ms_p50']:>8.2f}ms{row['latency_ms_p99']:>8.2f}ms")
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the IVF embedding index')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--dim', type=int, default=128, help='Embedding width (128 or 512)')
+    parser.add_argument('--nlist', type=int, default=4096)
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[8, 16, 32, 64])
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--clusters', type=int, default=2000, help='Synthetic scene clusters')
+    parser.add_argument('--output', default='similarity_benchmark.json')
+    args = parser.parse_args()
+
+    print(f"🔎 IVF benchmark: dim {args.dim}, nlist {args.nlist}, k {args.k}, {args.queries} queries")
+    rng = np.random.default_rng(42)
+    report = {
+        'dim': args.dim,
+        'nlist': args.nlist,
+        'k': args.k,
+        'sizes': [benchmark_size(count, args, rng) for count in args.sizes]
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Report saved to {args.output}")
+
+if __name__ == '__main__':
+    main()
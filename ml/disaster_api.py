@@ -3,24 +3,50 @@ DisasterLink Web API - Real vs Fake Disaster Image Classification
 Flask API for integration with Laravel DisasterLink application
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-import torch
-import torch.nn as nn
-import torchvision.transforms as transforms
-import torchvision.models as models
 from PIL import Image, ExifTags
 import io
 import base64
-import numpy as np
+import copy
 import json
+import os
 from pathlib import Path
 import logging
+import math
 import time
 from datetime import datetime
-import cv2
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from inference_batcher import MicroBatcher
+from image_ingestion import (IngestedImage, ImageIngestionError, ImagePathError, StorageRoot, ingest_image_bytes,
+                             ingest_base64_image, ingest_image_path, reduce_for_model, MAX_FILE_SIZE,
+                             MAX_IMAGE_PIXELS)
+import serving_metrics as metrics
+from admission_control import (AdmissionController, current_deadline, deadline_passed,
+                               deadline_exceeded_result, end_deadline, start_deadline)
+from near_duplicate_index import NearDuplicateIndex
+from embedding_index import EmbeddingIndex
+from model_watcher import ModelWatcher
+from prediction_cache import CoalescedComputationFailed
+from job_queue import JobStore, JobWorkers, JOB_KINDS, FINISHED_STATES, callback_allowed
+
+PROCESS_START_TIME = time.time()
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask JSON handling with request parsing and response serialization timed as stages"""
+    
+    def loads(self, s, **kwargs):
+        with metrics.stage('json_parse'):
+            return super().loads(s, **kwargs)
+    
+    def dumps(self, obj, **kwargs):
+        with metrics.stage('serialize'):
+            return super().dumps(obj, **kwargs)
 
 app = Flask(__name__)
+app.json = TimedJSONProvider(app)
 CORS(app)  # Enable CORS for Laravel integration
 
 # Setup logging
@@ -39,12 +65,16 @@ class RealTimeCaptureValidator:
         Returns: (is_valid, reason, confidence_score)
         """
         try:
-            # Convert base64 to PIL Image
-            if isinstance(image_data, str):
-                image_bytes = base64.b64decode(image_data)
-                image = Image.open(io.BytesIO(image_bytes))
+            # Use EXIF already parsed at ingestion, otherwise convert base64 to PIL Image
+            if isinstance(image_data, IngestedImage):
+                exif_data = image_data.exif
             else:
-                image = image_data
+                if isinstance(image_data, str):
+                    image_bytes = base64.b64decode(image_data)
+                    image = Image.open(io.BytesIO(image_bytes))
+                else:
+                    image = image_data
+                exif_data = self._extract_exif_data(image)
             
             validation_results = {
                 'has_exif': False,
@@ -55,7 +85,6 @@ class RealTimeCaptureValidator:
             }
             
             # Check EXIF data for fresh capture indicators
-            exif_data = self._extract_exif_data(image)
             if exif_data:
                 validation_results['has_exif'] = True
                 
@@ -92,8 +121,8 @@ class RealTimeCaptureValidator:
         """Extract EXIF metadata from image"""
         try:
             exif_dict = {}
-            if hasattr(image, '_getexif') and image._getexif() is not None:
-                exif = image._getexif()
+            exif = image._getexif() if hasattr(image, '_getexif') else None
+            if exif is not None:
                 for tag_id, value in exif.items():
                     tag = ExifTags.TAGS.get(tag_id, tag_id)
                     exif_dict[tag] = value
@@ -148,159 +177,497 @@ class RealTimeCaptureValidator:
         
         return min(score, 1.0)
 
-class DisasterAuthenticityModel(nn.Module):
-    """Model class matching the training script"""
-    def __init__(self, num_classes=2):
-        super(DisasterAuthenticityModel, self).__init__()
-        self.backbone = models.resnet50(pretrained=False)
-        num_features = self.backbone.fc.in_features
-        self.backbone.fc = nn.Sequential(
-            nn.Dropout(0.5),
-            nn.Linear(num_features, 512),
-            nn.ReLU(inplace=True),
-            nn.Dropout(0.3),
-            nn.Linear(512, 128),
-            nn.ReLU(inplace=True),
-            nn.Linear(128, num_classes)
+def load_serving_config(config_path=None):
+    """Load the 'serving' section of model_config.json (empty dict if missing)"""
+    config_path = Path(config_path) if config_path else Path(__file__).parent / 'model_config.json'
+    try:
+        with open(config_path, 'r') as f:
+            return json.load(f).get('serving', {})
+    except Exception as e:
+        logger.warning(f"Could not read serving config from {config_path}: {e}")
+        return {}
+
+serving_config = load_serving_config()
+
+def load_thread_config(config_path=None):
+    """Load the thread topology written by tune_threads.py (empty dict if the host was never tuned)"""
+    config_path = Path(config_path) if config_path else Path(__file__).parent / serving_config.get('thread_config_path', 'thread_config.json')
+    try:
+        with open(config_path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Could not read thread config from {config_path}: {e}")
+        return {}
+
+thread_config = load_thread_config()
+
+# Model state: torch and the checkpoint are loaded by load_model(), by default
+# in a background thread so the process answers /health/live immediately
+classifier = None
+inference_batcher = None
+near_duplicates = None
+embedding_index = None
+embedding_config = serving_config.get('embeddings', {})
+model_status = {
+    'state': 'starting',
+    'error': None,
+    'time_to_ready': None,
+    'warmup': None,
+    'threads': None,
+    'reload': None
+}
+
+# Hot reload: serving.hot_reload watches the served artifact and model_status.json
+hot_reload_config = serving_config.get('hot_reload', {})
+model_watcher = None
+_reload_lock = threading.Lock()
+_worker_index = None
+
+# Asynchronous jobs (serving.jobs): accepted while the model loads, run once it is ready
+jobs_config = serving_config.get('jobs', {})
+job_store = None
+job_workers = None
+
+# Path ingestion (serving.path_ingestion): images read straight from the web app's storage directory
+path_ingestion_config = serving_config.get('path_ingestion', {})
+storage_root = None
+
+def create_classifier(cache_config=None):
+    """Build the classifier for serving.inference_backend; the ONNX Runtime backend never imports torch"""
+    backend = serving_config.get('inference_backend', 'eager')
+    cache_config = serving_config.get('cache') if cache_config is None else cache_config
+    reduced_decode = serving_config.get('reduced_jpeg_decode', True)
+    
+    if backend == 'onnx':
+        if serving_config.get('cascade', {}).get('enabled', False):
+            logger.warning("The model cascade needs a torch backend, serving the ONNX model alone")
+        from onnx_classifier import OnnxImageClassifier
+        return OnnxImageClassifier(
+            serving_config.get('onnx_model_path', 'disaster_authenticity_model.onnx'),
+            cache_config=cache_config,
+            reduced_decode=reduced_decode,
+            num_threads=serving_config.get('onnx_intra_op_threads', 0)
         )
+    
+    from disaster_classifier import DisasterImageClassifier  # heavy import (torch), deferred on purpose
+    return DisasterImageClassifier(
+        model_path=serving_config.get('model_path', 'disaster_authenticity_model.pth'),
+        cache_config=cache_config,
+        reduced_decode=reduced_decode,
+        backend=backend,
+        quantized_model_path=serving_config.get('quantized_model_path', 'disaster_authenticity_model_int8.pt'),
+        cascade_config=serving_config.get('cascade'),
+        backend_check_images=serving_config.get('torchscript_check_images', 'torchscript_check_images')
+    )
+
+def create_near_duplicate_index(loaded_classifier):
+    """Perceptual-hash index of scored images for serving.near_duplicate, or None when disabled"""
+    config = serving_config.get('near_duplicate', {})
+    if not config.get('enabled', False):
+        return None
+    return NearDuplicateIndex(
+        loaded_classifier.model_version,
+        algorithm=config.get('algorithm', 'phash'),
+        max_distance=config.get('max_distance', 6),
+        max_entries=config.get('max_entries', 5000000),
+        index_path=config.get('index_path'),
+        persist_interval_seconds=config.get('persist_interval_seconds', 300),
+        classes=loaded_classifier.classes
+    )
+
+def create_embedding_index(loaded_classifier, worker_index=None):
+    """
+    Turn on embedding capture and open the on-disk embedding index for
+    serving.embeddings, or None when disabled or the backend cannot provide them
+    """
+    if not embedding_config.get('enabled', False):
+        return None
+    if not loaded_classifier.enable_embeddings(embedding_config.get('dim', 128)):
+        return None
+    
+    # Pre-fork workers each write their own index files
+    index_dir = Path(embedding_config.get('index_dir', 'embedding_index'))
+    if worker_index is not None:
+        index_dir = index_dir / f'worker-{worker_index}'
+    return EmbeddingIndex(
+        index_dir,
+        loaded_classifier.embedding_dim,
+        loaded_classifier.model_version,
+        nlist=embedding_config.get('nlist', 4096),
+        nprobe=embedding_config.get('nprobe', 32),
+        flush_interval_seconds=embedding_config.get('flush_interval_seconds', 60)
+    )
+
+def load_model():
+    """Load the configured model backend, warm up, then start the micro-batcher"""
+    try:
+        model_status['state'] = 'loading'
+        load_start = time.time()
+        loaded_classifier = create_classifier()
+        logger.info(f"Disaster image classifier initialized in {time.time() - load_start:.2f}s")
+    except Exception as e:
+        model_status['state'] = 'failed'
+        model_status['error'] = str(e)
+        logger.error(f"Failed to initialize classifier: {e}")
+        return
+    
+    activate_classifier(loaded_classifier)
+
+def serving_batch_sizes():
+    """(max_batch_size, warm-up batch sizes): the tuned topology wins over serving config"""
+    if 'max_batch_size' in thread_config:
+        max_batch_size = thread_config['max_batch_size']
+        return max_batch_size, sorted({1, max_batch_size})
+    max_batch_size = serving_config.get('max_batch_size', 16)
+    return max_batch_size, serving_config.get('warmup_batch_sizes', [1, max_batch_size])
+
+def activate_classifier(loaded_classifier, num_threads=None, workers=1, worker_index=None):
+    """Warm up an already loaded classifier, start the micro-batcher and mark the API ready"""
+    global classifier, inference_batcher, near_duplicates, embedding_index, _worker_index
+    
+    try:
+        # Tuned thread topology (tune_threads.py) wins over the library defaults
+        num_threads = num_threads or thread_config.get('intra_op_threads')
+        if num_threads:
+            loaded_classifier.set_num_threads(num_threads, thread_config.get('inter_op_threads'))
         
-    def forward(self, x):
-        return self.backbone(x)
+        max_batch_size, warmup_batch_sizes = serving_batch_sizes()
+        model_status['threads'] = dict(
+            loaded_classifier.get_thread_info(),
+            workers=workers,
+            max_batch_size=max_batch_size,
+            source='thread_config.json' if thread_config else 'defaults'
+        )
+        
+        # Warm up at the batch sizes the micro-batcher will actually use
+        model_status['state'] = 'warming_up'
+        model_status['warmup'] = loaded_classifier.warmup(
+            batch_sizes=warmup_batch_sizes,
+            iterations=serving_config.get('warmup_iterations', 3)
+        )
+        
+        # Initialize micro-batching queue in front of the model
+        inference_batcher = MicroBatcher(
+            loaded_classifier.predict_preprocessed,
+            max_batch_size=max_batch_size,
+            max_wait_ms=serving_config.get('max_batch_wait_ms', 10)
+        )
+        _worker_index = worker_index
+        near_duplicates = create_near_duplicate_index(loaded_classifier)
+        embedding_index = create_embedding_index(loaded_classifier, worker_index)
+        classifier = loaded_classifier
+        
+        model_status['time_to_ready'] = time.time() - PROCESS_START_TIME
+        model_status['state'] = 'ready'
+        logger.info(f"Model ready {model_status['time_to_ready']:.2f}s after process start "
+                    f"(model version {loaded_classifier.model_version})")
+    except Exception as e:
+        model_status['state'] = 'failed'
+        model_status['error'] = str(e)
+        logger.error(f"Failed to initialize classifier: {e}")
+        return
+    
+    # Forked workers share the parent's weights copy-on-write; a reload in each would give every worker a private copy
+    if workers > 1:
+        logger.info("Hot reload is disabled with multiple worker processes; restart serve_multiprocess.py to serve a new model")
+    else:
+        start_model_watcher()
+    start_job_workers()
+
+def create_job_store():
+    """SQLite job store for serving.jobs, or None when disabled or unavailable"""
+    if not jobs_config.get('enabled', True):
+        return None
+    # Relative to this module like model_config.json, not to wherever the API happens to be started
+    db_path = Path(__file__).parent / jobs_config.get('db_path', 'jobs.sqlite3')
+    try:
+        return JobStore(
+            db_path,
+            result_ttl_seconds=jobs_config.get('result_ttl_seconds', 3600),
+            lease_seconds=jobs_config.get('lease_seconds', 120),
+            max_attempts=jobs_config.get('max_attempts', 3)
+        )
+    except Exception as e:
+        logger.error(f"Asynchronous jobs disabled, could not open the job store: {e}")
+        return None
+
+def create_storage_root():
+    """Sandbox for path-based requests, or None when disabled or misconfigured"""
+    if not path_ingestion_config.get('enabled', False):
+        return None
+    try:
+        return StorageRoot(
+            path_ingestion_config['storage_root'],
+            mmap_min_bytes=path_ingestion_config.get('mmap_min_bytes', 1024 * 1024)
+        )
+    except (KeyError, ValueError) as e:
+        logger.error(f"Path ingestion disabled, storage_root is not usable: {e}")
+        return None
 
-class DisasterImageClassifier:
-    def __init__(self, model_path='disaster_authenticity_model.pth'):
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-        self.model = DisasterAuthenticityModel()
+def start_job_workers():
+    """Start running queued jobs once the model is ready"""
+    global job_workers
+    if job_workers is not None or job_store is None:
+        return
+    secret_env = jobs_config.get('callback_secret_env', 'DISASTER_API_CALLBACK_SECRET')
+    job_workers = JobWorkers(
+        job_store,
+        execute_job,
+        workers=jobs_config.get('workers', 2),
+        callback_timeout_seconds=jobs_config.get('callback_timeout_seconds', 10),
+        callback_attempts=jobs_config.get('callback_attempts', 3),
+        callback_secret=os.environ.get(secret_env)
+    )
+
+def start_model_watcher():
+    """Reload the model whenever the training status file changes (serving.hot_reload)"""
+    global model_watcher
+    if model_watcher is not None or not hot_reload_config.get('enabled', True):
+        return
+    # Only the status file: train_model.py writes it after every artifact is in place, so
+    # one retrain is one reload and a checkpoint being written is never picked up
+    model_watcher = ModelWatcher(
+        [hot_reload_config.get('status_file', 'model_status.json')],
+        lambda changed: reload_model(reason=f"{', '.join(changed)} changed"),
+        poll_interval_seconds=hot_reload_config.get('poll_interval_seconds', 5)
+    )
+
+def reload_model(reason='manual'):
+    """
+    Load and warm up the configured model next to the one serving, then swap
+    it in between batches: the batch in progress finishes on the old weights,
+    later batches run on the new ones. On failure, or when the artifact still
+    holds the version being served, the old model keeps serving.
+    Returns True if the new model was swapped in.
+    """
+    global classifier, near_duplicates, embedding_index
+    
+    with _reload_lock:
+        if classifier is None or inference_batcher is None:
+            return False
+        started = time.time()
+        previous_version = classifier.model_version
+        model_status['reload'] = {'state': 'loading', 'reason': reason, 'started_at': started, 'error': None}
+        logger.info(f"Reloading model ({reason})")
         
-        # Load trained model
         try:
-            checkpoint = torch.load(model_path, map_location=self.device)
-            self.model.load_state_dict(checkpoint['model_state_dict'])
-            self.model.eval()
-            self.model.to(self.device)
-            logger.info(f"Model loaded successfully on {self.device}")
+            loaded_classifier = create_classifier()
+            if loaded_classifier.model_version == previous_version:
+                metrics.MODEL_RELOADS.inc(result='unchanged')
+                model_status['reload'].update(state='unchanged', model_version=previous_version)
+                logger.info(f"Model version {previous_version} is already serving, nothing to swap")
+                return False
+            model_status['reload']['state'] = 'warming_up'
+            _, warmup_batch_sizes = serving_batch_sizes()
+            warmup = loaded_classifier.warmup(
+                batch_sizes=warmup_batch_sizes,
+                iterations=serving_config.get('warmup_iterations', 3)
+            )
         except Exception as e:
-            logger.error(f"Error loading model: {e}")
-            raise
+            metrics.MODEL_RELOADS.inc(result='failed')
+            model_status['reload'].update(state='failed', error=str(e))
+            logger.error(f"Model reload failed, still serving version {previous_version}: {e}")
+            return False
         
-        # Define image preprocessing
-        self.transform = transforms.Compose([
-            transforms.Resize((224, 224)),
-            transforms.ToTensor(),
-            transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-        ])
+        # Indices are tied to the model version; hand their files over to the new ones
+        for index in (near_duplicates, embedding_index):
+            if index is not None:
+                index.close()
+        new_near_duplicates = create_near_duplicate_index(loaded_classifier)
+        new_embedding_index = create_embedding_index(loaded_classifier, _worker_index)
         
-        self.classes = ['fake', 'real']
+        classifier, near_duplicates, embedding_index = loaded_classifier, new_near_duplicates, new_embedding_index
+        inference_batcher.swap(loaded_classifier.predict_preprocessed)
         
-    def preprocess_image(self, image):
-        """Preprocess image for model input"""
-        try:
-            # Convert to RGB if necessary
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Apply transforms
-            image_tensor = self.transform(image).unsqueeze(0)
-            return image_tensor.to(self.device)
-        except Exception as e:
-            logger.error(f"Error preprocessing image: {e}")
-            raise
+        metrics.MODEL_RELOADS.inc(result='success')
+        model_status['warmup'] = warmup
+        model_status['reload'].update(
+            state='swapped',
+            previous_version=previous_version,
+            model_version=loaded_classifier.model_version,
+            duration=time.time() - started
+        )
+        logger.info(f"Model version {loaded_classifier.model_version} swapped in for {previous_version} "
+                    f"after {time.time() - started:.2f}s")
+        return True
+
+def model_unavailable_status():
+    """HTTP status while the model is unusable: 503 while still loading, 500 if loading failed"""
+    return 500 if model_status['state'] == 'failed' else 503
+
+metrics.register_gauge(
+    'disaster_api_admission_pending', 'Prediction requests admitted and not yet answered',
+    lambda: admission.pending
+)
+metrics.register_gauge(
+    'disaster_api_batch_queue_depth', 'Preprocessed images waiting for a forward pass',
+    lambda: inference_batcher.queue.qsize() if inference_batcher is not None else 0
+)
+metrics.register_gauge(
+    'disaster_api_near_duplicate_entries', 'Perceptual hashes in the near-duplicate index',
+    lambda: len(near_duplicates) if near_duplicates is not None else 0
+)
+metrics.register_gauge(
+    'disaster_api_jobs_queued', 'Asynchronous jobs waiting for a job worker',
+    lambda: job_store.queued_count() if job_store is not None else 0
+)
+metrics.register_gauge(
+    'disaster_api_embedding_index_entries', 'Embeddings stored for similarity search',
+    lambda: len(embedding_index) if embedding_index is not None else 0
+)
+
+# serve_multiprocess.py loads the weights once in its parent and calls activate_classifier() in each worker
+if not os.environ.get('DISASTER_API_EXTERNAL_MODEL_LOAD'):
+    if serving_config.get('background_model_loading', True):
+        threading.Thread(target=load_model, name='model-loader', daemon=True).start()
+    else:
+        load_model()
+
+def _run_batched_prediction(image, image_id=None):
+    """
+    Preprocess on the request thread, then let the micro-batcher
+    run the forward pass together with other concurrent requests
+    """
+    if deadline_passed(stage='decode'):
+        return deadline_exceeded_result('decode')
+    try:
+        duplicate, image_tensor, image_hash = prepare_model_input(image, image_id)
+    except Exception as e:
+        return classifier._error_result(e)
+    if duplicate is not None:
+        return duplicate
     
-    def predict(self, image):
-        """Predict if disaster image is real or fake"""
-        try:
-            # Preprocess image
-            image_tensor = self.preprocess_image(image)
-            
-            # Make prediction
-            with torch.no_grad():
-                start_time = time.time()
-                outputs = self.model(image_tensor)
-                prediction_time = time.time() - start_time
-                
-                # Get probabilities
-                probabilities = torch.softmax(outputs, dim=1)
-                confidence_scores = probabilities.cpu().numpy()[0]
-                
-                # Get predicted class
-                predicted_class_idx = torch.argmax(outputs, dim=1).item()
-                predicted_class = self.classes[predicted_class_idx]
-                confidence = float(confidence_scores[predicted_class_idx])
-                
-                return {
-                    'prediction': predicted_class,
-                    'confidence': confidence,
-                    'probabilities': {
-                        'fake': float(confidence_scores[0]),
-                        'real': float(confidence_scores[1])
-                    },
-                    'prediction_time': prediction_time,
-                    'status': 'success'
-                }
-                
-        except Exception as e:
-            logger.error(f"Error during prediction: {e}")
-            return {
-                'prediction': None,
-                'confidence': None,
-                'error': str(e),
-                'status': 'error'
-            }
+    result = inference_batcher.predict(image_tensor, deadline=current_deadline())
+    remember_prediction(image_hash, image_id, result)
+    return result
 
-# Initialize classifier
-try:
-    classifier = DisasterImageClassifier()
-    logger.info("Disaster image classifier initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize classifier: {e}")
-    classifier = None
+def decode_for_model(image):
+    """Decode pixels, at reduced scale when enabled"""
+    with metrics.stage('image_decode'):
+        if classifier.reduced_decode:
+            image = reduce_for_model(image, classifier.input_size)
+        image.load()
+    return image
+
+def prepare_model_input(image, image_id=None):
+    """
+    Decode, then answer from the near-duplicate index when an already scored
+    image is close enough; otherwise apply the model transform.
+    Returns (stored result or None, input tensor or None, perceptual hash).
+    """
+    image = decode_for_model(image)
+    image_hash = None
+    if near_duplicates is not None:
+        with metrics.stage('near_duplicate_lookup'):
+            image_hash = near_duplicates.hash_image(image)
+            duplicate = near_duplicates.lookup(image_hash)
+        if duplicate is not None:
+            metrics.NEAR_DUPLICATE_HITS.inc()
+            if duplicate['near_duplicate_of'] == image_id:
+                # The same bytes again after their result cache entry expired
+                del duplicate['near_duplicate_of'], duplicate['hamming_distance']
+            return duplicate, None, image_hash
+    
+    with metrics.stage('preprocess'):
+        image_tensor = classifier.preprocess_image(image)
+    if embedding_index is not None and embedding_config.get('index_screener_decisions', False):
+        image_tensor = classifier.full_model_input(image_tensor)
+    return None, image_tensor, image_hash
+
+def remember_prediction(image_hash, image_id, result):
+    """
+    Index a fresh model verdict so later near-duplicates of the image reuse it,
+    and store its embedding for /similar. The raw embedding never reaches the
+    result cache or a response (unless embeddings.include_in_response is set).
+    """
+    embedding = result.pop('embedding', None)
+    if near_duplicates is not None and image_hash is not None:
+        near_duplicates.add(image_hash, image_id, result)
+    if embedding is None:
+        return
+    if embedding_index is not None and image_id and result.get('status') == 'success':
+        embedding_index.add(embedding, image_id, result['probabilities']['real'])
+    if embedding_config.get('include_in_response', False):
+        result['embedding'] = embedding.tolist()
+
+def tracks_image_ids():
+    """Whether the result cache or an index needs the SHA-256 of each image"""
+    return classifier.result_cache is not None or near_duplicates is not None or embedding_index is not None
+
+def image_id_for(image_bytes):
+    """(result cache key, image id) for raw image bytes; the id is the SHA-256 of the bytes"""
+    key = classifier.cache_key(image_bytes)
+    return key, key.rpartition(':')[2]
+
+def run_prediction(image, image_bytes=None):
+    """
+    Predict through the result cache when the raw image bytes are known.
+    Identical images submitted concurrently share one inference.
+    """
+    if image_bytes is None or not tracks_image_ids():
+        return _run_batched_prediction(image)
+    
+    key, image_id = image_id_for(image_bytes)
+    if classifier.result_cache is None:
+        return _run_batched_prediction(image, image_id)
+    
+    result, cache_status = classifier.result_cache.get_or_compute(
+        key,
+        lambda: _run_batched_prediction(image, image_id)
+    )
+    result['cache'] = cache_status
+    return result
+
+# Thread pool for decoding batch uploads in parallel (PIL releases the GIL while decoding)
+decode_executor = ThreadPoolExecutor(
+    max_workers=serving_config.get('decode_workers', min(8, (os.cpu_count() or 1) + 2)),
+    thread_name_prefix='image-decode'
+)
+MAX_IMAGES_PER_REQUEST = serving_config.get('max_images_per_request', 32)
+MAX_PIXELS = serving_config.get('max_image_pixels', MAX_IMAGE_PIXELS)
+
+# Admission control: prediction requests beyond max_pending_requests get 503 + Retry-After,
+# and work is dropped once the client's deadline (X-Request-Timeout-Ms or the default) passes
+admission = AdmissionController(
+    max_pending=serving_config.get('max_pending_requests', 64),
+    retry_after_seconds=serving_config.get('retry_after_seconds', 5)
+)
+DEFAULT_REQUEST_TIMEOUT_MS = serving_config.get('default_request_timeout_ms', 30000)
+ADMISSION_CONTROLLED_ENDPOINTS = {
+    '/verify_disaster', '/verify_disaster_binary', '/verify_disaster_batch',
+    '/predict', '/predict_base64', '/predict_binary', '/predict_batch', '/similar', '/verify_disaster_path'
+}
+DEFAULT_SIMILAR_K = 10
+MAX_SIMILAR_K = embedding_config.get('max_k', 100)
+MAX_QUEUED_JOBS = jobs_config.get('max_queued_jobs', 1000)
+MAX_JOB_WAIT_SECONDS = jobs_config.get('max_wait_seconds', 30)
+job_store = create_job_store()
+storage_root = create_storage_root()
+
+# Raw-body endpoints (/verify_disaster_binary, /predict_binary) take the image as the request
+# body; capture metadata and location travel as JSON objects in these headers
+BINARY_CONTENT_TYPES = ('application/octet-stream', 'image/jpeg', 'image/png', 'image/webp')
+CAPTURE_METADATA_HEADER = 'X-Capture-Metadata'
+LOCATION_HEADER = 'X-User-Location'
 
 # Initialize capture validator
 capture_validator = RealTimeCaptureValidator()
 logger.info("Real-time capture validator initialized")
 
-@app.route('/health', methods=['GET'])
-def health_check():
-    """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'model_loaded': classifier is not None,
-        'features': [
-            'Real-time capture validation',
-            'Disaster authenticity verification',
-            'Fresh image requirement (5 minutes max)',
-            'Anti-gallery upload protection'
-        ],
-        'timestamp': time.time()
-    })
-
-@app.route('/verify_disaster', methods=['POST'])
-def verify_disaster():
+def check_verification_headers(ingested, capture_metadata):
     """
-    Enhanced disaster verification with real-time capture validation
-    Accepts base64 image with metadata and validates fresh capture
+    Cheap /verify_disaster checks that need only the image header.
+    Returns the rejection body and status, or the capture validation outcome.
     """
-    try:
-        # Get request data
-        data = request.get_json()
-        
-        if 'image' not in data:
-            return jsonify({
-                'success': False,
-                'error': 'No image provided'
-            }), 400
-        
-        image_data = data['image']  # Base64 encoded
-        user_location = data.get('location', {})
-        capture_metadata = data.get('metadata', {})
-        
-        # STEP 1: Validate real-time capture
+    with metrics.stage('capture_validation'):
         is_fresh, capture_reason, capture_confidence = capture_validator.validate_real_time_capture(
-            image_data, capture_metadata
+            ingested, capture_metadata
         )
-        
-        if not is_fresh:
-            return jsonify({
+    if not is_fresh:
+        return {
+            'response': {
                 'success': False,
                 'error': 'IMAGE_NOT_FRESH_CAPTURE',
                 'message': 'Only real-time captured images are allowed. Please take a fresh photo of the current disaster situation.',
@@ -309,67 +676,912 @@ def verify_disaster():
                     'confidence': capture_confidence,
                     'requirement': 'Images must be captured within the last 5 minutes'
                 }
-            }), 403
-        
-        # STEP 2: Process image for ML prediction
-        # Convert base64 to PIL Image
-        image_bytes = base64.b64decode(image_data)
-        image = Image.open(io.BytesIO(image_bytes))
-        
-        # Check minimum dimensions
-        if image.size[0] < 100 or image.size[1] < 100:
-            return jsonify({
+            },
+            'http_status': 403
+        }
+    
+    if ingested.is_too_small():
+        return {
+            'response': {
                 'success': False,
                 'error': 'Image too small (minimum 100x100 pixels)'
-            }), 400
+            },
+            'http_status': 400
+        }
+    
+    return {
+        'capture_reason': capture_reason,
+        'capture_confidence': capture_confidence
+    }
+
+def build_verification_result(prediction_result, capture_confidence, capture_reason, user_location):
+    """Build the /verify_disaster response body from a successful prediction"""
+    is_authentic = prediction_result['prediction'] == 'real'
+    authenticity_score = prediction_result['confidence']
+    
+    return {
+        'success': True,
+        'capture_validation': {
+            'is_fresh_capture': True,
+            'capture_confidence': capture_confidence,
+            'validation_details': capture_reason
+        },
+        'disaster_analysis': {
+            'is_authentic': is_authentic,
+            'authenticity_score': authenticity_score,
+            'confidence_level': 'HIGH' if authenticity_score > 0.8 else 'MEDIUM' if authenticity_score > 0.6 else 'LOW',
+            'status': 'VERIFIED_AUTHENTIC' if is_authentic else 'LIKELY_FAKE',
+            'probabilities': prediction_result['probabilities']
+        },
+        'recommendation': {
+            'action': 'PROCEED_WITH_REPORT' if is_authentic and authenticity_score > 0.7 else 'REJECT_SUBMISSION',
+            'message': 'Image verified as authentic disaster documentation' if is_authentic else 'Image appears to be manipulated or not a genuine disaster'
+        },
+        'metadata': {
+            'processing_time': prediction_result.get('prediction_time', 'unknown'),
+            'batching': prediction_result.get('batching'),
+            'cache': prediction_result.get('cache'),
+            'decided_by': prediction_result.get('decided_by'),
+            'near_duplicate_of': prediction_result.get('near_duplicate_of'),
+            'hamming_distance': prediction_result.get('hamming_distance'),
+            'model_version': prediction_result.get('model_version'),
+            'timestamp': datetime.now().isoformat(),
+            'location': user_location
+        }
+    }
+
+def health_status():
+    """Body of /health"""
+    return {
+        'status': 'healthy',
+        'model_loaded': classifier is not None,
+        'model_state': model_status['state'],
+        'model_version': classifier.model_version if classifier is not None else None,
+        'reload': model_status['reload'],
+        'batching': inference_batcher.get_stats() if inference_batcher is not None else None,
+        'cache': classifier.result_cache.get_stats() if classifier is not None and classifier.result_cache is not None else None,
+        'admission': admission.get_stats(),
+        'near_duplicates': near_duplicates.get_stats() if near_duplicates is not None else None,
+        'embeddings': embedding_index.get_stats() if embedding_index is not None else None,
+        'jobs': job_store.get_stats() if job_store is not None else None,
+        'cascade': classifier.get_cascade_stats() if classifier is not None else None,
+        'features': [
+            'Real-time capture validation',
+            'Disaster authenticity verification',
+            'Fresh image requirement (5 minutes max)',
+            'Anti-gallery upload protection'
+        ],
+        'timestamp': time.time()
+    }
+
+def liveness_status():
+    """Body of /health/live"""
+    return {
+        'status': 'alive',
+        'pid': os.getpid(),
+        'uptime': time.time() - PROCESS_START_TIME,
+        'timestamp': time.time()
+    }
+
+def readiness_status():
+    """Body and HTTP status of /health/ready"""
+    ready = model_status['state'] == 'ready'
+    return {
+        'status': 'ready' if ready else 'not_ready',
+        'model_state': model_status['state'],
+        'error': model_status['error'],
+        'time_to_ready': model_status['time_to_ready'],
+        'warmup': model_status['warmup'],
+        'timestamp': time.time()
+    }, 200 if ready else 503
+
+def model_info():
+    """Body of /model_info"""
+    return {
+        'model_type': 'disaster_authenticity_classifier',
+        'version': classifier.model_version if classifier is not None else None,
+        'inference_backend': classifier.backend if classifier is not None else None,
+        'architecture': getattr(classifier, 'model_type', None),
+        'thread_config': model_status['threads'],
+        'classes': ['fake', 'real'],
+        'input_size': [224, 224, 3],
+        'supported_formats': ['.jpg', '.jpeg', '.png', '.webp'],
+        'max_file_size': '10MB',
+        'disaster_types': ['fire', 'earthquake', 'flood', 'typhoon'],
+        'confidence_threshold': 0.7,
+        'features': [
+            'Real-time capture validation',
+            'Fresh image requirement (5 minutes max)',
+            'EXIF metadata analysis',
+            'Gallery upload prevention'
+        ],
+        'api_endpoints': {
+            'verify_disaster': '/verify_disaster (enhanced with capture validation)',
+            'predict': '/predict (multipart/form-data)',
+            'predict_base64': '/predict_base64 (application/json)',
+            'verify_disaster_binary': '/verify_disaster_binary (application/octet-stream, metadata in X-Capture-Metadata / X-User-Location headers)',
+            'predict_binary': '/predict_binary (application/octet-stream)',
+            'predict_batch': f'/predict_batch (multipart/form-data or application/json, up to {MAX_IMAGES_PER_REQUEST} images)',
+            'verify_disaster_batch': f'/verify_disaster_batch (application/json, up to {MAX_IMAGES_PER_REQUEST} images)',
+            'similar': f'/similar (application/json or multipart/form-data, k most similar past submissions, k <= {MAX_SIMILAR_K})',
+            'verify_disaster_path': '/verify_disaster_path (application/json, path relative to serving.path_ingestion.storage_root)',
+            'jobs': f'/jobs (POST, images as for the batch endpoints, returns a job id) and /jobs/<job_id> (GET, ?wait=N long-polls up to {MAX_JOB_WAIT_SECONDS}s)',
+            'health': '/health',
+            'health_live': '/health/live',
+            'health_ready': '/health/ready',
+            'model_info': '/model_info',
+            'metrics': '/metrics (Prometheus text format)'
+        },
+        'integration_guide': {
+            'laravel_example': 'See documentation for Laravel integration code',
+            'mobile_app': 'Use /verify_disaster for real-time capture validation'
+        }
+    }
+
+# Request stages shared by the Flask routes below and the async server (disaster_api_async.py).
+# prepare_* does the work before inference and returns either {'response': body, 'http_status': status}
+# to end the request early, or the state needed to finish it; finish_* builds the final (body, status).
+
+def _reject(body, http_status):
+    return {'response': body, 'http_status': http_status}
+
+def overload_rejection():
+    """503 body and headers for a request shed by admission control (read by both client styles)"""
+    return {
+        'success': False,
+        'status': 'error',
+        'error': 'SERVER_OVERLOADED',
+        'message': 'Too many verification requests in progress, please retry shortly'
+    }, {'Retry-After': admission.retry_after()}
+
+def _deadline_exceeded(result, verify_style):
+    body = {'error': 'DEADLINE_EXCEEDED', 'message': result['error']}
+    body.update({'success': False} if verify_style else {'status': 'error'})
+    return body, 504
+
+def _model_not_loaded(verify_style):
+    if verify_style:
+        return _reject({'success': False, 'error': 'Model not loaded'}, model_unavailable_status())
+    return _reject({'error': 'Model not loaded', 'status': 'error'}, model_unavailable_status())
+
+def prepare_verify_disaster(data):
+    """/verify_disaster: decode, header-only checks, model availability"""
+    if 'image' not in data:
+        return _reject({
+            'success': False,
+            'error': 'No image provided'
+        }, 400)
+    
+    # STEP 1: Decode base64 once and parse only the image header
+    return _prepare_verification(ingest_base64_image, data['image'], data.get('metadata', {}), data.get('location', {}))
+
+def prepare_verify_disaster_binary(image_bytes, headers):
+    """/verify_disaster_binary: same checks, image bytes from the body and JSON fields from headers"""
+    try:
+        metadata = parse_json_header(headers, CAPTURE_METADATA_HEADER)
+        location = parse_json_header(headers, LOCATION_HEADER)
+    except ValueError as e:
+        return _reject({
+            'success': False,
+            'error': 'INVALID_METADATA',
+            'message': str(e)
+        }, 400)
+    
+    # STEP 1: Parse only the image header, straight from the request body
+    return _prepare_verification(ingest_image_bytes, image_bytes, metadata, location)
+
+def _path_ingestion_disabled():
+    return _reject({
+        'success': False,
+        'error': 'PATH_INGESTION_DISABLED',
+        'message': 'Path ingestion is not enabled (serving.path_ingestion)'
+    }, 501)
+
+def ingest_from_storage(relative_path, max_pixels=MAX_IMAGE_PIXELS):
+    """Ingest an image by its path under the storage root"""
+    if storage_root is None:
+        raise ImagePathError('Path ingestion is not enabled (serving.path_ingestion)', 501)
+    return ingest_image_path(storage_root, relative_path, max_pixels=max_pixels)
+
+def prepare_verify_disaster_path(data):
+    """/verify_disaster_path: same checks, image read from the storage root instead of the request"""
+    if storage_root is None:
+        return _path_ingestion_disabled()
+    if 'path' not in data:
+        return _reject({
+            'success': False,
+            'error': 'No image path provided'
+        }, 400)
+    
+    # STEP 1: Read the file (memory-mapped when large) and parse only the image header
+    return _prepare_verification(ingest_from_storage, data['path'], data.get('metadata', {}), data.get('location', {}))
+
+def _ingestion_error(e):
+    return 'INVALID_PATH' if isinstance(e, ImagePathError) else 'INVALID_IMAGE'
+
+def _prepare_verification(ingest, image_data, metadata, location):
+    """Shared by the /verify_disaster variants once the request fields are extracted"""
+    try:
+        ingested = ingest(image_data, max_pixels=MAX_PIXELS)
+    except ImageIngestionError as e:
+        return _reject({
+            'success': False,
+            'error': _ingestion_error(e),
+            'message': str(e)
+        }, e.status_code)
+    
+    # STEP 2: Header-only checks (real-time capture, minimum size)
+    state = check_verification_headers(ingested, metadata)
+    if 'response' in state:
+        return state
+    
+    # STEP 3: ML Prediction needs the model
+    if classifier is None:
+        return _model_not_loaded(verify_style=True)
+    
+    state['ingested'] = ingested
+    state['location'] = location
+    return state
+
+def finish_verify_disaster(prediction_result, state):
+    """/verify_disaster: turn the prediction into the verification response"""
+    if prediction_result.get('deadline_exceeded'):
+        return _deadline_exceeded(prediction_result, verify_style=True)
+    if prediction_result['status'] == 'error':
+        return {
+            'success': False,
+            'error': 'Prediction failed',
+            'details': prediction_result.get('error', 'Unknown error')
+        }, 500
+    
+    # STEP 4: Generate enhanced response
+    return build_verification_result(
+        prediction_result, state['capture_confidence'], state['capture_reason'], state['location']
+    ), 200
+
+def prepare_predict_upload(image_bytes, filename):
+    """/predict: validate the uploaded file and parse its header"""
+    if classifier is None:
+        return _model_not_loaded(verify_style=False)
+    
+    # Check if image is provided
+    if image_bytes is None:
+        return _reject({
+            'error': 'No image provided',
+            'status': 'error'
+        }, 400)
+    
+    # Validate file
+    if filename == '':
+        return _reject({
+            'error': 'No image selected',
+            'status': 'error'
+        }, 400)
+    
+    # Check file size (max 10MB)
+    file_size = len(image_bytes)
+    if file_size > MAX_FILE_SIZE:
+        return _reject({
+            'error': 'Image too large (max 10MB)',
+            'status': 'error'
+        }, 400)
+    
+    # Load image header and validate
+    try:
+        ingested = ingest_image_bytes(image_bytes, max_pixels=MAX_PIXELS)
+    except ImageIngestionError as e:
+        return _reject({
+            'error': str(e),
+            'status': 'error'
+        }, e.status_code)
+    
+    # Check minimum dimensions
+    if ingested.is_too_small():
+        return _reject({
+            'error': 'Image too small (minimum 100x100 pixels)',
+            'status': 'error'
+        }, 400)
+    
+    return {
+        'ingested': ingested,
+        'log_prediction': True,
+        'response_fields': {
+            'image_size': ingested.size,
+            'file_size': file_size,
+            'disaster_types_supported': ['fire', 'earthquake', 'flood', 'typhoon']
+        }
+    }
+
+def prepare_predict_base64(data):
+    """/predict_base64: decode base64 once and parse the header"""
+    if classifier is None:
+        return _model_not_loaded(verify_style=False)
+    
+    if 'image' not in data:
+        return _reject({
+            'error': 'No base64 image provided',
+            'status': 'error'
+        }, 400)
+    
+    # Decode base64 image once and parse its header
+    try:
+        ingested = ingest_base64_image(data['image'], max_pixels=MAX_PIXELS)
+    except ImageIngestionError as e:
+        return _reject({
+            'error': str(e),
+            'status': 'error'
+        }, e.status_code)
+    
+    return {
+        'ingested': ingested,
+        'response_fields': {
+            'image_size': ingested.size
+        }
+    }
+
+def prepare_predict_binary(image_bytes):
+    """/predict_binary: parse the header of the raw request body"""
+    if classifier is None:
+        return _model_not_loaded(verify_style=False)
+    
+    try:
+        ingested = ingest_image_bytes(image_bytes, max_pixels=MAX_PIXELS)
+    except ImageIngestionError as e:
+        return _reject({
+            'error': str(e),
+            'status': 'error'
+        }, e.status_code)
+    
+    return {
+        'ingested': ingested,
+        'response_fields': {
+            'image_size': ingested.size,
+            'file_size': ingested.file_size
+        }
+    }
+
+def check_binary_request(headers, verify_style):
+    """Reject a raw-body upload from its Content-Type and Content-Length, before the body is read"""
+    media_type = headers.get('Content-Type', '').split(';')[0].strip().lower()
+    if media_type not in BINARY_CONTENT_TYPES:
+        message, http_status = f"Content-Type must be one of {', '.join(BINARY_CONTENT_TYPES)}", 415
+    elif int(headers.get('Content-Length') or 0) > MAX_FILE_SIZE:
+        message, http_status = 'Image too large (max 10MB)', 413
+    else:
+        return None
+    
+    if verify_style:
+        return _reject({'success': False, 'error': 'INVALID_IMAGE', 'message': message}, http_status)
+    return _reject({'error': message, 'status': 'error'}, http_status)
+
+def parse_json_header(headers, name):
+    """Optional header holding a JSON object; raises ValueError if it is malformed"""
+    value = headers.get(name)
+    if not value:
+        return {}
+    try:
+        parsed = json.loads(value)
+    except ValueError as e:
+        raise ValueError(f'{name} header is not valid JSON: {e}')
+    if not isinstance(parsed, dict):
+        raise ValueError(f'{name} header must be a JSON object')
+    return parsed
+
+def finish_prediction(result, state):
+    """/predict and /predict_base64: add request metadata to the prediction"""
+    if result.get('deadline_exceeded'):
+        return _deadline_exceeded(result, verify_style=False)
+    if result['status'] == 'error':
+        return result, 500
+    
+    # Add additional metadata
+    result.update(state['response_fields'])
+    result['timestamp'] = time.time()
+    
+    # Log prediction
+    if state.get('log_prediction'):
+        logger.info(f"Prediction: {result['prediction']} (confidence: {result['confidence']:.3f})")
+    
+    return result, 200
+
+def prepare_similar(ingest, image_data, k):
+    """/similar: similarity search enabled, k in range, image header"""
+    if classifier is None:
+        return _model_not_loaded(verify_style=False)
+    if embedding_index is None:
+        return _reject({
+            'error': 'Similarity search is not enabled (serving.embeddings, eager backend)',
+            'status': 'error'
+        }, 501)
+    
+    if not image_data:
+        return _reject({
+            'error': 'No image provided',
+            'status': 'error'
+        }, 400)
+    
+    try:
+        k = int(k or DEFAULT_SIMILAR_K)
+    except (TypeError, ValueError):
+        k = 0
+    if not 1 <= k <= MAX_SIMILAR_K:
+        return _reject({
+            'error': f'k must be an integer between 1 and {MAX_SIMILAR_K}',
+            'status': 'error'
+        }, 400)
+    
+    try:
+        ingested = ingest(image_data, max_pixels=MAX_PIXELS)
+    except ImageIngestionError as e:
+        return _reject({
+            'error': str(e),
+            'status': 'error'
+        }, e.status_code)
+    
+    return {'ingested': ingested, 'k': k}
+
+def prepare_embedding_input(image):
+    """
+    Decode and preprocess for /similar, which always runs the full model:
+    cached results and cascade screener verdicts carry no embedding
+    """
+    image = decode_for_model(image)
+    with metrics.stage('preprocess'):
+        return classifier.full_model_input(classifier.preprocess_image(image))
+
+def embed_image(image):
+    """Prediction with its 'embedding', through the micro-batcher"""
+    if deadline_passed(stage='decode'):
+        return deadline_exceeded_result('decode')
+    try:
+        image_tensor = prepare_embedding_input(image)
+    except Exception as e:
+        return classifier._error_result(e)
+    return inference_batcher.predict(image_tensor, deadline=current_deadline())
+
+def finish_similar(result, state):
+    """/similar: search the embedding index with the query image's embedding"""
+    if result.get('deadline_exceeded'):
+        return _deadline_exceeded(result, verify_style=False)
+    embedding = result.pop('embedding', None)
+    if result['status'] == 'error':
+        return result, 500
+    if embedding is None:
+        # The model serving this request produces no embeddings (e.g. swapped in by a hot reload)
+        return {
+            'error': 'The serving model did not produce an embedding for this image',
+            'status': 'error'
+        }, 503
+    
+    ingested = state['ingested']
+    start = time.perf_counter()
+    with metrics.stage('similarity_search'):
+        similar = embedding_index.search(embedding, state['k'], exclude_id=image_id_for(ingested.image_bytes)[1])
+    for entry in similar:
+        entry['prediction'] = classifier.classes[1] if entry['p_real'] > 0.5 else classifier.classes[0]
+    
+    result.update({
+        'similar': similar,
+        'k': state['k'],
+        'index_size': len(embedding_index),
+        'search_time': time.perf_counter() - start,
+        'image_size': ingested.size,
+        'timestamp': time.time()
+    })
+    return result, 200
+
+def batch_items_from_files(files):
+    """Batch entries from multipart uploads: [(filename, bytes), ...]"""
+    return [{'filename': filename, 'data': data} for filename, data in files]
+
+def batch_items_from_json(data):
+    """
+    Batch entries from a JSON 'images' list whose entries are base64 strings
+    or objects with 'image' (base64) or 'path' (under the storage root),
+    'metadata' and 'location'
+    """
+    items = []
+    for entry in (data or {}).get('images', []):
+        if isinstance(entry, dict):
+            items.append({
+                'base64': entry.get('image'),
+                'path': entry.get('path'),
+                'metadata': entry.get('metadata', data.get('metadata', {})),
+                'location': entry.get('location', data.get('location', {}))
+            })
+        else:
+            items.append({
+                'base64': entry,
+                'metadata': data.get('metadata', {}),
+                'location': data.get('location', {})
+            })
+    return items
+
+def _ingest_batch_item(item):
+    """Decode one batch entry once and parse its header"""
+    if item.get('data') is not None:
+        return ingest_image_bytes(item['data'], max_pixels=MAX_PIXELS)
+    if item.get('path') is not None:
+        return ingest_from_storage(item['path'], max_pixels=MAX_PIXELS)
+    if item.get('base64'):
+        return ingest_base64_image(item['base64'], max_pixels=MAX_PIXELS)
+    raise ImageIngestionError('No image provided')
+
+def load_predict_item(item):
+    """Decode and preprocess one /predict_batch image (runs on a worker thread)"""
+    try:
+        ingested = _ingest_batch_item(item)
+        if ingested.is_too_small():
+            raise ValueError('Image too small (minimum 100x100 pixels)')
+        loaded = {
+            'image_size': ingested.size,
+            'file_size': ingested.file_size
+        }
+        return _attach_cached_or_tensor(loaded, ingested)
+    except Exception as e:
+        return {'error': str(e)}
+
+def load_verify_item(item):
+    """Decode, capture-validate and preprocess one /verify_disaster_batch image"""
+    try:
+        ingested = _ingest_batch_item(item)
+    except ImageIngestionError as e:
+        return _reject({'success': False, 'error': _ingestion_error(e), 'message': str(e)}, e.status_code)
+    
+    loaded = check_verification_headers(ingested, item.get('metadata', {}))
+    if 'response' in loaded:
+        return loaded
+    
+    loaded['location'] = item.get('location', {})
+    try:
+        return _attach_cached_or_tensor(loaded, ingested)
+    except Exception as e:
+        return _reject({'success': False, 'error': 'PROCESSING_ERROR', 'message': str(e)}, 400)
+
+def _attach_cached_or_tensor(loaded, ingested):
+    """
+    Use a cached result, or wait for an identical image another request (or an
+    earlier entry of this batch) is already scoring; otherwise claim the image
+    in the result cache and decode and preprocess it for the forward pass
+    """
+    loaded['image_id'] = None
+    if tracks_image_ids():
+        key, loaded['image_id'] = image_id_for(ingested.image_bytes)
+    if classifier.result_cache is not None:
+        loaded['cache_key'] = key
+        status, claim = classifier.result_cache.claim(key)
+        if status == 'hit':
+            claim['cache'] = 'hit'
+            loaded['prediction'] = claim
+            return loaded
+        if status == 'coalesced':
+            loaded.update({'shared': claim, 'ingested': ingested})
+            return loaded
+        loaded['claim'] = claim
+    
+    try:
+        _attach_model_input(loaded, ingested.image)
+    except Exception as e:
+        _settle_claim(loaded, error=e)
+        raise
+    return loaded
+
+def _attach_model_input(loaded, image):
+    """A near-duplicate's result, or the preprocessed tensor for the forward pass"""
+    duplicate, tensor, image_hash = prepare_model_input(image, loaded['image_id'])
+    if duplicate is not None:
+        _settle_claim(loaded, duplicate)
+        loaded['prediction'] = duplicate
+    else:
+        loaded.update({'tensor': tensor, 'image_hash': image_hash})
+
+def _settle_claim(loaded, prediction=None, error=None):
+    """Cache a batch image's own result and hand it (or its failure) to requests waiting on its claim"""
+    claim = loaded.pop('claim', None)
+    if claim is not None:
+        classifier.result_cache.complete(loaded['cache_key'], claim, prediction, error=error)
+    elif prediction is not None and 'cache_key' in loaded:
+        classifier.result_cache.put(loaded['cache_key'], prediction)
+
+def _predict_queued(items):
+    """Queue preprocessed batch images on the micro-batcher at once and collect their results in order"""
+    if items and deadline_passed(stage='inference'):
+        for item in items:
+            item['prediction'] = deadline_exceeded_result('inference')
+            _settle_claim(item, item['prediction'])
+        return 0
+    deadline = current_deadline()
+    futures = [inference_batcher.submit(item['tensor'], deadline=deadline) for item in items]
+    for item, future in zip(items, futures):
+        prediction = future.result()
+        remember_prediction(item['image_hash'], item['image_id'], prediction)
+        _settle_claim(item, prediction)
+        if 'cache_key' in item:
+            prediction['cache'] = 'miss'
+        item['prediction'] = prediction
+    return len(items)
+
+def predict_loaded_items(loaded_items):
+    """
+    Score every decoded, uncached image through the micro-batcher, so batch
+    requests and jobs share its forward passes (and threads) with the
+    single-image routes instead of running their own next to them. Images
+    already being scored elsewhere wait for that result; only if it fails are
+    they decoded and scored here. Returns how many images this batch scored.
+    """
+    try:
+        scored = _predict_queued([item for item in loaded_items if 'tensor' in item])
         
-        # STEP 3: ML Prediction
-        if classifier is None:
-            return jsonify({
-                'success': False,
-                'error': 'Model not loaded'
-            }), 500
+        retried = []
+        for item in loaded_items:
+            if 'shared' not in item:
+                continue
+            try:
+                prediction = copy.deepcopy(item.pop('shared').result())
+            except Exception:
+                # The request scoring it failed (error, expired deadline); score this image itself
+                retried.append(item)
+                continue
+            prediction['cache'] = 'coalesced'
+            item['prediction'] = prediction
         
-        prediction_result = classifier.predict(image)
+        for item in retried:
+            try:
+                _attach_model_input(item, item.pop('ingested').image)
+            except Exception as e:
+                item['prediction'] = classifier._error_result(e)
+        scored += _predict_queued([item for item in retried if 'tensor' in item])
+    finally:
+        # Never leave identical requests waiting on a claim this batch failed to settle
+        for item in loaded_items:
+            if 'claim' in item:
+                _settle_claim(item, error=CoalescedComputationFailed('Batch prediction failed'))
+    return scored
+
+def prepare_batch(items, verify_style):
+    """Batch endpoints: model availability, batch size limits and the request deadline"""
+    if classifier is None:
+        return _model_not_loaded(verify_style)
+    
+    if deadline_passed(stage='decode'):
+        body, status = _deadline_exceeded(deadline_exceeded_result('decode'), verify_style)
+        return _reject(body, status)
+    
+    batch_error = None
+    if not items:
+        batch_error = 'No images provided'
+    elif len(items) > MAX_IMAGES_PER_REQUEST:
+        batch_error = f'Too many images (max {MAX_IMAGES_PER_REQUEST} per request)'
+    
+    if batch_error:
+        if verify_style:
+            return _reject({'success': False, 'error': batch_error}, 400)
+        return _reject({'error': batch_error, 'status': 'error'}, 400)
+    return None
+
+def finish_predict_batch(loaded_items, batch_size):
+    """/predict_batch: per-image results in request order"""
+    results = []
+    for index, item in enumerate(loaded_items):
+        if 'error' in item:
+            results.append({'index': index, 'error': item['error'], 'status': 'error'})
+            continue
         
-        if prediction_result['status'] == 'error':
-            return jsonify({
+        result = dict(item['prediction'])
+        result.update({
+            'index': index,
+            'image_size': item['image_size'],
+            'file_size': item['file_size']
+        })
+        results.append(result)
+    
+    succeeded = sum(1 for result in results if result['status'] == 'success')
+    
+    return {
+        'status': 'success',
+        'results': results,
+        'summary': {
+            'total': len(results),
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'batch_size': batch_size
+        },
+        'timestamp': time.time(),
+        'model_version': classifier.model_version
+    }
+
+def finish_verify_disaster_batch(loaded_items, batch_size):
+    """/verify_disaster_batch: per-image verification results in request order"""
+    results = []
+    for index, item in enumerate(loaded_items):
+        if 'response' in item:
+            result = dict(item['response'], http_status=item['http_status'])
+        elif item['prediction'].get('deadline_exceeded'):
+            body, status = _deadline_exceeded(item['prediction'], verify_style=True)
+            result = dict(body, http_status=status)
+        elif item['prediction']['status'] == 'error':
+            result = {
                 'success': False,
                 'error': 'Prediction failed',
-                'details': prediction_result.get('error', 'Unknown error')
-            }), 500
-        
-        # STEP 4: Generate enhanced response
-        is_authentic = prediction_result['prediction'] == 'real'
-        authenticity_score = prediction_result['confidence']
-        
-        result = {
-            'success': True,
-            'capture_validation': {
-                'is_fresh_capture': True,
-                'capture_confidence': capture_confidence,
-                'validation_details': capture_reason
-            },
-            'disaster_analysis': {
-                'is_authentic': is_authentic,
-                'authenticity_score': authenticity_score,
-                'confidence_level': 'HIGH' if authenticity_score > 0.8 else 'MEDIUM' if authenticity_score > 0.6 else 'LOW',
-                'status': 'VERIFIED_AUTHENTIC' if is_authentic else 'LIKELY_FAKE',
-                'probabilities': prediction_result['probabilities']
-            },
-            'recommendation': {
-                'action': 'PROCEED_WITH_REPORT' if is_authentic and authenticity_score > 0.7 else 'REJECT_SUBMISSION',
-                'message': 'Image verified as authentic disaster documentation' if is_authentic else 'Image appears to be manipulated or not a genuine disaster'
-            },
-            'metadata': {
-                'processing_time': prediction_result.get('prediction_time', 'unknown'),
-                'model_version': '1.0',
-                'timestamp': datetime.now().isoformat(),
-                'location': user_location
+                'details': item['prediction'].get('error', 'Unknown error'),
+                'http_status': 500
             }
+        else:
+            result = build_verification_result(
+                item['prediction'], item['capture_confidence'], item['capture_reason'], item['location']
+            )
+        result['index'] = index
+        results.append(result)
+    
+    succeeded = sum(1 for result in results if result['success'])
+    
+    return {
+        'success': True,
+        'results': results,
+        'summary': {
+            'total': len(results),
+            'verified': succeeded,
+            'rejected': len(results) - succeeded,
+            'batch_size': batch_size
+        },
+        'metadata': {
+            'model_version': classifier.model_version,
+            'timestamp': datetime.now().isoformat()
         }
+    }
+
+# Job kind -> (per-image loader, response builder) of the matching batch endpoint
+JOB_PIPELINES = {
+    'verify': (load_verify_item, finish_verify_disaster_batch),
+    'predict': (load_predict_item, finish_predict_batch)
+}
+
+def execute_job(kind, items):
+    """Run one queued job on a job worker thread, exactly like /verify_disaster_batch or /predict_batch"""
+    load_item, finish = JOB_PIPELINES[kind]
+    try:
+        loaded_items = list(decode_executor.map(load_item, items))
+        batch_size = predict_loaded_items(loaded_items)
+        result = finish(loaded_items, batch_size)
+    except Exception:
+        metrics.JOBS.inc(state='failed')
+        raise
+    metrics.JOBS.inc(state='succeeded')
+    return result
+
+def _jobs_disabled():
+    return _reject({
+        'success': False,
+        'error': 'JOBS_DISABLED',
+        'message': 'Asynchronous jobs are not enabled (serving.jobs)'
+    }, 501)
+
+def submit_job(items, kind, callback_url):
+    """POST /jobs: validate and queue a batch; answered with 202 and the job id at once"""
+    if job_store is None:
+        return _jobs_disabled()
+    
+    kind = kind or 'verify'
+    job_error = None
+    if kind not in JOB_KINDS:
+        job_error = f"Unknown job kind '{kind}' (expected one of {', '.join(JOB_KINDS)})"
+    elif not items:
+        job_error = 'No images provided'
+    elif len(items) > MAX_IMAGES_PER_REQUEST:
+        job_error = f'Too many images (max {MAX_IMAGES_PER_REQUEST} per job)'
+    elif callback_url and not callback_allowed(callback_url, jobs_config.get('callback_allowed_hosts', [])):
+        job_error = 'callback_url must be an http(s) URL on an allowed host (serving.jobs.callback_allowed_hosts)'
+    if job_error:
+        return _reject({'success': False, 'error': 'INVALID_JOB', 'message': job_error}, 400)
+    
+    if job_store.queued_count() >= MAX_QUEUED_JOBS:
+        metrics.REQUESTS_SHED.inc(endpoint='/jobs')
+        body, headers = overload_rejection()
+        return dict(_reject(body, 503), headers=headers)
+    
+    job_id = job_store.submit(kind, items, callback_url)
+    metrics.JOBS.inc(state='submitted')
+    if job_workers is not None:
+        job_workers.wake()
+    return {
+        'response': {
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f'/jobs/{job_id}'
+        },
+        'http_status': 202
+    }
+
+def job_wait_seconds(value):
+    """?wait= of GET /jobs/<id>, capped at max_wait_seconds; raises ValueError when malformed or not finite"""
+    wait = float(value or 0)
+    # nan and inf would slip through min/max and hold the request open indefinitely
+    if not math.isfinite(wait):
+        raise ValueError(f'wait must be finite, got {value}')
+    return min(max(wait, 0.0), MAX_JOB_WAIT_SECONDS)
+
+def job_status(job_id, wait=0.0):
+    """GET /jobs/<id>: the job and, once finished, its result; waits up to wait seconds for it to finish"""
+    if job_store is None:
+        return _jobs_disabled()
+    job = job_store.wait(job_id, wait) if wait else job_store.get(job_id)
+    if job is None:
+        return _reject({'success': False, 'error': 'JOB_NOT_FOUND', 'message': 'Unknown or expired job'}, 404)
+    return {'response': dict(job, success=True), 'http_status': 200}
+
+def job_finished(state):
+    return state['http_status'] != 200 or state['response']['status'] in FINISHED_STATES
+
+@app.before_request
+def start_request_metrics():
+    g.request_start = time.perf_counter()
+    metrics.IN_FLIGHT.inc()
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    metrics.record_request(endpoint, response.status_code, time.perf_counter() - g.request_start)
+    return response
+
+@app.before_request
+def admit_request():
+    """Shed prediction requests beyond the admission limit; start the deadline of admitted ones"""
+    if request.url_rule is None or request.url_rule.rule not in ADMISSION_CONTROLLED_ENDPOINTS:
+        return None
+    if not admission.try_admit():
+        metrics.REQUESTS_SHED.inc(endpoint=request.url_rule.rule)
+        body, headers = overload_rejection()
+        return jsonify(body), 503, headers
+    g.admitted = True
+    g.deadline_token = start_deadline(request.headers, DEFAULT_REQUEST_TIMEOUT_MS)
+    return None
+
+@app.teardown_request
+def finish_request_metrics(error):
+    metrics.IN_FLIGHT.dec()
+    if g.pop('admitted', False):
+        admission.release()
+        end_deadline(g.pop('deadline_token'))
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Request counters, per-stage latency histograms and queue gauges for Prometheus"""
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """Health check endpoint"""
+    return jsonify(health_status())
+
+@app.route('/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe: the process is up and serving HTTP"""
+    return jsonify(liveness_status())
+
+@app.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: the model is loaded and warmed up"""
+    body, status = readiness_status()
+    return jsonify(body), status
+
+@app.route('/verify_disaster', methods=['POST'])
+def verify_disaster():
+    """
+    Enhanced disaster verification with real-time capture validation
+    Accepts base64 image with metadata and validates fresh capture
+    """
+    try:
+        state = prepare_verify_disaster(request.get_json())
+        if 'response' in state:
+            return jsonify(state['response']), state['http_status']
         
-        return jsonify(result)
+        # Pixel data is decoded here, after every cheap check has passed
+        ingested = state['ingested']
+        prediction_result = run_prediction(ingested.image, ingested.image_bytes)
+        
+        body, status = finish_verify_disaster(prediction_result, state)
+        return jsonify(body), status
         
     except Exception as e:
         logger.error(f"Error in verify_disaster: {e}")
@@ -379,83 +1591,52 @@ def verify_disaster():
             'message': str(e)
         }), 500
 
+@app.route('/verify_disaster_path', methods=['POST'])
+def verify_disaster_path():
+    """
+    /verify_disaster for images the web app has already stored: the request
+    carries a path relative to the storage root instead of the image
+    """
+    try:
+        state = prepare_verify_disaster_path(request.get_json())
+        if 'response' in state:
+            return jsonify(state['response']), state['http_status']
+        
+        ingested = state['ingested']
+        prediction_result = run_prediction(ingested.image, ingested.image_bytes)
+        
+        body, status = finish_verify_disaster(prediction_result, state)
+        return jsonify(body), status
+        
+    except Exception as e:
+        logger.error(f"Error in verify_disaster_path: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'PROCESSING_ERROR',
+            'message': str(e)
+        }), 500
+
 @app.route('/predict', methods=['POST'])
 def predict_disaster_authenticity():
     """
     Main prediction endpoint for DisasterLink
     Accepts image upload and returns authenticity prediction
     """
-    
-    if classifier is None:
-        return jsonify({
-            'error': 'Model not loaded',
-            'status': 'error'
-        }), 500
-    
     try:
-        # Check if image is provided
-        if 'image' not in request.files:
-            return jsonify({
-                'error': 'No image provided',
-                'status': 'error'
-            }), 400
-        
-        image_file = request.files['image']
-        
-        # Validate file
-        if image_file.filename == '':
-            return jsonify({
-                'error': 'No image selected',
-                'status': 'error'
-            }), 400
-        
-        # Check file size (max 10MB)
-        image_file.seek(0, 2)  # Seek to end
-        file_size = image_file.tell()
-        image_file.seek(0)  # Reset to beginning
-        
-        if file_size > 10 * 1024 * 1024:  # 10MB
-            return jsonify({
-                'error': 'Image too large (max 10MB)',
-                'status': 'error'
-            }), 400
-        
-        # Load and validate image
-        try:
-            image = Image.open(image_file.stream)
-            
-            # Check minimum dimensions
-            if image.size[0] < 100 or image.size[1] < 100:
-                return jsonify({
-                    'error': 'Image too small (minimum 100x100 pixels)',
-                    'status': 'error'
-                }), 400
-                
-        except Exception as e:
-            return jsonify({
-                'error': f'Invalid image format: {str(e)}',
-                'status': 'error'
-            }), 400
+        image_file = request.files.get('image')
+        if image_file is None:
+            state = prepare_predict_upload(None, None)
+        else:
+            state = prepare_predict_upload(image_file.read(), image_file.filename)
+        if 'response' in state:
+            return jsonify(state['response']), state['http_status']
         
         # Make prediction
-        result = classifier.predict(image)
-        
-        if result['status'] == 'error':
-            return jsonify(result), 500
-        
-        # Add additional metadata
-        result.update({
-            'image_size': image.size,
-            'file_size': file_size,
-            'timestamp': time.time(),
-            'model_version': '1.0',
-            'disaster_types_supported': ['fire', 'earthquake', 'flood', 'typhoon']
-        })
+        ingested = state['ingested']
+        result = run_prediction(ingested.image, ingested.image_bytes)
         
-        # Log prediction
-        logger.info(f"Prediction: {result['prediction']} (confidence: {result['confidence']:.3f})")
-        
-        return jsonify(result)
+        body, status = finish_prediction(result, state)
+        return jsonify(body), status
         
     except Exception as e:
         logger.error(f"Unexpected error in prediction: {e}")
@@ -470,84 +1651,202 @@ def predict_from_base64():
     Alternative endpoint that accepts base64 encoded images
     Useful for mobile app integration
     """
-    
-    if classifier is None:
+    try:
+        state = prepare_predict_base64(request.get_json())
+        if 'response' in state:
+            return jsonify(state['response']), state['http_status']
+        
+        # Make prediction
+        ingested = state['ingested']
+        result = run_prediction(ingested.image, ingested.image_bytes)
+        
+        body, status = finish_prediction(result, state)
+        return jsonify(body), status
+        
+    except Exception as e:
+        logger.error(f"Error in base64 prediction: {e}")
         return jsonify({
-            'error': 'Model not loaded',
+            'error': f'Internal server error: {str(e)}',
             'status': 'error'
         }), 500
-    
+
+@app.route('/verify_disaster_binary', methods=['POST'])
+def verify_disaster_binary():
+    """
+    /verify_disaster with the raw image as the request body
+    Skips base64 and JSON parsing; metadata and location come from headers
+    """
     try:
-        data = request.get_json()
+        state = check_binary_request(request.headers, verify_style=True)
+        if state is None:
+            state = prepare_verify_disaster_binary(request.get_data(cache=False), request.headers)
+        if 'response' in state:
+            return jsonify(state['response']), state['http_status']
         
-        if 'image' not in data:
-            return jsonify({
-                'error': 'No base64 image provided',
-                'status': 'error'
-            }), 400
+        ingested = state['ingested']
+        prediction_result = run_prediction(ingested.image, ingested.image_bytes)
         
-        # Decode base64 image
-        try:
-            image_data = base64.b64decode(data['image'])
-            image = Image.open(io.BytesIO(image_data))
-        except Exception as e:
-            return jsonify({
-                'error': f'Invalid base64 image: {str(e)}',
-                'status': 'error'
-            }), 400
+        body, status = finish_verify_disaster(prediction_result, state)
+        return jsonify(body), status
+        
+    except Exception as e:
+        logger.error(f"Error in verify_disaster_binary: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'PROCESSING_ERROR',
+            'message': str(e)
+        }), 500
+
+@app.route('/predict_binary', methods=['POST'])
+def predict_from_binary():
+    """
+    /predict_base64 with the raw image as the request body
+    """
+    try:
+        state = check_binary_request(request.headers, verify_style=False)
+        if state is None:
+            state = prepare_predict_binary(request.get_data(cache=False))
+        if 'response' in state:
+            return jsonify(state['response']), state['http_status']
         
         # Make prediction
-        result = classifier.predict(image)
+        ingested = state['ingested']
+        result = run_prediction(ingested.image, ingested.image_bytes)
         
-        if result['status'] == 'error':
-            return jsonify(result), 500
+        body, status = finish_prediction(result, state)
+        return jsonify(body), status
         
-        # Add metadata
-        result.update({
-            'image_size': image.size,
-            'timestamp': time.time(),
-            'model_version': '1.0'
-        })
+    except Exception as e:
+        logger.error(f"Error in binary prediction: {e}")
+        return jsonify({
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@app.route('/similar', methods=['POST'])
+def similar_submissions():
+    """
+    k most similar past submissions to an image, by cosine similarity of
+    the model's penultimate-layer embeddings
+    """
+    try:
+        image_file = request.files.get('image')
+        if image_file is not None:
+            state = prepare_similar(ingest_image_bytes, image_file.read(), request.form.get('k'))
+        else:
+            data = request.get_json(silent=True) or {}
+            state = prepare_similar(ingest_base64_image, data.get('image'), data.get('k'))
+        if 'response' in state:
+            return jsonify(state['response']), state['http_status']
+        
+        result = embed_image(state['ingested'].image)
         
-        return jsonify(result)
+        body, status = finish_similar(result, state)
+        return jsonify(body), status
         
     except Exception as e:
-        logger.error(f"Error in base64 prediction: {e}")
+        logger.error(f"Error in similarity search: {e}")
+        return jsonify({
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }), 500
+
+def _read_batch_items():
+    """Collect the images of a batch request without decoding them yet"""
+    if request.files:
+        return batch_items_from_files(
+            (image_file.filename, image_file.read()) for image_file in request.files.getlist('images')
+        )
+    return batch_items_from_json(request.get_json(silent=True))
+
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch():
+    """
+    Batch prediction endpoint
+    Accepts several images (multipart 'images' files or JSON list of base64 strings),
+    decodes them in parallel and scores them in one forward pass
+    """
+    try:
+        items = _read_batch_items()
+        rejection = prepare_batch(items, verify_style=False)
+        if rejection:
+            return jsonify(rejection['response']), rejection['http_status']
+        
+        loaded_items = list(decode_executor.map(load_predict_item, items))
+        batch_size = predict_loaded_items(loaded_items)
+        
+        return jsonify(finish_predict_batch(loaded_items, batch_size))
+        
+    except Exception as e:
+        logger.error(f"Error in batch prediction: {e}")
         return jsonify({
             'error': f'Internal server error: {str(e)}',
             'status': 'error'
         }), 500
 
+@app.route('/verify_disaster_batch', methods=['POST'])
+def verify_disaster_batch():
+    """
+    Batch variant of /verify_disaster
+    Each image gets its own capture validation and verification result;
+    rejected images do not fail the rest of the batch
+    """
+    try:
+        items = _read_batch_items()
+        rejection = prepare_batch(items, verify_style=True)
+        if rejection:
+            return jsonify(rejection['response']), rejection['http_status']
+        
+        loaded_items = list(decode_executor.map(load_verify_item, items))
+        batch_size = predict_loaded_items(loaded_items)
+        
+        return jsonify(finish_verify_disaster_batch(loaded_items, batch_size))
+        
+    except Exception as e:
+        logger.error(f"Error in verify_disaster_batch: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'PROCESSING_ERROR',
+            'message': str(e)
+        }), 500
+
+@app.route('/jobs', methods=['POST'])
+def submit_job_request():
+    """
+    Asynchronous verification: queue one or more images (same formats as the
+    batch endpoints, plus 'kind' and 'callback_url') and get a job id back at once
+    """
+    try:
+        if request.files:
+            options = request.form
+        else:
+            data = request.get_json(silent=True)
+            options = data if isinstance(data, dict) else {}
+        state = submit_job(_read_batch_items(), options.get('kind'), options.get('callback_url'))
+        return jsonify(state['response']), state['http_status'], state.get('headers', {})
+        
+    except Exception as e:
+        logger.error(f"Error submitting job: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'PROCESSING_ERROR',
+            'message': str(e)
+        }), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Job status and result; ?wait=N holds the request until the job finishes or N seconds pass"""
+    try:
+        wait = job_wait_seconds(request.args.get('wait'))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'INVALID_WAIT', 'message': 'wait must be a number of seconds'}), 400
+    state = job_status(job_id, wait)
+    return jsonify(state['response']), state['http_status']
+
 @app.route('/model_info', methods=['GET'])
 def get_model_info():
     """Get model information for integration"""
-    return jsonify({
-        'model_type': 'disaster_authenticity_classifier',
-        'version': '1.0',
-        'classes': ['fake', 'real'],
-        'input_size': [224, 224, 3],
-        'supported_formats': ['.jpg', '.jpeg', '.png', '.webp'],
-        'max_file_size': '10MB',
-        'disaster_types': ['fire', 'earthquake', 'flood', 'typhoon'],
-        'confidence_threshold': 0.7,
-        'features': [
-            'Real-time capture validation',
-            'Fresh image requirement (5 minutes max)',
-            'EXIF metadata analysis',
-            'Gallery upload prevention'
-        ],
-        'api_endpoints': {
-            'verify_disaster': '/verify_disaster (enhanced with capture validation)',
-            'predict': '/predict (multipart/form-data)',
-            'predict_base64': '/predict_base64 (application/json)',
-            'health': '/health',
-            'model_info': '/model_info'
-        },
-        'integration_guide': {
-            'laravel_example': 'See documentation for Laravel integration code',
-            'mobile_app': 'Use /verify_disaster for real-time capture validation'
-        }
-    })
+    return jsonify(model_info())
 
 @app.errorhandler(413)
 def too_large(e):
@@ -567,14 +1866,20 @@ def internal_error(e):
 if __name__ == '__main__':
     # Run development server
     print("Starting DisasterLink ML API...")
-    print("Model loaded:", classifier is not None)
+    print("Model state:", model_status['state'])
     print("Real-time capture validation: ENABLED")
     print("Available endpoints:")
     print("- POST /verify_disaster - Enhanced disaster verification with capture validation")
     print("- POST /predict - Upload image for authenticity check")
     print("- POST /predict_base64 - Base64 image prediction")
+    print("- POST /predict_batch - Score many images in one call")
+    print("- POST /verify_disaster_batch - Verify many images in one call")
+    print("- POST /verify_disaster_path - Verify an image already on the shared storage root")
+    print("- POST /jobs, GET /jobs/<job_id> - Asynchronous verification jobs")
     print("- GET /model_info - Model information")
     print("- GET /health - Health check")
+    print("- GET /health/live - Liveness probe")
+    print("- GET /health/ready - Readiness probe (model loaded and warmed up)")
     print("\nSecurity Features:")
     print("- Real-time capture validation (5-minute window)")
     print("- Gallery upload prevention")
@@ -0,0 +1,481 @@
+"""
+DisasterLink Web API - Async (ASGI) serving mode
+Same routes and response schemas as disaster_api.py, served by Starlette + uvicorn.
+Network I/O and body parsing stay on the event loop; decoding, preprocessing and
+the forward pass run on a bounded executor sized to the CPU cores, so thousands
+of slow uploads can be held open without tying up inference threads.
+
+Run with:  py disaster_api_async.py   (or: uvicorn disaster_api_async:app --port 5000)
+"""
+
+import asyncio
+import contextvars
+import copy
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.datastructures import Headers, UploadFile
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse as StarletteJSONResponse, Response
+from starlette.routing import Route
+
+import disaster_api as api
+import serving_metrics as metrics
+from prediction_cache import CoalescedComputationFailed
+from admission_control import current_deadline, deadline_passed, deadline_exceeded_result, end_deadline, start_deadline
+
+logger = logging.getLogger(__name__)
+
+# CPU-bound work (decode, preprocessing, batch forward passes) is limited to one job per core
+CPU_WORKERS = api.serving_config.get('async_cpu_workers', os.cpu_count() or 1)
+cpu_executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix='cpu-worker')
+cpu_slots = asyncio.Semaphore(CPU_WORKERS)
+
+class JSONResponse(StarletteJSONResponse):
+    """JSON response with serialization timed as a stage, like the Flask app"""
+
+    def render(self, content):
+        with metrics.stage('serialize'):
+            return super().render(content)
+
+async def run_cpu(fn, *args):
+    """Run CPU work on the bounded executor; callers beyond the core count wait on the loop"""
+    async with cpu_slots:
+        # Carry the request deadline (a context variable) over to the executor thread
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(cpu_executor, context.run, fn, *args)
+
+async def _predict_uncached(ingested, image_id=None):
+    """Preprocess on the executor, then await the micro-batcher without blocking a thread"""
+    classifier = api.classifier
+    if deadline_passed(stage='decode'):
+        return deadline_exceeded_result('decode')
+    try:
+        duplicate, image_tensor, image_hash = await run_cpu(api.prepare_model_input, ingested.image, image_id)
+    except Exception as e:
+        return classifier._error_result(e)
+    if duplicate is not None:
+        return duplicate
+    result = await asyncio.wrap_future(api.inference_batcher.submit(image_tensor, deadline=current_deadline()))
+    api.remember_prediction(image_hash, image_id, result)
+    return result
+
+async def run_prediction_async(ingested):
+    """
+    Async counterpart of disaster_api.run_prediction: the result cache's
+    single-flight, shared with batch requests and jobs, awaited without a thread
+    """
+    cache = api.classifier.result_cache
+    if not api.tracks_image_ids():
+        return await _predict_uncached(ingested)
+
+    key, image_id = await run_cpu(api.image_id_for, ingested.image_bytes)
+    if cache is None:
+        return await _predict_uncached(ingested, image_id)
+
+    while True:
+        status, claim = cache.claim(key)
+        if status == 'hit':
+            claim['cache'] = 'hit'
+            return claim
+        if status == 'miss':
+            break
+        try:
+            result = copy.deepcopy(await asyncio.shield(asyncio.wrap_future(claim)))
+        except Exception:
+            # The owner's request failed (error, expired deadline); compute this one's own result
+            continue
+        result['cache'] = 'coalesced'
+        return result
+
+    try:
+        result = await _predict_uncached(ingested, image_id)
+    except BaseException as e:
+        # Cancellation (client gone) too: waiters must not hang on an unsettled claim
+        cache.complete(key, claim, error=e if isinstance(e, Exception) else CoalescedComputationFailed('Request cancelled'))
+        raise
+    cache.complete(key, claim, result)
+    result['cache'] = 'miss'
+    return result
+
+async def _json_body(request):
+    """Read and parse a JSON body on the event loop"""
+    body = await request.body()
+    with metrics.stage('json_parse'):
+        return json.loads(body or b'null')
+
+def _respond(state):
+    return JSONResponse(state['response'], status_code=state['http_status'])
+
+async def prometheus_metrics(request):
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+async def health_check(request):
+    return JSONResponse(api.health_status())
+
+async def liveness_check(request):
+    return JSONResponse(api.liveness_status())
+
+async def readiness_check(request):
+    body, status = api.readiness_status()
+    return JSONResponse(body, status_code=status)
+
+async def get_model_info(request):
+    return JSONResponse(api.model_info())
+
+async def verify_disaster(request):
+    try:
+        data = await _json_body(request)
+        state = await run_cpu(api.prepare_verify_disaster, data)
+        if 'response' in state:
+            return _respond(state)
+
+        prediction_result = await run_prediction_async(state['ingested'])
+        body, status = api.finish_verify_disaster(prediction_result, state)
+        return JSONResponse(body, status_code=status)
+
+    except Exception as e:
+        logger.error(f"Error in verify_disaster: {e}")
+        return JSONResponse({
+            'success': False,
+            'error': 'PROCESSING_ERROR',
+            'message': str(e)
+        }, status_code=500)
+
+async def verify_disaster_path(request):
+    try:
+        data = await _json_body(request)
+        # The file read (or mmap) happens on the executor with the header parse
+        state = await run_cpu(api.prepare_verify_disaster_path, data)
+        if 'response' in state:
+            return _respond(state)
+
+        prediction_result = await run_prediction_async(state['ingested'])
+        body, status = api.finish_verify_disaster(prediction_result, state)
+        return JSONResponse(body, status_code=status)
+
+    except Exception as e:
+        logger.error(f"Error in verify_disaster_path: {e}")
+        return JSONResponse({
+            'success': False,
+            'error': 'PROCESSING_ERROR',
+            'message': str(e)
+        }, status_code=500)
+
+async def predict_disaster_authenticity(request):
+    try:
+        form = await request.form()
+        image_file = form.get('image')
+        if isinstance(image_file, UploadFile):
+            image_bytes, filename = await image_file.read(), image_file.filename
+        else:
+            image_bytes, filename = None, None
+
+        state = await run_cpu(api.prepare_predict_upload, image_bytes, filename)
+        if 'response' in state:
+            return _respond(state)
+
+        result = await run_prediction_async(state['ingested'])
+        body, status = api.finish_prediction(result, state)
+        return JSONResponse(body, status_code=status)
+
+    except Exception as e:
+        logger.error(f"Unexpected error in prediction: {e}")
+        return JSONResponse({
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }, status_code=500)
+
+async def predict_from_base64(request):
+    try:
+        data = await _json_body(request)
+        state = await run_cpu(api.prepare_predict_base64, data)
+        if 'response' in state:
+            return _respond(state)
+
+        result = await run_prediction_async(state['ingested'])
+        body, status = api.finish_prediction(result, state)
+        return JSONResponse(body, status_code=status)
+
+    except Exception as e:
+        logger.error(f"Error in base64 prediction: {e}")
+        return JSONResponse({
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }, status_code=500)
+
+async def verify_disaster_binary(request):
+    try:
+        state = api.check_binary_request(request.headers, verify_style=True)
+        if state is None:
+            image_bytes = await request.body()
+            state = await run_cpu(api.prepare_verify_disaster_binary, image_bytes, request.headers)
+        if 'response' in state:
+            return _respond(state)
+
+        prediction_result = await run_prediction_async(state['ingested'])
+        body, status = api.finish_verify_disaster(prediction_result, state)
+        return JSONResponse(body, status_code=status)
+
+    except Exception as e:
+        logger.error(f"Error in verify_disaster_binary: {e}")
+        return JSONResponse({
+            'success': False,
+            'error': 'PROCESSING_ERROR',
+            'message': str(e)
+        }, status_code=500)
+
+async def predict_from_binary(request):
+    try:
+        state = api.check_binary_request(request.headers, verify_style=False)
+        if state is None:
+            image_bytes = await request.body()
+            state = await run_cpu(api.prepare_predict_binary, image_bytes)
+        if 'response' in state:
+            return _respond(state)
+
+        result = await run_prediction_async(state['ingested'])
+        body, status = api.finish_prediction(result, state)
+        return JSONResponse(body, status_code=status)
+
+    except Exception as e:
+        logger.error(f"Error in binary prediction: {e}")
+        return JSONResponse({
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }, status_code=500)
+
+async def similar_submissions(request):
+    try:
+        if request.headers.get('content-type', '').startswith('multipart/form-data'):
+            form = await request.form()
+            image_file = form.get('image')
+            image_bytes = await image_file.read() if isinstance(image_file, UploadFile) else None
+            state = await run_cpu(api.prepare_similar, api.ingest_image_bytes, image_bytes, form.get('k'))
+        else:
+            data = await _json_body(request)
+            data = data if isinstance(data, dict) else {}
+            state = await run_cpu(api.prepare_similar, api.ingest_base64_image, data.get('image'), data.get('k'))
+        if 'response' in state:
+            return _respond(state)
+
+        if deadline_passed(stage='decode'):
+            result = deadline_exceeded_result('decode')
+        else:
+            image_tensor = await run_cpu(api.prepare_embedding_input, state['ingested'].image)
+            result = await asyncio.wrap_future(api.inference_batcher.submit(image_tensor, deadline=current_deadline()))
+        body, status = await run_cpu(api.finish_similar, result, state)
+        return JSONResponse(body, status_code=status)
+
+    except Exception as e:
+        logger.error(f"Error in similarity search: {e}")
+        return JSONResponse({
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }, status_code=500)
+
+async def _read_batch_items(request):
+    """Collect batch entries from multipart 'images' files or a JSON body"""
+    if request.headers.get('content-type', '').startswith('multipart/form-data'):
+        form = await request.form()
+        files = []
+        for image_file in form.getlist('images'):
+            if isinstance(image_file, UploadFile):
+                files.append((image_file.filename, await image_file.read()))
+        return api.batch_items_from_files(files)
+
+    try:
+        data = await _json_body(request)
+    except ValueError:
+        data = None
+    return api.batch_items_from_json(data if isinstance(data, dict) else None)
+
+async def _load_and_predict(load_item, items):
+    loaded_items = await asyncio.gather(*(run_cpu(load_item, item) for item in items))
+    batch_size = await run_cpu(api.predict_loaded_items, loaded_items)
+    return loaded_items, batch_size
+
+async def _run_batch(request, load_item, verify_style):
+    """Decode every image in parallel on the executor, then score them through the micro-batcher"""
+    items = await _read_batch_items(request)
+    rejection = api.prepare_batch(items, verify_style)
+    if rejection:
+        return None, rejection
+
+    # Shielded: once images are claimed in the result cache, a client disconnect
+    # must not strand identical requests waiting on them
+    return await asyncio.shield(_load_and_predict(load_item, items)), None
+
+async def predict_batch(request):
+    try:
+        outcome, rejection = await _run_batch(request, api.load_predict_item, verify_style=False)
+        if rejection:
+            return _respond(rejection)
+        return JSONResponse(api.finish_predict_batch(*outcome))
+
+    except Exception as e:
+        logger.error(f"Error in batch prediction: {e}")
+        return JSONResponse({
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }, status_code=500)
+
+async def verify_disaster_batch(request):
+    try:
+        outcome, rejection = await _run_batch(request, api.load_verify_item, verify_style=True)
+        if rejection:
+            return _respond(rejection)
+        return JSONResponse(api.finish_verify_disaster_batch(*outcome))
+
+    except Exception as e:
+        logger.error(f"Error in verify_disaster_batch: {e}")
+        return JSONResponse({
+            'success': False,
+            'error': 'PROCESSING_ERROR',
+            'message': str(e)
+        }, status_code=500)
+
+async def submit_job_request(request):
+    try:
+        if request.headers.get('content-type', '').startswith('multipart/form-data'):
+            items = await _read_batch_items(request)
+            options = await request.form()
+        else:
+            try:
+                data = await _json_body(request)
+            except ValueError:
+                data = None
+            options = data if isinstance(data, dict) else {}
+            items = api.batch_items_from_json(options)
+        state = await run_cpu(api.submit_job, items, options.get('kind'), options.get('callback_url'))
+        return JSONResponse(state['response'], status_code=state['http_status'], headers=state.get('headers'))
+
+    except Exception as e:
+        logger.error(f"Error submitting job: {e}")
+        return JSONResponse({
+            'success': False,
+            'error': 'PROCESSING_ERROR',
+            'message': str(e)
+        }, status_code=500)
+
+async def get_job(request):
+    """
+    Long-polls with asyncio.sleep between status reads, so a waiting client
+    holds no executor thread; each SQLite read itself runs on the executor.
+    """
+    try:
+        wait = api.job_wait_seconds(request.query_params.get('wait'))
+    except ValueError:
+        return JSONResponse({'success': False, 'error': 'INVALID_WAIT', 'message': 'wait must be a number of seconds'},
+                            status_code=400)
+
+    deadline = time.monotonic() + wait
+    while True:
+        state = await run_cpu(api.job_status, request.path_params['job_id'])
+        if api.job_finished(state) or time.monotonic() >= deadline:
+            return _respond(state)
+        await asyncio.sleep(min(0.25, deadline - time.monotonic()))
+
+routes = [
+    Route('/health', health_check, methods=['GET']),
+    Route('/health/live', liveness_check, methods=['GET']),
+    Route('/health/ready', readiness_check, methods=['GET']),
+    Route('/verify_disaster', verify_disaster, methods=['POST']),
+    Route('/predict', predict_disaster_authenticity, methods=['POST']),
+    Route('/predict_base64', predict_from_base64, methods=['POST']),
+    Route('/verify_disaster_binary', verify_disaster_binary, methods=['POST']),
+    Route('/predict_binary', predict_from_binary, methods=['POST']),
+    Route('/predict_batch', predict_batch, methods=['POST']),
+    Route('/verify_disaster_batch', verify_disaster_batch, methods=['POST']),
+    Route('/verify_disaster_path', verify_disaster_path, methods=['POST']),
+    Route('/similar', similar_submissions, methods=['POST']),
+    Route('/jobs', submit_job_request, methods=['POST']),
+    Route('/jobs/{job_id}', get_job, methods=['GET']),
+    Route('/model_info', get_model_info, methods=['GET']),
+    Route('/metrics', prometheus_metrics, methods=['GET'])
+]
+
+class RequestMetricsMiddleware:
+    """Per-endpoint request counters and latency plus the in-flight gauge (plain ASGI, no body buffering)"""
+
+    endpoints = {route.path for route in routes}
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = scope['path'] if scope['path'] in self.endpoints else 'unmatched'
+        if scope['path'].startswith('/jobs/'):
+            endpoint = '/jobs/<job_id>'  # same label as the Flask rule
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        start = time.perf_counter()
+        metrics.IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.IN_FLIGHT.dec()
+            metrics.record_request(endpoint, status, time.perf_counter() - start)
+
+class AdmissionMiddleware:
+    """Shed prediction requests beyond the admission limit with 503; start the deadline of admitted ones"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] not in api.ADMISSION_CONTROLLED_ENDPOINTS:
+            await self.app(scope, receive, send)
+            return
+
+        if not api.admission.try_admit():
+            metrics.REQUESTS_SHED.inc(endpoint=scope['path'])
+            body, headers = api.overload_rejection()
+            await JSONResponse(body, status_code=503, headers=headers)(scope, receive, send)
+            return
+
+        token = start_deadline(Headers(scope=scope), api.DEFAULT_REQUEST_TIMEOUT_MS)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            end_deadline(token)
+            api.admission.release()
+
+app = Starlette(
+    routes=routes,
+    middleware=[
+        Middleware(RequestMetricsMiddleware),
+        Middleware(AdmissionMiddleware),
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])
+    ]
+)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("Starting DisasterLink ML API (async mode)...")
+    print(f"CPU executor workers: {CPU_WORKERS}")
+    print("Routes and responses match disaster_api.py")
+
+    uvicorn.run(
+        app,
+        host='0.0.0.0',
+        port=5000,
+        backlog=api.serving_config.get('async_backlog', 4096),
+        timeout_keep_alive=30
+    )
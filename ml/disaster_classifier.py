@@ -0,0 +1,419 @@
+"""
+DisasterLink ML - Disaster Image Classifier
+ResNet50 authenticity model and inference wrapper used by the web API.
+Kept separate from disaster_api.py so the API can start before torch is imported.
+"""
+
+import inspect
+import numpy as np
+import torch
+import torch.nn as nn
+import torchvision.models as models
+import logging
+import threading
+import time
+from prediction_cache import PredictionCache
+from image_ingestion import reduce_for_model, MODEL_INPUT_SIZE
+from preprocessing import InputBufferPool, resize_to_uint8
+from inference_backends import BACKENDS, load_torchscript_model
+from quantization import load_quantized_model
+import serving_metrics as metrics
+
+logger = logging.getLogger(__name__)
+
+# Penultimate activations usable as image embeddings: width -> index of the ReLU in backbone.fc producing them
+EMBEDDING_LAYERS = {512: 2, 128: 5}
+
+class DisasterAuthenticityModel(nn.Module):
+    """Model class matching the training script"""
+    def __init__(self, num_classes=2):
+        super(DisasterAuthenticityModel, self).__init__()
+        self.backbone = models.resnet50(pretrained=False)
+        num_features = self.backbone.fc.in_features
+        self.backbone.fc = nn.Sequential(
+            nn.Dropout(0.5),
+            nn.Linear(num_features, 512),
+            nn.ReLU(inplace=True),
+            nn.Dropout(0.3),
+            nn.Linear(512, 128),
+            nn.ReLU(inplace=True),
+            nn.Linear(128, num_classes)
+        )
+        
+    def forward(self, x):
+        return self.backbone(x)
+
+class EfficientNetModel(nn.Module):
+    """Cascade screener matching the training script's EfficientNet-B0"""
+    def __init__(self, num_classes=2):
+        super(EfficientNetModel, self).__init__()
+        self.backbone = models.efficientnet_b0(pretrained=False)
+        self.backbone.classifier = nn.Sequential(
+            nn.Dropout(0.4),
+            nn.Linear(1280, 256),
+            nn.ReLU(),
+            nn.Dropout(0.2),
+            nn.Linear(256, num_classes)
+        )
+        
+    def forward(self, x):
+        return self.backbone(x)
+
+class MobileNetModel(nn.Module):
+    """Distilled student matching the training script's MobileNetV3-Large"""
+    def __init__(self, num_classes=2):
+        super(MobileNetModel, self).__init__()
+        self.backbone = models.mobilenet_v3_large(pretrained=False)
+        self.backbone.classifier = nn.Sequential(
+            nn.Linear(960, 256),
+            nn.Hardswish(),
+            nn.Dropout(0.2),
+            nn.Linear(256, num_classes)
+        )
+        
+    def forward(self, x):
+        return self.backbone(x)
+
+# Checkpoint 'model_type' -> architecture
+MODEL_CLASSES = {
+    'resnet50': DisasterAuthenticityModel,
+    'efficientnet': EfficientNetModel,
+    'mobilenet': MobileNetModel
+}
+
+def model_class_for(checkpoint, default='resnet50'):
+    """Architecture of a trainer checkpoint (ResNet50 teacher, EfficientNet screener or distilled student)"""
+    model_type = checkpoint.get('model_type', default)
+    if model_type not in MODEL_CLASSES:
+        raise ValueError(f"Unknown model type '{model_type}' (expected one of {', '.join(MODEL_CLASSES)})")
+    return MODEL_CLASSES[model_type]
+
+def build_model_from_state_dict(state_dict, model_class=DisasterAuthenticityModel):
+    """
+    Build a model (DisasterAuthenticityModel by default) directly from checkpoint weights.
+    On torch >= 2.1 the module is created on the meta device, so ResNet50's
+    random weight initialisation is skipped and the checkpoint tensors are used as-is.
+    """
+    if 'assign' in inspect.signature(nn.Module.load_state_dict).parameters:
+        with torch.device('meta'):
+            model = model_class()
+        model.load_state_dict(state_dict, assign=True)
+    else:
+        model = model_class()
+        model.load_state_dict(state_dict)
+    return model
+
+class FullModelInput:
+    """Preprocessed image the cascade screener must not decide: the caller needs the full model's embedding"""
+    __slots__ = ('image',)
+
+    def __init__(self, image):
+        self.image = image
+
+class DisasterImageClassifier:
+    def __init__(self, model_path='disaster_authenticity_model.pth', cache_config=None, reduced_decode=True,
+                 backend='eager', backend_cache_dir='compiled_models',
+                 quantized_model_path='disaster_authenticity_model_int8.pt', cascade_config=None,
+                 backend_check_images='torchscript_check_images'):
+        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+        self.backend = 'eager'
+        
+        # INT8 models are self-contained TorchScript files exported by the trainer (CPU only)
+        if backend == 'int8':
+            try:
+                self.device = torch.device('cpu')
+                self.model, metadata = load_quantized_model(quantized_model_path)
+                self.model_type = metadata.get('model_type', 'resnet50')
+                self.model_version = f"{metadata.get('model_version', '1.0')}-int8"
+                self.backend = 'int8'
+                logger.info(f"INT8 model loaded ({metadata.get('quantization', 'unknown')} quantization, "
+                            f"test accuracy {metadata.get('int8_accuracy', 0):.2f}%)")
+            except Exception as e:
+                logger.error(f"Error loading quantized model: {e}")
+                raise
+        else:
+            # Load trained model
+            try:
+                checkpoint = torch.load(model_path, map_location=self.device)
+                self.model = build_model_from_state_dict(checkpoint['model_state_dict'], model_class_for(checkpoint))
+                self.model_type = checkpoint.get('model_type', 'resnet50')
+                self.model_version = str(checkpoint.get('model_version', '1.0'))
+                self.model.eval()
+                # Channels-last weights match the pooled channels-last inputs (faster convolutions at batch sizes > 1)
+                self.model.to(self.device, memory_format=torch.channels_last)
+                logger.info(f"Model loaded successfully on {self.device} ({self.model_type})")
+            except Exception as e:
+                logger.error(f"Error loading model: {e}")
+                raise
+        
+        # Optionally swap the eager module for a frozen, fused TorchScript graph (CPU only)
+        if backend == 'torchscript':
+            if self.device.type != 'cpu':
+                logger.warning("TorchScript backend targets CPU inference, using eager on GPU")
+            else:
+                compiled = load_torchscript_model(self.model, model_path, cache_dir=backend_cache_dir,
+                                                  check_images=backend_check_images)
+                if compiled is not None:
+                    self.model = compiled
+                    self.backend = 'torchscript'
+        logger.info(f"Inference backend: {self.backend}")
+        
+        # Batch input buffers; images are normalized into them when their batch runs
+        self.input_size = MODEL_INPUT_SIZE
+        self.input_pool = InputBufferPool(MODEL_INPUT_SIZE)
+        
+        self.classes = ['fake', 'real']
+        
+        # Cascade: a small screener scores every image, the full model only those in its uncertainty band
+        self.screener = None
+        self.cascade_band = None
+        self._cascade_counts = {'screener': 0, 'full_model': 0}
+        self._cascade_lock = threading.Lock()
+        cascade_config = cascade_config or {}
+        if cascade_config.get('enabled', False):
+            self._load_screener(cascade_config.get('screener_model_path', 'disaster_screener_model.pth'),
+                                cascade_config.get('band'))
+        
+        # Set by enable_embeddings(); forward passes then also return the penultimate activations
+        self.embedding_dim = None
+        self._captured = threading.local()
+        
+        # Decode JPEGs at reduced resolution (DCT scaling) when they are far larger than 224x224
+        self.reduced_decode = reduced_decode
+        
+        # Result cache keyed on raw image bytes + model version
+        cache_config = cache_config or {}
+        self.result_cache = None
+        if cache_config.get('enabled', True):
+            self.result_cache = PredictionCache(
+                max_entries=cache_config.get('max_entries', 10000),
+                max_memory_mb=cache_config.get('max_memory_mb', 64),
+                ttl_seconds=cache_config.get('ttl_seconds', 3600)
+            )
+        
+    def cache_key(self, image_bytes):
+        """Result cache key for the raw bytes of an uploaded image"""
+        return PredictionCache.make_key(image_bytes, self.model_version)
+    
+    def preprocess_image(self, image):
+        """
+        Preprocess image for model input: an RGB uint8 (224, 224, 3) array.
+        Float conversion and normalization happen in predict_preprocessed.
+        """
+        try:
+            # Decode straight to the smallest scale still covering the model input
+            if self.reduced_decode:
+                image = reduce_for_model(image, MODEL_INPUT_SIZE)
+            
+            return resize_to_uint8(image, MODEL_INPUT_SIZE)
+        except Exception as e:
+            logger.error(f"Error preprocessing image: {e}")
+            raise
+    
+    def predict(self, image):
+        """Predict if disaster image is real or fake"""
+        try:
+            # Preprocess image
+            image_tensor = self.preprocess_image(image)
+        except Exception as e:
+            logger.error(f"Error during prediction: {e}")
+            return self._error_result(e)
+        
+        return self.predict_preprocessed([image_tensor])[0]
+    
+    def _load_screener(self, screener_path, band=None):
+        """Load the screener and its uncertainty band (calibrated by the trainer unless configured)"""
+        checkpoint = torch.load(screener_path, map_location=self.device)
+        self.screener = build_model_from_state_dict(checkpoint['model_state_dict'],
+                                                    model_class_for(checkpoint, default='efficientnet'))
+        self.screener.eval()
+        self.screener.to(self.device, memory_format=torch.channels_last)
+        
+        band = band or checkpoint.get('cascade', {}).get('band')
+        if not band:
+            raise ValueError(f"No uncertainty band in {screener_path}; calibrate it with the trainer or set cascade.band")
+        self.cascade_band = (float(band[0]), float(band[1]))
+        logger.info(f"Cascade screener loaded from {screener_path}; escalating P(real) in "
+                    f"[{self.cascade_band[0]:.3f}, {self.cascade_band[1]:.3f}] to the full model")
+    
+    def enable_embeddings(self, dim=128):
+        """
+        Capture the dim-wide penultimate activations (512 or 128) of every
+        forward pass and return them as 'embedding' with each result.
+        Needs the eager backend: traced and quantized graphs do not expose them.
+        """
+        if dim not in EMBEDDING_LAYERS:
+            raise ValueError(f"Embedding width must be one of {', '.join(map(str, EMBEDDING_LAYERS))}")
+        if self.backend != 'eager':
+            logger.warning(f"Embeddings need the eager backend, not available with '{self.backend}'")
+            return False
+        if not isinstance(self.model, DisasterAuthenticityModel):
+            logger.warning(f"Embeddings need the ResNet50 head, not available with a {self.model_type} model")
+            return False
+        self.model.backbone.fc[EMBEDDING_LAYERS[dim]].register_forward_hook(self._capture_embedding)
+        self.embedding_dim = dim
+        return True
+    
+    def _capture_embedding(self, module, inputs, output):
+        # Thread-local: predict_preprocessed may also be called directly (warm-up, benchmarks) next to the micro-batcher
+        self._captured.embeddings = output.detach().cpu().numpy().copy()
+    
+    def full_model_input(self, image_tensor):
+        """Mark a preprocessed image for the full model even in cascade mode, so it gets an embedding"""
+        return FullModelInput(image_tensor) if self.screener is not None else image_tensor
+    
+    def _forward(self, model, batch):
+        """Softmax probabilities of one model over a batch"""
+        return torch.softmax(model(batch), dim=1).cpu().numpy()
+    
+    def predict_preprocessed(self, image_tensors, count_decisions=True):
+        """
+        Run one forward pass over a list of preprocessed images (preprocess_image
+        arrays, or float (1, C, H, W) tensors). They are normalized into a pooled
+        channels-last buffer instead of being stacked into a new tensor.
+        In cascade mode the screener scores the whole batch and only images in
+        its uncertainty band go through the full model; count_decisions=False
+        keeps the pass out of the cascade statistics (warm-up). Images wrapped
+        in FullModelInput always go through the full model.
+        """
+        forced = {index for index, image in enumerate(image_tensors) if isinstance(image, FullModelInput)}
+        batch_buffer = self.input_pool.acquire(len(image_tensors))
+        try:
+            # Make prediction
+            with torch.inference_mode():
+                for index, image in enumerate(image_tensors):
+                    self.input_pool.fill(batch_buffer, index, image.image if index in forced else image)
+                batch = batch_buffer[:len(image_tensors)].to(self.device)
+                
+                start_time = time.time()
+                if self.screener is None:
+                    escalated = list(range(len(image_tensors)))
+                    probabilities = np.empty((len(image_tensors), len(self.classes)), dtype=np.float32)
+                else:
+                    with metrics.stage('screening'):
+                        probabilities = self._forward(self.screener, batch)
+                    low, high = self.cascade_band
+                    in_band = np.flatnonzero((probabilities[:, 1] >= low) & (probabilities[:, 1] <= high)).tolist()
+                    escalated = sorted(forced.union(in_band))
+                
+                if escalated:
+                    full_batch = batch[escalated] if len(escalated) < len(image_tensors) else batch
+                    probabilities[escalated] = self._forward(self.model, full_batch)
+                prediction_time = time.time() - start_time
+                
+                predicted_indices = probabilities.argmax(axis=1)
+            
+            decided_by = ['screener'] * len(image_tensors)
+            for index in escalated:
+                decided_by[index] = 'full_model'
+            if self.screener is not None and count_decisions:
+                # Forced images say nothing about the band; count only the screener's own decisions
+                screened = len(image_tensors) - len(escalated)
+                self._count_decisions(screened, len(image_tensors) - len(forced) - screened)
+            
+            results = []
+            for confidence_scores, predicted_class_idx, stage in zip(probabilities, predicted_indices, decided_by):
+                predicted_class = self.classes[predicted_class_idx]
+                results.append({
+                    'prediction': predicted_class,
+                    'confidence': float(confidence_scores[predicted_class_idx]),
+                    'probabilities': {
+                        'fake': float(confidence_scores[0]),
+                        'real': float(confidence_scores[1])
+                    },
+                    'prediction_time': prediction_time,
+                    'decided_by': stage,
+                    'model_version': self.model_version,
+                    'status': 'success'
+                })
+            if self.embedding_dim and escalated:
+                # Only the full model produces embeddings
+                for index, embedding in zip(escalated, self._captured.embeddings):
+                    results[index]['embedding'] = embedding
+            return results
+                
+        except Exception as e:
+            logger.error(f"Error during prediction: {e}")
+            return [self._error_result(e) for _ in image_tensors]
+        finally:
+            self.input_pool.release(batch_buffer)
+    
+    def _count_decisions(self, screened, escalated):
+        metrics.CASCADE_DECISIONS.inc(screened, stage='screener')
+        metrics.CASCADE_DECISIONS.inc(escalated, stage='full_model')
+        with self._cascade_lock:
+            self._cascade_counts['screener'] += screened
+            self._cascade_counts['full_model'] += escalated
+    
+    def get_cascade_stats(self):
+        """Screener / full model decision counts for /health; None when the cascade is off"""
+        if self.screener is None:
+            return None
+        with self._cascade_lock:
+            counts = dict(self._cascade_counts)
+        total = counts['screener'] + counts['full_model']
+        return {
+            'band': list(self.cascade_band),
+            'decided_by_screener': counts['screener'],
+            'decided_by_full_model': counts['full_model'],
+            'escalation_rate': counts['full_model'] / total if total else 0.0
+        }
+    
+    def set_num_threads(self, num_threads, num_interop_threads=None):
+        """Pin torch intra-op (and optionally inter-op) threads for this process"""
+        torch.set_num_threads(num_threads)
+        if num_interop_threads:
+            try:
+                torch.set_num_interop_threads(num_interop_threads)
+            except RuntimeError as e:
+                # Only allowed once, before any inter-op parallel work has started
+                logger.warning(f"Could not set inter-op threads: {e}")
+    
+    def get_thread_info(self):
+        """Active thread configuration, reported by /model_info"""
+        return {
+            'intra_op_threads': torch.get_num_threads(),
+            'inter_op_threads': torch.get_num_interop_threads()
+        }
+    
+    def share_weights(self):
+        """
+        Move parameters and buffers into shared memory so processes forked
+        afterwards map the same physical pages instead of copying them.
+        Returns the number of bytes shared (0 for frozen TorchScript graphs,
+        whose weights are graph constants left copy-on-write after fork).
+        """
+        self.model.share_memory()
+        tensors = list(self.model.parameters()) + list(self.model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    
+    def warmup(self, batch_sizes=(1,), iterations=3):
+        """
+        Run dummy forward passes at the serving batch sizes so the allocator and
+        CPU kernels are initialised before the first real request.
+        Returns the average time per pass for each batch size.
+        """
+        timings = {}
+        for batch_size in batch_sizes:
+            dummy = [np.zeros((*MODEL_INPUT_SIZE[::-1], 3), dtype=np.uint8)] * batch_size
+            start_time = time.perf_counter()
+            for _ in range(iterations):
+                self.predict_preprocessed(dummy, count_decisions=False)
+                if self.screener is not None:
+                    # Dummy inputs rarely escalate, so warm the full model explicitly
+                    with torch.inference_mode():
+                        self.model(torch.zeros(batch_size, 3, *MODEL_INPUT_SIZE[::-1], device=self.device)
+                                   .contiguous(memory_format=torch.channels_last))
+            timings[str(batch_size)] = (time.perf_counter() - start_time) / max(iterations, 1)
+            logger.info(f"Warm-up batch size {batch_size}: {timings[str(batch_size)] * 1000:.1f} ms/pass")
+        return timings
+    
+    def _error_result(self, error):
+        return {
+            'prediction': None,
+            'confidence': None,
+            'error': str(error),
+            'status': 'error'
+        }
@@ -3,8 +3,13 @@ DisasterLink - Real vs Fake Disaster Image Classification Model
 Using pre-trained models optimized for web deployment
 """
 
+import copy
+import hashlib
+import inspect
+import os
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import torch.optim as optim
 from torch.utils.data import Dataset, DataLoader
 import torchvision.transforms as transforms
@@ -14,13 +19,25 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
+from datetime import datetime
 from sklearn.metrics import classification_report, confusion_matrix
 import matplotlib.pyplot as plt
 import seaborn as sns
 from tqdm import tqdm
+from quantization import (quantize_static, quantize_dynamic_head, to_torchscript, serialized_size,
+                          measure_latency, save_quantized_model, default_quantized_engine)
 import warnings
 warnings.filterwarnings('ignore')
 
+# Preprocessing contract shared by every exported model (see model_config_web.json)
+WEB_PREPROCESSING = {
+    "resize": [224, 224],
+    "normalize": {
+        "mean": [0.485, 0.456, 0.406],
+        "std": [0.229, 0.224, 0.225]
+    }
+}
+
 class DisasterDataset(Dataset):
     def __init__(self, dataframe, root_dir=None, transform=None):
         self.dataframe = dataframe.reset_index(drop=True)
@@ -57,6 +74,18 @@ class DisasterDataset(Dataset):
             
         return image, torch.tensor(label, dtype=torch.long)
 
+class IndexedDataset(Dataset):
+    """Wraps a dataset so each sample also carries its index (to look up cached teacher logits)"""
+    def __init__(self, dataset):
+        self.dataset = dataset
+        
+    def __len__(self):
+        return len(self.dataset)
+    
+    def __getitem__(self, idx):
+        image, label = self.dataset[idx]
+        return image, label, idx
+
 class DisasterAuthenticityModel(nn.Module):
     """
     ResNet50-based model for disaster image authenticity classification
@@ -103,11 +132,85 @@ class EfficientNetModel(nn.Module):
     def forward(self, x):
         return self.backbone(x)
 
+class MobileNetModel(nn.Module):
+    """
+    MobileNetV3-Large student for knowledge distillation,
+    the cheapest of the backbones here on CPU
+    """
+    def __init__(self, num_classes=2, pretrained=True):
+        super(MobileNetModel, self).__init__()
+        
+        self.backbone = models.mobilenet_v3_large(pretrained=pretrained)
+        self.backbone.classifier = nn.Sequential(
+            nn.Linear(960, 256),
+            nn.Hardswish(),
+            nn.Dropout(0.2),
+            nn.Linear(256, num_classes)
+        )
+        
+    def forward(self, x):
+        return self.backbone(x)
+
+def distillation_loss(student_logits, teacher_logits, target, temperature=4.0, alpha=0.7):
+    """
+    Knowledge distillation loss (Hinton et al.): alpha * T^2 * KL divergence between
+    the temperature-softened teacher and student distributions, plus
+    (1 - alpha) * cross-entropy on the hard labels
+    """
+    soft = F.kl_div(F.log_softmax(student_logits / temperature, dim=1),
+                    F.softmax(teacher_logits / temperature, dim=1), reduction='batchmean')
+    return alpha * temperature ** 2 * soft + (1 - alpha) * F.cross_entropy(student_logits, target)
+
+def training_run_version():
+    """
+    Model version for the artifacts of one training run (its start time). Serving keys
+    result caches and indices on it, so a retrained model never reuses old verdicts.
+    """
+    return datetime.now().strftime('%Y%m%d-%H%M%S')
+
+def calibrate_cascade_band(p_screen, screen_correct, full_correct, target_accuracy, grid=200):
+    """
+    Narrowest uncertainty band [low, high] on the screener's P(real) such that
+    escalating the images inside it to the full model reaches target_accuracy
+    (a fraction). The band always contains the screener's 0.5 decision
+    boundary. Returns (band, cascade accuracy, escalation rate), or None when
+    even escalating every image falls short.
+    """
+    order = np.argsort(p_screen)
+    p = np.asarray(p_screen)[order]
+    n = len(p)
+    prefix_screen = np.concatenate(([0], np.cumsum(np.asarray(screen_correct)[order])))
+    prefix_full = np.concatenate(([0], np.cumsum(np.asarray(full_correct)[order])))
+    
+    # Escalating sorted positions [i, j): candidate cuts at quantiles of the validation scores
+    cuts = np.unique(np.linspace(0, n, grid + 1).round().astype(int))
+    boundary = np.searchsorted(p, 0.5)
+    starts = np.append(cuts[cuts <= boundary], boundary)
+    ends = np.append(cuts[cuts >= boundary], boundary)
+    i, j = np.meshgrid(starts, ends, indexing='ij')
+    accuracy = (prefix_screen[i] + prefix_screen[n] - prefix_screen[j] + prefix_full[j] - prefix_full[i]) / n
+    escalation = (j - i) / n
+    
+    feasible = accuracy >= target_accuracy
+    if not feasible.any():
+        return None
+    # Least escalation first, then highest accuracy
+    candidates = np.flatnonzero(feasible.ravel())
+    best = candidates[np.lexsort((-accuracy.ravel()[candidates], escalation.ravel()[candidates]))[0]]
+    start, end = i.ravel()[best], j.ravel()[best]
+    
+    low = float((p[start - 1] + p[start]) / 2) if 0 < start < n else (0.0 if start == 0 else 1.0)
+    high = float((p[end - 1] + p[end]) / 2) if 0 < end < n else (1.0 if end == n else 0.0)
+    if start == end:
+        low = high = 0.5  # nothing escalated
+    return [low, high], float(accuracy.ravel()[best]), float(escalation.ravel()[best])
+
 class DisasterModelTrainer:
     def __init__(self, model_type='resnet50', device=None):
         self.device = device or torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.model_type = model_type
         self.training_history = {'train_loss': [], 'val_loss': [], 'train_acc': [], 'val_acc': []}
+        self.teacher_logits = None  # set by distill_model()
         
         print(f"🖥️  Using device: {self.device}")
         print(f"🤖 Model type: {model_type}")
@@ -121,6 +224,8 @@ class DisasterModelTrainer:
             except:
                 print("⚠️  EfficientNet not available, using ResNet50")
                 self.model = DisasterAuthenticityModel()
+        elif model_type == 'mobilenet':
+            self.model = MobileNetModel()
                 
         self.model.to(self.device)
         
@@ -157,6 +262,8 @@ class DisasterModelTrainer:
             except:
                 print("EfficientNet not available, using ResNet50")
                 self.model = DisasterAuthenticityModel()
+        elif model_type == 'mobilenet':
+            self.model = MobileNetModel()
                 
         self.model.to(self.device)
         
@@ -185,6 +292,7 @@ class DisasterModelTrainer:
         train_df = pd.read_csv(data_path / "train_dataset.csv")
         val_df = pd.read_csv(data_path / "val_dataset.csv")
         test_df = pd.read_csv(data_path / "test_dataset.csv")
+        self.train_df = train_df
         
         print(f"📊 Loaded CSV files successfully")
         print(f"   Train: {len(train_df)} samples")
@@ -215,14 +323,19 @@ class DisasterModelTrainer:
         correct = 0
         total = 0
         
-        pbar = tqdm(self.train_loader, desc=f'Epoch {epoch+1} Training')
+        loader = self.train_loader if self.teacher_logits is None else self.distill_loader
+        pbar = tqdm(loader, desc=f'Epoch {epoch+1} Training')
         
-        for batch_idx, (data, target) in enumerate(pbar):
-            data, target = data.to(self.device), target.to(self.device)
+        for batch_idx, batch in enumerate(pbar):
+            data, target = batch[0].to(self.device), batch[1].to(self.device)
             
             self.optimizer.zero_grad()
             output = self.model(data)
-            loss = self.criterion(output, target)
+            if self.teacher_logits is None:
+                loss = self.criterion(output, target)
+            else:
+                teacher_logits = self.teacher_logits[batch[2]].to(self.device)
+                loss = distillation_loss(output, teacher_logits, target, *self.distillation_params)
             loss.backward()
             self.optimizer.step()
             
@@ -235,7 +348,7 @@ class DisasterModelTrainer:
             acc = 100. * correct / total
             pbar.set_postfix({'Loss': f'{running_loss/(batch_idx+1):.4f}', 'Acc': f'{acc:.2f}%'})
         
-        return running_loss / len(self.train_loader), 100. * correct / total
+        return running_loss / len(loader), 100. * correct / total
     
     def validate(self):
         """Validate the model"""
@@ -258,8 +371,8 @@ class DisasterModelTrainer:
         
         return val_loss, val_acc
     
-    def train_model(self, num_epochs=20, learning_rate=0.001):
-        """Train the model"""
+    def train_model(self, num_epochs=20, learning_rate=0.001, checkpoint_path='best_disaster_model.pth'):
+        """Train the model, keeping the best epoch in checkpoint_path"""
         
         # Setup optimizer and loss
         self.optimizer = optim.Adam(self.model.parameters(), lr=learning_rate, weight_decay=1e-4)
@@ -302,7 +415,7 @@ class DisasterModelTrainer:
                     'optimizer_state_dict': self.optimizer.state_dict(),
                     'val_acc': val_acc,
                     'model_type': self.model_type
-                }, 'best_disaster_model.pth')
+                }, checkpoint_path)
                 print(f'New best model saved with validation accuracy: {val_acc:.2f}%')
         
         return {
@@ -351,17 +464,25 @@ class DisasterModelTrainer:
         
         return test_acc, report
     
-    def save_web_model(self, model_path='disaster_authenticity_model.pth'):
-        """Save model for web deployment"""
+    def save_web_model(self, model_path='disaster_authenticity_model.pth', checkpoint_path='best_disaster_model.pth',
+                       config_path='model_config_web.json', metadata=None, model_version='1.0'):
+        """
+        Save model for web deployment; config_path=None skips the web app configuration.
+        Written to a temporary file and renamed, so a serving API hot-reloading the
+        checkpoint never reads a partial file.
+        """
         
         # Load best model
-        checkpoint = torch.load('best_disaster_model.pth', map_location=self.device)
+        checkpoint = torch.load(checkpoint_path, map_location=self.device)
         self.model.load_state_dict(checkpoint['model_state_dict'])
         
         # Save for inference
+        temporary = f"{model_path}.{os.getpid()}.tmp"
         torch.save({
+            **(metadata or {}),
             'model_state_dict': self.model.state_dict(),
             'model_type': self.model_type,
+            'model_version': model_version,
             'input_size': [224, 224],
             'classes': ['fake', 'real'],
             'transforms': {
@@ -371,9 +492,12 @@ class DisasterModelTrainer:
                     'std': [0.229, 0.224, 0.225]
                 }
             }
-        }, model_path)
+        }, temporary)
+        os.replace(temporary, model_path)
         
         print(f"Web deployment model saved as: {model_path}")
+        if config_path is None:
+            return None
         
         # Save model configuration for web app
         config = {
@@ -384,13 +508,7 @@ class DisasterModelTrainer:
                 "confidence_threshold": 0.7,
                 "input_size": [224, 224, 3]
             },
-            "preprocessing": {
-                "resize": [224, 224],
-                "normalize": {
-                    "mean": [0.485, 0.456, 0.406],
-                    "std": [0.229, 0.224, 0.225]
-                }
-            },
+            "preprocessing": WEB_PREPROCESSING,
             "deployment": {
                 "framework": "pytorch",
                 "model_file": model_path,
@@ -399,13 +517,323 @@ class DisasterModelTrainer:
             }
         }
         
-        with open('model_config_web.json', 'w') as f:
+        with open(config_path, 'w') as f:
             json.dump(config, f, indent=2)
         
         return config
 
+    def export_onnx_model(self, onnx_path='disaster_authenticity_model.onnx', opset_version=17,
+                          model_version='1.0'):
+        """
+        Export the model as an ONNX graph with a dynamic batch dimension.
+        The preprocessing contract from model_config_web.json is embedded in the
+        file's metadata so ONNX Runtime servers can preprocess without torch.
+        """
+        import onnx
+        
+        model = copy.deepcopy(self.model).cpu().eval()
+        dummy_input = torch.randn(1, 3, 224, 224)
+        export_kwargs = {}
+        if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+            export_kwargs['dynamo'] = False  # TorchScript-based exporter handles dynamic_axes directly
+        
+        torch.onnx.export(
+            model, dummy_input, onnx_path,
+            input_names=['input'],
+            output_names=['logits'],
+            dynamic_axes={'input': {0: 'batch'}, 'logits': {0: 'batch'}},
+            opset_version=opset_version,
+            do_constant_folding=True,
+            **export_kwargs
+        )
+        
+        onnx_model = onnx.load(onnx_path)
+        metadata = {
+            'model_version': model_version,
+            'model_type': self.model_type,
+            'classes': json.dumps(['fake', 'real']),
+            'preprocessing': json.dumps(WEB_PREPROCESSING)
+        }
+        for key, value in metadata.items():
+            onnx_model.metadata_props.append(onnx.StringStringEntryProto(key=key, value=value))
+        onnx.checker.check_model(onnx_model)
+        onnx.save(onnx_model, onnx_path)
+        print(f"ONNX model saved as: {onnx_path}")
+        
+        # Record the ONNX contract next to the PyTorch deployment settings
+        config_path = Path('model_config_web.json')
+        config = json.loads(config_path.read_text()) if config_path.exists() else {}
+        config['onnx'] = {
+            "model_file": onnx_path,
+            "opset_version": opset_version,
+            "input": {"name": "input", "shape": ["batch", 3, 224, 224], "dtype": "float32", "layout": "NCHW"},
+            "output": {"name": "logits", "shape": ["batch", 2], "note": "apply softmax for probabilities"},
+            "preprocessing": WEB_PREPROCESSING
+        }
+        config_path.write_text(json.dumps(config, indent=2))
+        
+        return config['onnx']
+    
+    def _cpu_test_accuracy(self, model):
+        """Test-split accuracy (%) of a model evaluated on the CPU"""
+        correct = 0
+        total = 0
+        with torch.no_grad():
+            for data, target in tqdm(self.test_loader, desc='Testing (CPU)'):
+                pred = model(data).argmax(dim=1)
+                correct += (pred == target).sum().item()
+                total += target.size(0)
+        return 100. * correct / total
+    
+    def export_quantized_model(self, output_path='disaster_authenticity_model_int8.pt', mode='static',
+                               calibration_samples=512, max_accuracy_drop=1.0, model_version='1.0'):
+        """
+        Export an INT8 model for CPU serving.
+        Static quantization is calibrated on a sample of the training set; if it fails or
+        loses too much accuracy, dynamic quantization of the FC head is tried instead.
+        The model is only written when its test accuracy is within max_accuracy_drop
+        percentage points of the FP32 model.
+        """
+        print("🔢 Exporting INT8 model for CPU serving...")
+        fp32_model = copy.deepcopy(self.model).cpu().eval()
+        fp32_acc = self._cpu_test_accuracy(fp32_model)
+        engine = default_quantized_engine()
+        
+        report = {
+            'fp32': {
+                'accuracy': fp32_acc,
+                'latency_ms_batch1': measure_latency(fp32_model),
+                'size_mb': serialized_size(fp32_model) / 1024 / 1024
+            },
+            'max_accuracy_drop': max_accuracy_drop,
+            'attempts': [],
+            'published': None
+        }
+        
+        calibration_df = self.train_df.sample(n=min(calibration_samples, len(self.train_df)), random_state=42)
+        calibration_loader = DataLoader(DisasterDataset(calibration_df, transform=self.val_transform),
+                                        batch_size=32, shuffle=False, num_workers=0)
+        
+        modes = ['static', 'dynamic'] if mode == 'static' else ['dynamic']
+        for attempt in modes:
+            try:
+                if attempt == 'static':
+                    quantized = quantize_static(fp32_model, (data for data, _ in calibration_loader), engine)
+                else:
+                    quantized = quantize_dynamic_head(fp32_model)
+                scripted = to_torchscript(quantized)
+            except Exception as e:
+                print(f"⚠️  {attempt} quantization failed: {e}")
+                report['attempts'].append({'mode': attempt, 'error': str(e)})
+                continue
+            
+            int8_acc = self._cpu_test_accuracy(scripted)
+            result = {
+                'mode': attempt,
+                'accuracy': int8_acc,
+                'accuracy_drop': fp32_acc - int8_acc,
+                'latency_ms_batch1': measure_latency(scripted),
+                'size_mb': serialized_size(scripted) / 1024 / 1024
+            }
+            report['attempts'].append(result)
+            print(f"   {attempt}: accuracy {int8_acc:.2f}% (FP32 {fp32_acc:.2f}%), "
+                  f"latency {result['latency_ms_batch1']:.1f}ms (FP32 {report['fp32']['latency_ms_batch1']:.1f}ms), "
+                  f"size {result['size_mb']:.1f}MB (FP32 {report['fp32']['size_mb']:.1f}MB)")
+            
+            if result['accuracy_drop'] > max_accuracy_drop:
+                print(f"⚠️  {attempt} quantization drops accuracy by {result['accuracy_drop']:.2f} points "
+                      f"(max {max_accuracy_drop:.2f})")
+                continue
+            
+            save_quantized_model(scripted, output_path, {
+                'model_version': model_version,
+                'model_type': self.model_type,
+                'precision': 'int8',
+                'quantization': attempt,
+                'engine': engine,
+                'fp32_accuracy': fp32_acc,
+                'int8_accuracy': int8_acc
+            })
+            report['published'] = dict(result, path=output_path)
+            print(f"✅ INT8 model saved as: {output_path}")
+            print(f"   Latency: {report['fp32']['latency_ms_batch1'] / result['latency_ms_batch1']:.2f}x faster, "
+                  f"size: {report['fp32']['size_mb'] / result['size_mb']:.2f}x smaller")
+            break
+        else:
+            print("❌ No quantized model met the accuracy tolerance, INT8 model not published")
+        
+        with open('quantization_report.json', 'w') as f:
+            json.dump(report, f, indent=2)
+        
+        return report
+
+    def _split_probabilities(self, model, loader):
+        """P(real) and labels of a model over one data split"""
+        model.eval()
+        probabilities, targets = [], []
+        with torch.no_grad():
+            for data, target in loader:
+                output = model(data.to(self.device))
+                probabilities.append(torch.softmax(output, dim=1)[:, 1].cpu().numpy())
+                targets.append(target.numpy())
+        return np.concatenate(probabilities), np.concatenate(targets)
+    
+    def export_cascade_screener(self, screener_model, target_accuracy=0.94,
+                                screener_path='disaster_screener_model.pth', model_version='1.0'):
+        """
+        Calibrate the cascade for serving (serving.cascade): the screener's
+        uncertainty band is chosen on the validation split as the narrowest one
+        whose cascade accuracy reaches target_accuracy, then checked on the test
+        split. The band is stored in the screener checkpoint.
+        """
+        print(f"🪜 Calibrating cascade (target accuracy {target_accuracy * 100:.1f}%)...")
+        screener_model = screener_model.to(self.device)
+        report = {'target_accuracy': target_accuracy}
+        splits = {}
+        for split, loader in (('val', self.val_loader), ('test', self.test_loader)):
+            p_screen, targets = self._split_probabilities(screener_model, loader)
+            p_full, _ = self._split_probabilities(self.model, loader)
+            splits[split] = (p_screen, (p_screen > 0.5) == targets, (p_full > 0.5) == targets)
+        
+        p_screen, screen_correct, full_correct = splits['val']
+        report['val'] = {
+            'screener_accuracy': float(screen_correct.mean()),
+            'full_model_accuracy': float(full_correct.mean())
+        }
+        calibration = calibrate_cascade_band(p_screen, screen_correct, full_correct, target_accuracy)
+        if calibration is None:
+            print(f"⚠️  Target accuracy not reachable (full model alone: {full_correct.mean() * 100:.2f}%), "
+                  f"escalating every image")
+            band = [0.0, 1.0]
+        else:
+            band, cascade_acc, escalation = calibration
+            report['val'].update({'cascade_accuracy': cascade_acc, 'escalation_rate': escalation})
+        report['band'] = band
+        
+        # Held-out check of the calibrated band
+        p_screen, screen_correct, full_correct = splits['test']
+        escalated = (p_screen >= band[0]) & (p_screen <= band[1])
+        report['test'] = {
+            'screener_accuracy': float(screen_correct.mean()),
+            'full_model_accuracy': float(full_correct.mean()),
+            'cascade_accuracy': float(np.where(escalated, full_correct, screen_correct).mean()),
+            'escalation_rate': float(escalated.mean())
+        }
+        
+        screener_cpu = copy.deepcopy(screener_model).cpu().eval()
+        report['latency_ms_batch1'] = {
+            'screener': measure_latency(screener_cpu),
+            'full_model': measure_latency(copy.deepcopy(self.model).cpu().eval())
+        }
+        report['expected_latency_ms_batch1'] = (report['latency_ms_batch1']['screener']
+                                                + report['test']['escalation_rate'] * report['latency_ms_batch1']['full_model'])
+        
+        torch.save({
+            'model_state_dict': screener_cpu.state_dict(),
+            'model_type': 'efficientnet',
+            'model_version': model_version,
+            'classes': ['fake', 'real'],
+            'cascade': report
+        }, screener_path)
+        with open('cascade_report.json', 'w') as f:
+            json.dump(report, f, indent=2)
+        
+        print(f"✅ Screener saved as: {screener_path}, band P(real) in [{band[0]:.3f}, {band[1]:.3f}]")
+        print(f"   Test: cascade accuracy {report['test']['cascade_accuracy'] * 100:.2f}% "
+              f"(full model {report['test']['full_model_accuracy'] * 100:.2f}%), "
+              f"{report['test']['escalation_rate'] * 100:.1f}% escalated, "
+              f"~{report['expected_latency_ms_batch1']:.1f}ms/image (full model {report['latency_ms_batch1']['full_model']:.1f}ms)")
+        return report
+    
+    def cache_teacher_logits(self, teacher, cache_path='teacher_logits.npz', teacher_id=''):
+        """
+        Teacher logits for every training image, computed once on the un-augmented
+        view and cached on disk so student epochs never run the teacher. The cache
+        is reused while the teacher checkpoint and the training split are unchanged.
+        """
+        image_paths = self.train_df['image_path'].astype(str).tolist()
+        split_id = hashlib.sha256('\n'.join(image_paths).encode()).hexdigest()
+        cache_path = Path(cache_path)
+        if cache_path.exists():
+            with np.load(cache_path) as cached:
+                if str(cached['teacher_id']) == teacher_id and str(cached['split_id']) == split_id:
+                    print(f"📦 Using cached teacher logits from {cache_path}")
+                    return torch.from_numpy(cached['logits'])
+        
+        loader = DataLoader(DisasterDataset(self.train_df, transform=self.val_transform),
+                            batch_size=64, shuffle=False, num_workers=0)
+        teacher.eval()
+        logits = []
+        with torch.no_grad():
+            for data, _ in tqdm(loader, desc='Teacher logits'):
+                logits.append(teacher(data.to(self.device)).float().cpu())
+        logits = torch.cat(logits)
+        
+        np.savez(cache_path, logits=logits.numpy(), teacher_id=np.array(teacher_id), split_id=np.array(split_id))
+        print(f"✅ Teacher logits for {len(logits)} images cached in {cache_path}")
+        return logits
+    
+    def distill_model(self, teacher_path='best_disaster_model.pth', num_epochs=15, learning_rate=0.001,
+                      temperature=4.0, alpha=0.7, logits_cache='teacher_logits.npz',
+                      checkpoint_path='best_student_model.pth'):
+        """
+        Knowledge distillation: train this trainer's (smaller) model on the soft
+        logits of a trained DisasterAuthenticityModel plus the hard labels.
+        Returns the training history and the teacher.
+        """
+        checkpoint = torch.load(teacher_path, map_location=self.device)
+        teacher = DisasterAuthenticityModel(pretrained=False)
+        teacher.load_state_dict(checkpoint['model_state_dict'])
+        teacher.to(self.device)
+        
+        print(f"🎓 Distilling {teacher_path} into {self.model_type} (T={temperature}, alpha={alpha})")
+        teacher_id = hashlib.sha256(Path(teacher_path).read_bytes()).hexdigest()
+        self.teacher_logits = self.cache_teacher_logits(teacher, logits_cache, teacher_id)
+        self.distill_loader = DataLoader(IndexedDataset(self.train_loader.dataset), batch_size=32,
+                                         shuffle=True, num_workers=0)
+        self.distillation_params = (temperature, alpha)
+        try:
+            history = self.train_model(num_epochs, learning_rate, checkpoint_path)
+        finally:
+            self.teacher_logits = None
+        return history, teacher
+    
+    def export_distilled_student(self, teacher, student_path='disaster_student_model.pth',
+                                 checkpoint_path='best_student_model.pth', model_version='1.0'):
+        """
+        Save the best student epoch in the web deployment format (served by pointing
+        serving.model_path at it) and compare it with the teacher on the CPU:
+        test accuracy, batch-1 latency, size and parameters (distillation_report.json).
+        """
+        self.model.load_state_dict(torch.load(checkpoint_path, map_location=self.device)['model_state_dict'])
+        temperature, alpha = self.distillation_params
+        report = {'temperature': temperature, 'alpha': alpha}
+        for name, model, model_type in (('teacher', teacher, 'resnet50'), ('student', self.model, self.model_type)):
+            model = copy.deepcopy(model).cpu().eval()
+            report[name] = {
+                'model_type': model_type,
+                'parameters': sum(p.numel() for p in model.parameters()),
+                'accuracy': self._cpu_test_accuracy(model),
+                'latency_ms_batch1': measure_latency(model),
+                'size_mb': serialized_size(model) / 1024 / 1024
+            }
+        report['accuracy_drop'] = report['teacher']['accuracy'] - report['student']['accuracy']
+        report['speedup'] = report['teacher']['latency_ms_batch1'] / report['student']['latency_ms_batch1']
+        
+        self.save_web_model(student_path, checkpoint_path=checkpoint_path, config_path=None,
+                            metadata={'distillation': report}, model_version=f"{model_version}-{self.model_type}")
+        with open('distillation_report.json', 'w') as f:
+            json.dump(report, f, indent=2)
+        
+        print(f"✅ Student: accuracy {report['student']['accuracy']:.2f}% (teacher {report['teacher']['accuracy']:.2f}%), "
+              f"latency {report['student']['latency_ms_batch1']:.1f}ms (teacher {report['teacher']['latency_ms_batch1']:.1f}ms, "
+              f"{report['speedup']:.1f}x faster), size {report['student']['size_mb']:.1f}MB "
+              f"(teacher {report['teacher']['size_mb']:.1f}MB)")
+        return report
+
 def main():
     """Main training pipeline"""
+    model_version = training_run_version()
     
     # Initialize trainer
     trainer = DisasterModelTrainer(model_type='resnet50')
@@ -424,7 +852,35 @@ def main():
     
     # Save for web deployment
     print("Preparing for web deployment...")
-    config = trainer.save_web_model()
+    config = trainer.save_web_model(model_version=model_version)
+    trainer.export_onnx_model(model_version=model_version)
+    
+    # INT8 variant for CPU-only verification servers
+    print("Quantizing for CPU serving...")
+    trainer.export_quantized_model(max_accuracy_drop=1.0, model_version=model_version)
+    
+    # EfficientNet-B0 screener for the two-stage cascade serving mode
+    print("Training cascade screener...")
+    screener = DisasterModelTrainer(model_type='efficientnet')
+    screener.load_datasets('disaster_authenticity_dataset')
+    screener.train_model(num_epochs=10, learning_rate=0.001, checkpoint_path='best_screener_model.pth')
+    screener.model.load_state_dict(torch.load('best_screener_model.pth', map_location=screener.device)['model_state_dict'])
+    config_path = Path('model_config.json')
+    model_config = json.loads(config_path.read_text()) if config_path.exists() else {}
+    target_accuracy = model_config.get('model_performance', {}).get('target_accuracy', 0.94)
+    trainer.export_cascade_screener(screener.model, target_accuracy=target_accuracy, model_version=model_version)
+    
+    # Distilled student: ResNet50 accuracy at a fraction of the CPU cost
+    distillation = model_config.get('distillation', {})
+    if distillation.get('enabled', True):
+        print("Distilling student model...")
+        student = DisasterModelTrainer(model_type=distillation.get('student', 'mobilenet'))
+        student.load_datasets('disaster_authenticity_dataset')
+        _, teacher = student.distill_model(num_epochs=distillation.get('num_epochs', 15),
+                                           temperature=distillation.get('temperature', 4.0),
+                                           alpha=distillation.get('alpha', 0.7))
+        student.export_distilled_student(teacher, student_path=distillation.get('output_path', 'disaster_student_model.pth'),
+                                         model_version=model_version)
     
     print(f"\n=== MODEL READY FOR DISASTERLINK ===")
     print(f"Best validation accuracy: {history['best_val_acc']:.2f}%")
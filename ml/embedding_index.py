@@ -0,0 +1,358 @@
+"""
+DisasterLink ML API - Embedding Index
+Approximate nearest-neighbour search over the penultimate-layer embeddings of
+scored images, in pure NumPy. An IVF (inverted file) index: vectors are
+clustered with spherical k-means and a query only scans the clusters whose
+centroids are closest to it. Vectors and per-entry records live in
+memory-mapped files that grow as submissions arrive, so the index survives
+restarts and the OS page cache (not the Python heap) holds the data.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from array import array
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Per-entry record stored next to each vector
+RECORD_DTYPE = np.dtype([
+    ('image_id', np.uint8, (32,)),  # SHA-256 of the original upload
+    ('p_real', '<f4'),
+    ('submitted_at', '<f8'),
+    ('list_id', '<i4')  # inverted list the vector belongs to, -1 before the index is trained
+])
+
+def normalize(vectors):
+    """L2-normalise rows so inner product is cosine similarity"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+def spherical_kmeans(vectors, nlist, iterations=15, seed=0):
+    """Cluster unit vectors by cosine similarity; returns (nlist, dim) unit centroids"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        labels = assign(vectors, centroids)
+        order = np.argsort(labels, kind='stable')
+        counts = np.bincount(labels, minlength=nlist)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        filled = counts > 0
+        sums = np.add.reduceat(vectors[order], starts[filled], axis=0)
+        centroids[filled] = normalize(sums)
+        # Re-seed empty clusters from random vectors
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            centroids[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+    return centroids
+
+def assign(vectors, centroids, chunk_size=65536):
+    """Index of the most similar centroid for every vector, in chunks to bound memory"""
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk_size):
+        labels[start:start + chunk_size] = np.argmax(vectors[start:start + chunk_size] @ centroids.T, axis=1)
+    return labels
+
+class EmbeddingIndex:
+    """
+    IVF index backed by memory-mapped files in one directory:
+      vectors.f32   float32 (capacity, dim) unit vectors, in insertion order
+      records.bin   RECORD_DTYPE per vector
+      centroids.npy (nlist, dim) k-means centroids, once trained
+      meta.json     entry count, dimension, model version
+    Until train_size vectors are stored, searches are exact (brute force);
+    training then runs in a background thread (or explicitly via train() with
+    auto_train off) and later inserts go straight into their inverted list.
+    """
+
+    def __init__(self, directory, dim, model_version, nlist=4096, nprobe=32, train_size=None,
+                 initial_capacity=65536, flush_interval_seconds=60, auto_train=True):
+        self.directory = Path(directory)
+        self.dim = int(dim)
+        self.model_version = str(model_version)
+        self.nlist = int(nlist)
+        self.nprobe = int(nprobe)
+        # FAISS' rule of thumb: about 39 training points per centroid
+        self.train_size = int(train_size or self.nlist * 39)
+        self.auto_train = auto_train
+
+        self._lock = threading.RLock()
+        self._count = 0
+        self._capacity = 0
+        self._centroids = None
+        self._lists = None
+        self._training = False
+        self._dirty = False
+        self._closed = False
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if not self._load():
+            self._create(initial_capacity)
+
+        if flush_interval_seconds:
+            threading.Thread(target=self._flush_loop, args=(flush_interval_seconds,),
+                             name='embedding-index-flush', daemon=True).start()
+        atexit.register(self.flush)
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def trained(self):
+        return self._centroids is not None
+
+    # Storage
+
+    def _path(self, name):
+        return self.directory / name
+
+    def _open(self, capacity, mode):
+        self._vectors = np.memmap(self._path('vectors.f32'), dtype=np.float32, mode=mode, shape=(capacity, self.dim))
+        self._records = np.memmap(self._path('records.bin'), dtype=RECORD_DTYPE, mode=mode, shape=(capacity,))
+        self._capacity = capacity
+
+    def _create(self, capacity):
+        for name in ('vectors.f32', 'records.bin', 'centroids.npy', 'meta.json'):
+            if self._path(name).exists():
+                self._path(name).unlink()
+        self._open(capacity, 'w+')
+        self._write_meta()
+
+    def _grow(self):
+        """Double the capacity: extend both files and remap them"""
+        capacity = self._capacity * 2
+        self._vectors.flush()
+        self._records.flush()
+        del self._vectors, self._records
+        for name, row_bytes in (('vectors.f32', 4 * self.dim), ('records.bin', RECORD_DTYPE.itemsize)):
+            with open(self._path(name), 'r+b') as f:
+                f.truncate(capacity * row_bytes)
+        self._open(capacity, 'r+')
+
+    def _write_meta(self):
+        meta = {
+            'count': self._count,
+            'capacity': self._capacity,
+            'dim': self.dim,
+            'model_version': self.model_version,
+            'nlist': self.nlist
+        }
+        temporary = self._path('meta.json.tmp')
+        with open(temporary, 'w') as f:
+            json.dump(meta, f)
+        os.replace(temporary, self._path('meta.json'))
+
+    def _load(self):
+        """Reopen an existing index; False when there is none or it belongs to another model"""
+        try:
+            with open(self._path('meta.json')) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False
+        if meta['model_version'] != self.model_version or meta['dim'] != self.dim or meta['nlist'] != self.nlist:
+            logger.info(f"Discarding embedding index in {self.directory}: built for another model or layout")
+            return False
+
+        self._open(meta['capacity'], 'r+')
+        self._count = meta['count']
+        if self._path('centroids.npy').exists():
+            self._install_centroids(np.load(self._path('centroids.npy')))
+        logger.info(f"Embedding index loaded ({self._count} vectors, "
+                    f"{'IVF' if self.trained else 'exact'}) from {self.directory}")
+        return True
+
+    def flush(self):
+        """Write pending vectors to disk and record the entry count"""
+        with self._lock:
+            if not self._dirty or self._closed:
+                return
+            self._vectors.flush()
+            self._records.flush()
+            self._write_meta()
+            self._dirty = False
+
+    def close(self):
+        """
+        Flush and stop writing: a new index for another model version is about
+        to take over the directory. Searches keep working until it is dropped.
+        """
+        with self._lock:
+            self.flush()
+            self._closed = True
+
+    def _flush_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Could not flush embedding index: {e}")
+
+    # Insertion
+
+    def add(self, vector, image_id, p_real):
+        """Store one embedding for an image id (hex SHA-256)"""
+        self.add_batch(np.asarray(vector)[np.newaxis], [image_id], [p_real])
+
+    def add_batch(self, vectors, image_ids, p_real, submitted_at=None):
+        """Store several embeddings at once (backfills and benchmarks)"""
+        vectors = normalize(vectors)
+        count = len(vectors)
+        with self._lock:
+            if self._closed:
+                return
+            while self._count + count > self._capacity:
+                self._grow()
+            start, end = self._count, self._count + count
+            self._vectors[start:end] = vectors
+            records = self._records[start:end]
+            records['image_id'] = np.frombuffer(b''.join(bytes.fromhex(image_id) for image_id in image_ids),
+                                                dtype=np.uint8).reshape(count, 32)
+            records['p_real'] = p_real
+            records['submitted_at'] = time.time() if submitted_at is None else submitted_at
+            if self.trained:
+                labels = assign(vectors, self._centroids)
+                records['list_id'] = labels
+                for position, label in zip(range(start, end), labels.tolist()):
+                    self._lists[label].append(position)
+            else:
+                records['list_id'] = -1
+            self._count = end
+            self._dirty = True
+            start_training = (self.auto_train and not self.trained and not self._training
+                              and end >= self.train_size)
+            if start_training:
+                self._training = True
+
+        if start_training:
+            threading.Thread(target=self.train, name='embedding-index-train', daemon=True).start()
+
+    # Training
+
+    def train(self, sample_size=None):
+        """
+        Cluster a sample of the stored vectors and sort every vector into its
+        inverted list. k-means runs without the lock, so inserts and exact
+        searches continue meanwhile.
+        """
+        try:
+            with self._lock:
+                count = self._count
+                sample_size = min(count, sample_size or max(self.train_size, self.nlist * 64))
+                sample = np.array(self._vectors[np.sort(np.random.default_rng(0).choice(count, sample_size, replace=False))])
+            if count < self.nlist:
+                return
+
+            start = time.perf_counter()
+            centroids = spherical_kmeans(sample, self.nlist)
+            with self._lock:
+                if self._closed:
+                    return
+                self._records['list_id'][:self._count] = assign(self._vectors[:self._count], centroids)
+                self._install_centroids(centroids)
+                np.save(self._path('centroids.npy'), centroids)
+                self._dirty = True
+            logger.info(f"Embedding index trained: {self.nlist} lists over {count} vectors "
+                        f"in {time.perf_counter() - start:.1f}s")
+        finally:
+            self._training = False
+
+    def _install_centroids(self, centroids):
+        """Build the inverted lists from the stored list ids (assigning any vector without one)"""
+        labels = np.array(self._records['list_id'][:self._count])
+        unassigned = np.flatnonzero(labels < 0)
+        if len(unassigned):
+            labels[unassigned] = assign(self._vectors[unassigned], centroids)
+            self._records['list_id'][unassigned] = labels[unassigned]
+
+        order = np.argsort(labels, kind='stable').astype(np.uint32)
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(labels, minlength=len(centroids)))))
+        self._lists = [array('I', order[bounds[i]:bounds[i + 1]].tobytes()) for i in range(len(centroids))]
+        self._centroids = centroids.astype(np.float32)
+
+    # Search
+
+    def _scan(self, query, nprobe):
+        """
+        (positions, scores) of the vectors in the nprobe lists closest to the
+        query, or of every vector before training. Caller holds the lock.
+        """
+        if not self.trained:
+            return np.arange(self._count), self._vectors[:self._count] @ query
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        closest = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+        positions = np.concatenate([np.frombuffer(self._lists[i], dtype=np.uint32) for i in closest])
+        positions.sort()  # sequential reads from the memory map
+        return positions, self._vectors[positions] @ query
+
+    @staticmethod
+    def _top(scores, k):
+        """Indices of the k highest scores, best first"""
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        return best[np.argsort(-scores[best])]
+
+    def search(self, vector, k=10, nprobe=None, exclude_id=None):
+        """
+        The k most similar stored embeddings (cosine similarity), best first,
+        as dicts with image_id, similarity, p_real and submitted_at
+        """
+        query = normalize(vector)
+        exclude = np.frombuffer(bytes.fromhex(exclude_id), dtype=np.uint8) if exclude_id else None
+        with self._lock:
+            if self._count == 0:
+                return []
+            positions, scores = self._scan(query, nprobe)
+            if len(positions) == 0:
+                return []
+            # One spare result in case the query image itself is stored
+            best = self._top(scores, k + 1)
+            records = np.array(self._records[positions[best]])
+
+        results = []
+        for record, score in zip(records, scores[best]):
+            if exclude is not None and np.array_equal(record['image_id'], exclude):
+                continue
+            results.append({
+                'image_id': record['image_id'].tobytes().hex(),
+                'similarity': float(score),
+                'p_real': float(record['p_real']),
+                'submitted_at': float(record['submitted_at'])
+            })
+        return results[:k]
+
+    def search_positions(self, vector, k=10, nprobe=None, exact=False):
+        """Top-k positions, from the index or by brute force (for recall measurements)"""
+        query = normalize(vector)
+        with self._lock:
+            if exact:
+                positions = np.arange(self._count)
+                scores = np.concatenate([
+                    self._vectors[start:min(start + 262144, self._count)] @ query
+                    for start in range(0, self._count, 262144)
+                ])
+            else:
+                positions, scores = self._scan(query, nprobe)
+        return positions[self._top(scores, k)]
+
+    def get_stats(self):
+        with self._lock:
+            list_sizes = [len(entries) for entries in self._lists] if self.trained else []
+            return {
+                'entries': self._count,
+                'dim': self.dim,
+                'mode': 'ivf' if self.trained else ('training' if self._training else 'exact'),
+                'nlist': self.nlist,
+                'nprobe': self.nprobe,
+                'train_size': self.train_size,
+                'largest_list': max(list_sizes) if list_sizes else None,
+                'directory': str(self.directory),
+                'disk_bytes': self._capacity * (4 * self.dim + RECORD_DTYPE.itemsize)
+            }
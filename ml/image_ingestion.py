@@ -0,0 +1,181 @@
+"""
+DisasterLink ML API - Image Ingestion
+Decodes each upload once and exposes header information before any pixel decode
+"""
+
+import base64
+import binascii
+import io
+import mmap
+import os
+import stat
+from PIL import Image, ExifTags
+
+from serving_metrics import stage
+
+# Default limits shared by every endpoint
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_IMAGE_PIXELS = 50_000_000  # ~50 megapixels, above any phone camera
+MIN_IMAGE_SIZE = (100, 100)
+MODEL_INPUT_SIZE = (224, 224)
+
+class ImageIngestionError(ValueError):
+    """Raised when an upload cannot be accepted; carries the HTTP status to return"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+class ImagePathError(ImageIngestionError):
+    """Raised when a storage path is malformed, outside the storage root or missing"""
+
+class IngestedImage:
+    """
+    One uploaded image, opened lazily.
+    PIL only parses the file header on open, so size, format and EXIF are
+    available without decoding pixel data. Pixels are decoded by decode().
+    """
+
+    def __init__(self, image_bytes, max_pixels=MAX_IMAGE_PIXELS):
+        self.image_bytes = image_bytes
+        self.file_size = len(image_bytes)
+
+        try:
+            with stage('header_parse'):
+                # A memory-mapped file is already seekable; wrapping it in BytesIO would copy it
+                self.image = Image.open(image_bytes if isinstance(image_bytes, mmap.mmap) else io.BytesIO(image_bytes))
+        except Exception as e:
+            raise ImageIngestionError(f'Invalid image format: {str(e)}')
+
+        self.size = self.image.size
+        self.format = self.image.format
+        self._exif = None
+
+        # Reject decompression bombs from the header alone
+        width, height = self.size
+        if width * height > max_pixels:
+            raise ImageIngestionError(
+                f'Image has too many pixels ({width}x{height}, max {max_pixels:,})', 413
+            )
+
+    @property
+    def exif(self):
+        """EXIF tags parsed from the header, keyed by tag name"""
+        if self._exif is None:
+            self._exif = {}
+            try:
+                exif = self.image._getexif() if hasattr(self.image, '_getexif') else None
+                for tag_id, value in (exif or {}).items():
+                    self._exif[ExifTags.TAGS.get(tag_id, tag_id)] = value
+            except Exception:
+                pass
+        return self._exif
+
+    def is_too_small(self, min_size=MIN_IMAGE_SIZE):
+        """Header-only minimum dimension check"""
+        return self.size[0] < min_size[0] or self.size[1] < min_size[1]
+
+    def decode(self, target_size=None):
+        """
+        Decode pixel data; only called once the cheap checks have passed.
+        With target_size, decode at the smallest scale still covering it.
+        """
+        if target_size is not None:
+            self.image = reduce_for_model(self.image, target_size)
+        self.image.load()
+        return self.image
+
+def reduce_for_model(image, target_size=MODEL_INPUT_SIZE):
+    """
+    Shrink an image to the smallest scale that is still at least target_size.
+    JPEGs that are not decoded yet use DCT-domain scaling (draft mode), so the
+    decoder never produces the full-resolution pixels. Other formats are
+    reduced by an integer box filter after decoding.
+    """
+    width, height = image.size
+    factor = min(width // target_size[0], height // target_size[1])
+    if factor < 2:
+        return image
+
+    if image.format == 'JPEG':
+        # No-op if pixels were already decoded
+        image.draft('RGB', target_size)
+        return image
+
+    if image.mode not in ('RGB', 'RGBA', 'L'):
+        image = image.convert('RGB')
+    return image.reduce(factor)
+
+def ingest_image_bytes(image_bytes, max_file_size=MAX_FILE_SIZE, max_pixels=MAX_IMAGE_PIXELS):
+    """Accept raw upload bytes and parse the image header"""
+    if not image_bytes:
+        raise ImageIngestionError('No image provided')
+    if len(image_bytes) > max_file_size:
+        raise ImageIngestionError(f'Image too large (max {max_file_size // (1024 * 1024)}MB)')
+    return IngestedImage(image_bytes, max_pixels=max_pixels)
+
+def ingest_base64_image(image_data, max_file_size=MAX_FILE_SIZE, max_pixels=MAX_IMAGE_PIXELS):
+    """Base64-decode an upload exactly once and parse the image header"""
+    try:
+        with stage('base64_decode'):
+            image_bytes = base64.b64decode(image_data)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ImageIngestionError(f'Invalid base64 image: {str(e)}')
+    return ingest_image_bytes(image_bytes, max_file_size=max_file_size, max_pixels=max_pixels)
+
+class StorageRoot:
+    """
+    Directory that path-based requests read images from, so files already
+    on shared storage never travel through base64 and JSON. Paths are
+    relative to the root; anything resolving outside it (.., absolute
+    paths, symlinks leading elsewhere) is refused. Files of at least
+    mmap_min_bytes are memory-mapped instead of read into memory.
+    """
+
+    def __init__(self, root, mmap_min_bytes=1024 * 1024):
+        self.root = os.path.realpath(root)
+        if not os.path.isdir(self.root):
+            raise ValueError(f'Storage root {root} is not a directory')
+        self.mmap_min_bytes = int(mmap_min_bytes)
+
+    def resolve(self, relative_path):
+        """Absolute path of a file under the root; raises ImagePathError otherwise"""
+        if not isinstance(relative_path, str) or not relative_path.strip():
+            raise ImagePathError('No image path provided')
+        if '\x00' in relative_path or os.path.isabs(relative_path) or os.path.splitdrive(relative_path)[0]:
+            raise ImagePathError('Image path must be relative to the storage root')
+
+        resolved = os.path.realpath(os.path.join(self.root, relative_path))
+        if os.path.commonpath([self.root, resolved]) != self.root:
+            raise ImagePathError('Image path is outside the storage root', 403)
+        return resolved
+
+    def read(self, relative_path, max_file_size=MAX_FILE_SIZE):
+        """Image bytes (an mmap for large files) of a file under the root"""
+        path = self.resolve(relative_path)
+        with stage('file_read'):
+            try:
+                # O_NOFOLLOW: a symlink swapped in after resolve() is not followed
+                fd = os.open(path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0) | getattr(os, 'O_BINARY', 0))
+            except FileNotFoundError:
+                raise ImagePathError('Image not found', 404)
+            except OSError as e:
+                raise ImagePathError(f'Cannot read image: {e.strerror}', 403)
+
+            try:
+                info = os.fstat(fd)
+                if not stat.S_ISREG(info.st_mode):
+                    raise ImagePathError('Image path is not a file')
+                if info.st_size > max_file_size:
+                    raise ImageIngestionError(f'Image too large (max {max_file_size // (1024 * 1024)}MB)')
+                if info.st_size and info.st_size >= self.mmap_min_bytes:
+                    return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+                with os.fdopen(fd, 'rb', closefd=False) as file:
+                    return file.read()
+            finally:
+                os.close(fd)
+
+def ingest_image_path(storage_root, relative_path, max_file_size=MAX_FILE_SIZE, max_pixels=MAX_IMAGE_PIXELS):
+    """Read an image from shared storage (no upload, no base64) and parse the image header"""
+    image_bytes = storage_root.read(relative_path, max_file_size=max_file_size)
+    return ingest_image_bytes(image_bytes, max_file_size=max_file_size, max_pixels=max_pixels)
@@ -0,0 +1,161 @@
+"""
+DisasterLink ML - Inference Backends
+Graph-optimized CPU variant of DisasterAuthenticityModel: traced with
+TorchScript, frozen (weights folded into the graph as constants), converted
+to channels-last and run through the CPU fusion passes (conv+bn folding,
+conv+relu/add fusion, oneDNN layouts). Compiled artifacts are cached on disk
+keyed by the checkpoint hash and torch version.
+"""
+
+import hashlib
+import io
+import logging
+import time
+from pathlib import Path
+
+import torch
+from PIL import Image
+
+from image_ingestion import MODEL_INPUT_SIZE
+from preprocessing import InputBufferPool, resize_to_uint8
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('eager', 'torchscript', 'int8')
+
+CHECK_IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png')
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Streaming SHA-256 of a checkpoint file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def compiled_artifact_path(cache_dir, checkpoint_digest):
+    """Artifacts depend on both the weights and the torch build that compiled them"""
+    torch_version = torch.__version__.replace('+', '_')
+    return Path(cache_dir) / f"disaster_model_{checkpoint_digest[:16]}_torchscript_{torch_version}.pt"
+
+def _example_batch(batch_size=2):
+    return torch.randn(batch_size, 3, *MODEL_INPUT_SIZE).contiguous(memory_format=torch.channels_last)
+
+def freeze_torchscript(model):
+    """Trace an eager model on channels-last input and freeze it (weights become graph constants)"""
+    model = model.eval().to(memory_format=torch.channels_last)
+    with torch.no_grad():
+        traced = torch.jit.trace(model, _example_batch())
+        return torch.jit.freeze(traced)
+
+def optimize_frozen(frozen):
+    """
+    Apply the CPU fusion passes to a frozen graph. The result holds prepacked
+    oneDNN weights and cannot be serialized, so this runs after every load.
+    """
+    with torch.no_grad():
+        optimized = torch.jit.optimize_for_inference(frozen)
+        # The first runs let the profiling executor specialise the graph
+        for _ in range(2):
+            optimized(_example_batch())
+    return optimized
+
+def load_check_batches(image_dir, max_images=16):
+    """
+    Real photos for the equivalence check: the first max_images images of
+    image_dir by name (a fixed set), preprocessed like served images into a
+    batch of one and a batch of the rest. Empty when there are none.
+    """
+    image_dir = Path(image_dir) if image_dir else None
+    if image_dir is None or not image_dir.is_dir():
+        return []
+    paths = sorted(path for path in image_dir.iterdir() if path.suffix.lower() in CHECK_IMAGE_SUFFIXES)
+    images = []
+    for path in paths[:max_images]:
+        try:
+            with Image.open(path) as image:
+                images.append(resize_to_uint8(image))
+        except OSError as e:
+            logger.warning(f"Skipping check image {path}: {e}")
+    if not images:
+        return []
+
+    pool = InputBufferPool()
+    buffer = pool.acquire(len(images))
+    with torch.no_grad():
+        for index, image in enumerate(images):
+            pool.fill(buffer, index, image)
+    batch = buffer[:len(images)].contiguous()
+    return [batch[:1], batch[1:]] if len(images) > 1 else [batch]
+
+def compare_outputs(reference_model, candidate_model, batches):
+    """
+    Run both models on the same input batches.
+    Returns the maximum absolute difference of the softmax probabilities and
+    the fraction of images where the predicted class agrees.
+    """
+    max_diff = 0.0
+    agree = 0
+    total = 0
+    with torch.no_grad():
+        for batch in batches:
+            reference = torch.softmax(reference_model(batch), dim=1)
+            candidate = torch.softmax(candidate_model(batch.contiguous(memory_format=torch.channels_last)), dim=1)
+            max_diff = max(max_diff, float((reference - candidate).abs().max()))
+            agree += int((reference.argmax(dim=1) == candidate.argmax(dim=1)).sum())
+            total += batch.shape[0]
+    return {
+        'max_probability_difference': max_diff,
+        'prediction_agreement': agree / total if total else 1.0,
+        'samples': total
+    }
+
+def load_torchscript_model(eager_model, checkpoint_path, cache_dir='compiled_models', tolerance=1e-3,
+                           check_images=None):
+    """
+    Return a compiled model for the checkpoint, reusing the frozen graph
+    cached on disk when one exists. Freshly compiled models are checked
+    against the eager model first, on the photos in check_images (random
+    inputs only when there are none); returns None when they disagree.
+    """
+    artifact_path = compiled_artifact_path(cache_dir, file_sha256(checkpoint_path))
+
+    if artifact_path.exists():
+        try:
+            start_time = time.perf_counter()
+            compiled = optimize_frozen(torch.jit.load(str(artifact_path), map_location='cpu'))
+            logger.info(f"Loaded compiled model {artifact_path.name} in {time.perf_counter() - start_time:.2f}s")
+            return compiled
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable compiled model {artifact_path}: {e}")
+
+    start_time = time.perf_counter()
+    frozen = freeze_torchscript(eager_model)
+    serialized = io.BytesIO()
+    torch.jit.save(frozen, serialized)  # optimize_for_inference rewrites the module in place
+    compiled = optimize_frozen(frozen)
+    logger.info(f"Compiled TorchScript model in {time.perf_counter() - start_time:.2f}s")
+
+    batches = load_check_batches(check_images)
+    if batches:
+        source = f"{sum(batch.shape[0] for batch in batches)} images from {check_images}"
+    else:
+        # Noise says little about drift on real photos, but is better than no check at all
+        logger.warning(f"No check images in {check_images}, checking the compiled model on random inputs")
+        generator = torch.Generator().manual_seed(0)
+        batches = [torch.randn(batch_size, 3, *MODEL_INPUT_SIZE, generator=generator) for batch_size in (1, 4)]
+        source = 'random inputs'
+    check = compare_outputs(eager_model, compiled, batches)
+    if check['max_probability_difference'] > tolerance:
+        logger.error(f"Compiled model differs from eager by {check['max_probability_difference']:.2e} "
+                     f"(tolerance {tolerance:.0e}), not using it")
+        return None
+    logger.info(f"Compiled model matches eager within {check['max_probability_difference']:.2e} on {source}")
+
+    try:
+        artifact_path.parent.mkdir(parents=True, exist_ok=True)
+        artifact_path.write_bytes(serialized.getvalue())
+        logger.info(f"Saved compiled model to {artifact_path}")
+    except Exception as e:
+        logger.warning(f"Could not cache compiled model: {e}")
+    return compiled
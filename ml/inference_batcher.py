@@ -0,0 +1,183 @@
+"""
+DisasterLink ML API - Dynamic Micro-Batching
+Gathers concurrent prediction requests into a single model forward pass
+"""
+
+import threading
+import queue
+import time
+import logging
+from concurrent.futures import Future
+
+import serving_metrics
+from admission_control import deadline_passed, deadline_exceeded_result
+
+logger = logging.getLogger(__name__)
+
+class BatchItem:
+    """Single queued prediction request waiting for a batch slot"""
+
+    def __init__(self, payload, deadline=None):
+        self.payload = payload
+        self.deadline = deadline
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+class MicroBatcher:
+    """
+    Collects requests from many Flask threads and runs them together.
+    A batch is dispatched as soon as it holds max_batch_size items or the
+    oldest item has waited max_wait_ms, whichever comes first.
+    """
+
+    def __init__(self, predict_batch_fn, max_batch_size=16, max_wait_ms=10, max_queue_size=0):
+        self.predict_batch_fn = predict_batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.queue = queue.Queue(maxsize=max_queue_size)
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'total_requests': 0,
+            'total_batches': 0,
+            'total_wait_time': 0.0,
+            'max_wait_time': 0.0,
+            'max_queue_depth': 0,
+            'batch_size_counts': {}
+        }
+
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+        logger.info(f"Micro-batcher started (max_batch_size={self.max_batch_size}, "
+                    f"max_wait_ms={self.max_wait * 1000:.1f})")
+
+    def submit(self, payload, deadline=None):
+        """
+        Queue a payload for the next batch and return a Future for its result.
+        Items whose deadline (time.monotonic()) has passed when their batch is
+        dispatched are answered without running the model.
+        """
+        item = BatchItem(payload, deadline)
+        self.queue.put(item)
+        return item.future
+
+    def predict(self, payload, timeout=None, deadline=None):
+        """Blocking helper: submit a payload and wait for its own result"""
+        return self.submit(payload, deadline).result(timeout=timeout)
+
+    def swap(self, predict_batch_fn):
+        """
+        Run later batches with another function (hot model reload). The worker
+        reads it once per batch, so the batch in progress finishes on the old one.
+        """
+        self.predict_batch_fn = predict_batch_fn
+
+    def stop(self):
+        """Stop the worker thread after the current batch"""
+        self._stopped.set()
+        self._worker.join(timeout=1.0)
+
+    def _collect_batch(self):
+        """Block for the first item, then gather more until size or time limit"""
+        try:
+            first = self.queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self.queue.get_nowait())
+                else:
+                    batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        """Worker loop: form batches and fan results back out to callers"""
+        while not self._stopped.is_set():
+            batch = self._drop_expired(self._collect_batch())
+            if not batch:
+                continue
+
+            dispatched_at = time.perf_counter()
+            queue_depth = self.queue.qsize()
+
+            try:
+                with serving_metrics.stage('inference'):
+                    results = self.predict_batch_fn([item.payload for item in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"Batch returned {len(results)} results for {len(batch)} inputs")
+            except Exception as e:
+                logger.error(f"Error during batched prediction: {e}")
+                results = [{
+                    'prediction': None,
+                    'confidence': None,
+                    'error': str(e),
+                    'status': 'error'
+                } for _ in batch]
+
+            wait_times = [dispatched_at - item.enqueued_at for item in batch]
+            self._record_batch(len(batch), queue_depth, wait_times)
+
+            for item, result, wait_time in zip(batch, results, wait_times):
+                result['batching'] = {
+                    'batch_size': len(batch),
+                    'queue_depth': queue_depth,
+                    'wait_time': wait_time
+                }
+                item.future.set_result(result)
+
+    def _drop_expired(self, batch):
+        """Answer items whose client has already given up and return the rest"""
+        live = []
+        for item in batch:
+            if item.deadline is not None and deadline_passed(item.deadline, stage='inference'):
+                item.future.set_result(deadline_exceeded_result('inference'))
+            else:
+                live.append(item)
+        return live
+
+    def _record_batch(self, batch_size, queue_depth, wait_times):
+        """Update aggregate batching statistics"""
+        serving_metrics.BATCH_SIZE.observe(batch_size)
+        for wait_time in wait_times:
+            serving_metrics.observe_stage('batch_wait', wait_time)
+        with self._stats_lock:
+            stats = self._stats
+            stats['total_requests'] += batch_size
+            stats['total_batches'] += 1
+            stats['total_wait_time'] += sum(wait_times)
+            stats['max_wait_time'] = max(stats['max_wait_time'], max(wait_times))
+            stats['max_queue_depth'] = max(stats['max_queue_depth'], queue_depth + batch_size)
+            counts = stats['batch_size_counts']
+            counts[batch_size] = counts.get(batch_size, 0) + 1
+
+    def get_stats(self):
+        """Aggregate batching statistics for /health"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+            counts = dict(stats.pop('batch_size_counts'))
+
+        total_requests = stats['total_requests']
+        total_batches = stats['total_batches']
+
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'queue_depth': self.queue.qsize(),
+            'max_queue_depth': stats['max_queue_depth'],
+            'total_requests': total_requests,
+            'total_batches': total_batches,
+            'avg_batch_size': total_requests / total_batches if total_batches else 0.0,
+            'avg_wait_time': stats['total_wait_time'] / total_requests if total_requests else 0.0,
+            'max_wait_time': stats['max_wait_time'],
+            'batch_size_distribution': {str(size): count for size, count in sorted(counts.items())}
+        }
@@ -0,0 +1,315 @@
+"""
+DisasterLink ML API - Asynchronous Verification Jobs
+A report's images are submitted in one call that returns a job id at once;
+worker threads run them through the batch pipeline, and the result is
+polled, long-polled or POSTed to a callback URL until it expires. Jobs live
+in SQLite, so they survive restarts: queued jobs stay queued, and a job
+whose worker died is picked up again once its lease runs out.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+JOB_KINDS = ('verify', 'predict')
+FINISHED_STATES = ('succeeded', 'failed')
+SIGNATURE_HEADER = 'X-DisasterLink-Signature'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    state TEXT NOT NULL,
+    image_count INTEGER NOT NULL,
+    items TEXT,
+    result TEXT,
+    error TEXT,
+    callback_url TEXT,
+    callback_state TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    lease_expires_at REAL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (state, created_at);
+CREATE INDEX IF NOT EXISTS jobs_by_expiry ON jobs (expires_at);
+"""
+
+def _encode_items(items):
+    """Batch entries as JSON; raw multipart bytes are stored base64-encoded"""
+    return json.dumps([
+        {key: base64.b64encode(value).decode('ascii') if key == 'data' and value is not None else value
+         for key, value in item.items()}
+        for item in items
+    ])
+
+def _decode_items(encoded):
+    items = json.loads(encoded)
+    for item in items:
+        if item.get('data') is not None:
+            item['data'] = base64.b64decode(item['data'])
+    return items
+
+def callback_allowed(url, allowed_hosts):
+    """Callbacks only go to http(s) URLs on the configured hosts (no arbitrary outbound requests)"""
+    parsed = urlparse(url or '')
+    return parsed.scheme in ('http', 'https') and parsed.hostname in set(allowed_hosts)
+
+class JobStore:
+    """
+    SQLite job table shared by every thread and process of one deployment.
+    Each thread uses its own connection; write transactions are IMMEDIATE so
+    two workers can never claim the same job.
+    """
+
+    def __init__(self, path, result_ttl_seconds=3600, lease_seconds=120, max_attempts=3):
+        self.path = str(path)
+        self.result_ttl = float(result_ttl_seconds)
+        self.lease_seconds = float(lease_seconds)
+        self.max_attempts = int(max_attempts)
+        self._local = threading.local()
+        # Wakes long-polls in this process when one of its workers finishes a job
+        self._finished = threading.Condition()
+
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self):
+        # Connections must not cross a fork (serve_multiprocess.py workers)
+        if getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def _transaction(self):
+        return _Transaction(self._connection())
+
+    def submit(self, kind, items, callback_url=None):
+        """Queue a job; returns its id"""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}' (expected one of {', '.join(JOB_KINDS)})")
+        job_id = uuid.uuid4().hex
+        with self._transaction() as connection:
+            connection.execute(
+                'INSERT INTO jobs (id, kind, state, image_count, items, callback_url, callback_state, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (job_id, kind, 'queued', len(items), _encode_items(items), callback_url,
+                 'pending' if callback_url else None, time.time())
+            )
+        return job_id
+
+    def claim(self):
+        """
+        Take the oldest queued job, or a running one whose lease has expired
+        (its worker died). Returns (job_id, kind, items) or None.
+        Jobs that already used max_attempts leases are failed instead.
+        """
+        now = time.time()
+        with self._transaction() as connection:
+            while True:
+                row = connection.execute(
+                    "SELECT id, kind, items, attempts FROM jobs "
+                    "WHERE state = 'queued' OR (state = 'running' AND lease_expires_at < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row['attempts'] >= self.max_attempts:
+                    self._finish(connection, row['id'], None, f"Abandoned after {row['attempts']} attempts")
+                    continue
+                connection.execute(
+                    "UPDATE jobs SET state = 'running', started_at = ?, lease_expires_at = ?, attempts = attempts + 1 "
+                    "WHERE id = ?",
+                    (now, now + self.lease_seconds, row['id'])
+                )
+                return row['id'], row['kind'], _decode_items(row['items'])
+
+    def _finish(self, connection, job_id, result, error):
+        finished_at = time.time()
+        connection.execute(
+            'UPDATE jobs SET state = ?, result = ?, error = ?, items = NULL, finished_at = ?, '
+            'lease_expires_at = NULL, expires_at = ? WHERE id = ?',
+            ('failed' if error else 'succeeded', json.dumps(result, default=str) if result is not None else None,
+             error, finished_at, finished_at + self.result_ttl, job_id)
+        )
+
+    def finish(self, job_id, result=None, error=None):
+        """Store a job's result (or error) and start its expiry clock; drops the images"""
+        with self._transaction() as connection:
+            self._finish(connection, job_id, result, error)
+        with self._finished:
+            self._finished.notify_all()
+        return self.get(job_id)
+
+    def set_callback_state(self, job_id, state):
+        with self._transaction() as connection:
+            connection.execute('UPDATE jobs SET callback_state = ? WHERE id = ?', (state, job_id))
+
+    def get(self, job_id):
+        """Public view of a job, or None when unknown or expired"""
+        row = self._connection().execute(
+            'SELECT id, kind, state, image_count, result, error, callback_url, callback_state, attempts, '
+            'created_at, started_at, finished_at, expires_at FROM jobs WHERE id = ?',
+            (job_id,)
+        ).fetchone()
+        if row is None or (row['expires_at'] is not None and row['expires_at'] < time.time()):
+            return None
+        return {
+            'job_id': row['id'],
+            'kind': row['kind'],
+            'status': row['state'],
+            'images': row['image_count'],
+            'attempts': row['attempts'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at'],
+            'expires_at': row['expires_at'],
+            'result': json.loads(row['result']) if row['result'] is not None else None,
+            'error': row['error'],
+            'callback': {'url': row['callback_url'], 'state': row['callback_state']} if row['callback_url'] else None
+        }
+
+    def wait(self, job_id, timeout):
+        """
+        Long-poll: the job once it has finished, or as it is when timeout runs
+        out. Finishes in this process wake the wait at once; jobs finished by
+        another process are noticed within half a second.
+        """
+        if not math.isfinite(timeout):
+            raise ValueError(f'Wait timeout must be finite, got {timeout}')
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job['status'] in FINISHED_STATES or remaining <= 0:
+                return job
+            with self._finished:
+                self._finished.wait(min(remaining, 0.5))
+
+    def queued_count(self):
+        return self._connection().execute("SELECT COUNT(*) FROM jobs WHERE state = 'queued'").fetchone()[0]
+
+    def purge_expired(self):
+        """Delete jobs whose results have expired; returns how many"""
+        with self._transaction() as connection:
+            return connection.execute('DELETE FROM jobs WHERE expires_at < ?', (time.time(),)).rowcount
+
+    def get_stats(self):
+        rows = self._connection().execute('SELECT state, COUNT(*) FROM jobs GROUP BY state').fetchall()
+        stats = {state: 0 for state in ('queued', 'running') + FINISHED_STATES}
+        stats.update({state: count for state, count in rows})
+        stats['result_ttl_seconds'] = self.result_ttl
+        return stats
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT (ROLLBACK on error) on an autocommit connection"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute('BEGIN IMMEDIATE')
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.connection.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+class JobWorkers:
+    """
+    Threads that claim queued jobs, run execute_fn(kind, items) and store the
+    result, then POST it to the job's callback URL (retried with backoff).
+    Callbacks are signed with HMAC-SHA256 of the body when a secret is set.
+    """
+
+    def __init__(self, store, execute_fn, workers=2, poll_interval_seconds=1.0, purge_interval_seconds=60,
+                 callback_timeout_seconds=10, callback_attempts=3, callback_secret=None):
+        self.store = store
+        self.execute_fn = execute_fn
+        self.poll_interval = float(poll_interval_seconds)
+        self.callback_timeout = float(callback_timeout_seconds)
+        self.callback_attempts = max(1, int(callback_attempts))
+        self.callback_secret = callback_secret.encode() if callback_secret else None
+        self._wake = threading.Event()
+        # Slow callback receivers must not hold up the job workers
+        self._callbacks = ThreadPoolExecutor(max_workers=2, thread_name_prefix='job-callback')
+
+        for index in range(max(1, int(workers))):
+            threading.Thread(target=self._run, name=f'job-worker-{index}', daemon=True).start()
+        threading.Thread(target=self._purge_loop, args=(purge_interval_seconds,),
+                         name='job-purge', daemon=True).start()
+        logger.info(f"{workers} job workers started on {store.path}")
+
+    def wake(self):
+        """Start a newly submitted job now instead of at the next poll"""
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            try:
+                claimed = self.store.claim()
+            except Exception as e:
+                logger.error(f"Could not claim a job: {e}")
+                claimed = None
+            if claimed is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+
+            job_id, kind, items = claimed
+            try:
+                job = self.store.finish(job_id, result=self.execute_fn(kind, items))
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}")
+                job = self.store.finish(job_id, error=str(e))
+            if job is not None and job['callback']:
+                self._callbacks.submit(self._deliver, job)
+
+    def _deliver(self, job):
+        """POST the finished job to its callback URL"""
+        body = json.dumps(job).encode()
+        headers = {'Content-Type': 'application/json'}
+        if self.callback_secret:
+            headers[SIGNATURE_HEADER] = 'sha256=' + hmac.new(self.callback_secret, body, hashlib.sha256).hexdigest()
+
+        for attempt in range(self.callback_attempts):
+            try:
+                callback = urllib.request.Request(job['callback']['url'], data=body, headers=headers, method='POST')
+                with urllib.request.urlopen(callback, timeout=self.callback_timeout):
+                    pass
+                self.store.set_callback_state(job['job_id'], 'delivered')
+                return
+            except Exception as e:
+                logger.warning(f"Callback for job {job['job_id']} failed (attempt {attempt + 1}): {e}")
+                if attempt + 1 < self.callback_attempts:
+                    time.sleep(2 ** attempt)
+        self.store.set_callback_state(job['job_id'], 'failed')
+
+    def _purge_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                purged = self.store.purge_expired()
+                if purged:
+                    logger.info(f"Purged {purged} expired jobs")
+            except Exception as e:
+                logger.warning(f"Could not purge expired jobs: {e}")
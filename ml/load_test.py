@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+DisasterLink ML - Load Test
+Drives a running disaster_api.py (or mock_disaster_api.py) with a weighted
+mix of /verify_disaster, /predict and /predict_base64 requests at increasing
+concurrency. Payloads are synthetic photos of several sizes, with and without
+fresh camera EXIF, and every request carries unique bytes so the result cache
+never answers it. Each step reports throughput, p50/p95/p99 latency and error
+rates against the latency SLO (by default Laravel's 30s ml_timeout).
+
+Usage:
+  py load_test.py --url http://localhost:5000
+  py load_test.py --url http://localhost:5001 --concurrency 1 4 16   (mock API)
+"""
+
+import argparse
+import base64
+import io
+import itertools
+import json
+import random
+import struct
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import requests
+from PIL import Image
+
+ENDPOINTS = ('verify_disaster', 'predict', 'predict_base64', 'verify_disaster_binary', 'predict_binary')
+DEFAULT_MIX = 'verify_disaster=0.6,predict=0.2,predict_base64=0.2'
+
+def parse_mix(mix):
+    """'verify_disaster=0.6,predict=0.4' -> {'verify_disaster': 0.6, 'predict': 0.4}"""
+    weights = {}
+    for part in mix.split(','):
+        endpoint, _, weight = part.partition('=')
+        endpoint = endpoint.strip()
+        if endpoint not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{endpoint}' (choose from {', '.join(ENDPOINTS)})")
+        weights[endpoint] = float(weight or 1)
+    return weights
+
+def parse_size(size):
+    width, _, height = size.lower().partition('x')
+    return int(width), int(height)
+
+def make_photo(size, rng, quality=85):
+    """
+    Photo-like JPEG: smooth low-frequency content plus mild sensor noise, so
+    file sizes are close to real camera output (pure noise would not compress)
+    """
+    width, height = size
+    base = rng.integers(0, 256, size=(max(height // 32, 2), max(width // 32, 2), 3), dtype=np.uint8)
+    image = Image.fromarray(base).resize(size, Image.BICUBIC)
+    pixels = np.asarray(image, dtype=np.int16) + rng.integers(-6, 7, size=(height, width, 3), dtype=np.int16)
+    buffer = io.BytesIO()
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(buffer, format='JPEG', quality=quality)
+    return buffer.getvalue()
+
+def _jpeg_segment(marker, payload):
+    return marker + struct.pack('>H', len(payload) + 2) + payload
+
+def camera_exif():
+    """APP1 EXIF payload of a phone capture taken now (camera make/model, capture time)"""
+    exif = Image.Exif()
+    exif[0x010F] = 'DisasterLink'  # Make
+    exif[0x0110] = 'LoadTest Camera'  # Model
+    exif[0x0132] = datetime.now().strftime('%Y:%m:%d %H:%M:%S')  # DateTime
+    return exif.tobytes()
+
+def stamp(jpeg_bytes, nonce, with_exif):
+    """
+    Make the image unique (JPEG comment with a nonce) and optionally add fresh
+    EXIF by splicing segments after SOI, without re-encoding the pixels
+    """
+    segments = _jpeg_segment(b'\xff\xfe', f'load-test {nonce}'.encode())
+    if with_exif:
+        segments = _jpeg_segment(b'\xff\xe1', camera_exif()) + segments
+    return jpeg_bytes[:2] + segments + jpeg_bytes[2:]
+
+class RequestFactory:
+    """Builds one request (method kwargs) for an endpoint from a random base photo"""
+
+    def __init__(self, photos, exif_fraction, seed=42):
+        self.photos = photos
+        self.exif_fraction = exif_fraction
+        self.nonce = itertools.count()
+        self.lock = threading.Lock()
+        self.seed = seed
+
+    def build(self, endpoint, rng):
+        with self.lock:
+            nonce = next(self.nonce)
+        with_exif = rng.random() < self.exif_fraction
+        image_bytes = stamp(rng.choice(self.photos), nonce, with_exif)
+        metadata = {
+            'source': 'camera',
+            'capture_time': datetime.now().isoformat(),
+            'device': 'load_test'
+        }
+        location = {'latitude': 14.5995 + rng.uniform(-0.5, 0.5), 'longitude': 120.9842 + rng.uniform(-0.5, 0.5)}
+
+        if endpoint == 'verify_disaster':
+            return {'json': {'image': base64.b64encode(image_bytes).decode(), 'metadata': metadata, 'location': location}}
+        if endpoint == 'predict':
+            return {'files': {'image': (f'report_{nonce}.jpg', image_bytes, 'image/jpeg')}}
+        if endpoint == 'predict_base64':
+            return {'json': {'image': base64.b64encode(image_bytes).decode()}}
+
+        headers = {'Content-Type': 'application/octet-stream'}
+        if endpoint == 'verify_disaster_binary':
+            headers['X-Capture-Metadata'] = json.dumps(metadata)
+            headers['X-User-Location'] = json.dumps(location)
+        return {'data': image_bytes, 'headers': headers}
+
+def run_step(base_url, factory, mix, concurrency, duration, timeout):
+    """Closed loop: each client sends its next request as soon as the previous one returns"""
+    endpoints = list(mix)
+    weights = [mix[endpoint] for endpoint in endpoints]
+    samples = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(client_id):
+        rng = random.Random(factory.seed * 1000 + client_id)
+        session = requests.Session()
+        local = []
+        while time.perf_counter() < deadline:
+            endpoint = rng.choices(endpoints, weights)[0]
+            kwargs = factory.build(endpoint, rng)
+            start = time.perf_counter()
+            try:
+                status = session.post(f'{base_url}/{endpoint}', timeout=timeout, **kwargs).status_code
+            except requests.Timeout:
+                status = 'timeout'
+            except requests.RequestException:
+                status = 'connection_error'
+            local.append((endpoint, status, time.perf_counter() - start))
+        with lock:
+            samples.extend(local)
+
+    start = time.perf_counter()
+    clients = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    result = summarize(samples, elapsed)
+    result['concurrency'] = concurrency
+    result['endpoints'] = {
+        endpoint: summarize([sample for sample in samples if sample[0] == endpoint], elapsed)
+        for endpoint in endpoints
+    }
+    return result
+
+def summarize(samples, elapsed):
+    """
+    Errors are transport failures, timeouts and 5xx; 4xx answers (e.g. 403 for
+    a photo without fresh EXIF) are counted as rejections, not errors
+    """
+    statuses = [status for _, status, _ in samples]
+    latency_ms = np.array([latency for _, _, latency in samples]) * 1000 if samples else np.zeros(1)
+    errors = sum(1 for status in statuses if not isinstance(status, int) or status >= 500)
+    rejected = sum(1 for status in statuses if isinstance(status, int) and 400 <= status < 500)
+    status_counts = {}
+    for status in statuses:
+        status_counts[str(status)] = status_counts.get(str(status), 0) + 1
+    return {
+        'requests': len(samples),
+        'throughput': len(samples) / elapsed if elapsed else 0.0,
+        'latency_ms_p50': float(np.percentile(latency_ms, 50)),
+        'latency_ms_p95': float(np.percentile(latency_ms, 95)),
+        'latency_ms_p99': float(np.percentile(latency_ms, 99)),
+        'error_rate': errors / len(samples) if samples else 0.0,
+        'rejection_rate': rejected / len(samples) if samples else 0.0,
+        'status_counts': status_counts
+    }
+
+def wait_for_api(base_url, timeout=300):
+    """Wait until the API reports ready (/health/ready, or /health on the mock)"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        for path in ('/health/ready', '/health'):
+            try:
+                response = requests.get(base_url + path, timeout=5)
+            except requests.RequestException:
+                break
+            if response.status_code == 200:
+                return True
+            if response.status_code != 404:
+                break
+        time.sleep(1)
+    return False
+
+def main():
+    parser = argparse.ArgumentParser(description='Step-load the verification API and report against a latency SLO')
+    parser.add_argument('--url', default='http://localhost:5000', help='API base URL (mock: http://localhost:5001)')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f'Endpoint weights, default {DEFAULT_MIX}')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument('--step-duration', type=float, default=30.0, help='Seconds per concurrency step')
+    parser.add_argument('--sizes', nargs='+', default=['640x480', '1280x960', '1920x1440', '4032x3024'],
+                        help='Photo sizes (WxH) to draw payloads from')
+    parser.add_argument('--photos-per-size', type=int, default=4)
+    parser.add_argument('--exif-fraction', type=float, default=0.8,
+                        help='Share of requests carrying fresh camera EXIF (the rest look like gallery uploads)')
+    parser.add_argument('--slo-ms', type=float, default=30000, help='p99 latency objective (Laravel ml_timeout)')
+    parser.add_argument('--timeout', type=float, default=None, help='Client timeout in seconds (default: the SLO)')
+    parser.add_argument('--continue-after-breach', action='store_true',
+                        help='Keep stepping up after a step misses the SLO')
+    parser.add_argument('--output', default='load_test_report.json')
+    args = parser.parse_args()
+    base_url = args.url.rstrip('/')
+    timeout = args.timeout or args.slo_ms / 1000
+
+    print(f"🔥 DisasterLink load test against {base_url}")
+    print(f"🎯 SLO: p99 ≤ {args.slo_ms / 1000:.1f}s, mix: "
+          + ', '.join(f'{endpoint} {weight:g}' for endpoint, weight in args.mix.items()))
+    if not wait_for_api(base_url):
+        raise SystemExit(f"❌ API at {base_url} is not ready")
+
+    rng = np.random.default_rng(42)
+    photos = [make_photo(parse_size(size), rng) for size in args.sizes for _ in range(args.photos_per_size)]
+    print(f"🖼️  {len(photos)} base photos, {min(map(len, photos)) / 1024:.0f}KB - {max(map(len, photos)) / 1024:.0f}KB, "
+          f"{args.exif_fraction * 100:.0f}% with fresh EXIF")
+    factory = RequestFactory(photos, args.exif_fraction)
+
+    print(f"\n{'Clients':<9}{'Req/s':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'Errors':>9}{'4xx':>8}")
+    steps = []
+    for concurrency in args.concurrency:
+        step = run_step(base_url, factory, args.mix, concurrency, args.step_duration, timeout)
+        step['meets_slo'] = step['latency_ms_p99'] <= args.slo_ms and step['error_rate'] == 0
+        steps.append(step)
+        print(f"{concurrency:<9}{step['throughput']:>8.1f}{step['latency_ms_p50']:>8.0f}ms"
+              f"{step['latency_ms_p95']:>8.0f}ms{step['latency_ms_p99']:>8.0f}ms"
+              f"{step['error_rate'] * 100:>8.1f}%{step['rejection_rate'] * 100:>7.1f}%"
+              f"{'' if step['meets_slo'] else '  ❌ SLO'}")
+        if not step['meets_slo'] and not args.continue_after_breach:
+            break
+
+    passing = [step for step in steps if step['meets_slo']]
+    best = max(passing, key=lambda step: step['throughput']) if passing else None
+    if best:
+        print(f"\n✅ Highest concurrency within SLO: {max(step['concurrency'] for step in passing)} clients; "
+              f"peak {best['throughput']:.1f} req/s at {best['concurrency']} clients")
+    else:
+        print("\n❌ No step met the SLO")
+
+    report = {
+        'url': base_url,
+        'mix': args.mix,
+        'slo_ms': args.slo_ms,
+        'timeout_s': timeout,
+        'step_duration_s': args.step_duration,
+        'photo_sizes': args.sizes,
+        'exif_fraction': args.exif_fraction,
+        'max_concurrency_within_slo': max((step['concurrency'] for step in passing), default=None),
+        'steps': steps
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Report saved to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -1,33 +1,241 @@
 """
 Mock DisasterLink ML API for Testing Week 1 Integration
-This provides the same endpoints as the full ML API but with mock responses
+This provides the same endpoints as the full ML API but with mock responses.
+It doubles as a performance stand-in (``mock`` section of model_config.json):
+per-endpoint latency distributions, a fixed number of inference slots with a
+bounded queue, injected 5xx errors and timeouts, and verdicts derived from
+the image hash so the same photo always gets the same answer.
 """
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+import argparse
 import base64
+import binascii
+import hashlib
 import json
+import math
+import re
+import threading
 import time
 from datetime import datetime
+from pathlib import Path
+from statistics import NormalDist
 import random
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for Laravel integration
 
-# Mock responses for testing
-MOCK_RESPONSES = {
-    'authentic_disaster': {
-        'prediction': 'real',
-        'confidence': 0.87,
-        'probabilities': {'fake': 0.13, 'real': 0.87}
+# Used for any key missing from the 'mock' config section
+DEFAULT_MOCK_CONFIG = {
+    'port': 5001,
+    'inference_slots': 4,
+    'max_queue': 64,
+    'latency': {
+        'verify_disaster': {'distribution': 'lognormal', 'median_ms': 450, 'sigma': 0.3},
+        'predict': {'distribution': 'lognormal', 'median_ms': 300, 'sigma': 0.3},
+        'predict_base64': {'distribution': 'lognormal', 'median_ms': 200, 'sigma': 0.3}
     },
-    'fake_disaster': {
-        'prediction': 'fake', 
-        'confidence': 0.92,
-        'probabilities': {'fake': 0.92, 'real': 0.08}
-    }
+    'error_rate': 0.0,
+    'timeout_rate': 0.0,
+    'timeout_seconds': 35,
+    'seed': None
+}
+
+# Binary endpoints take their latency from the base64 equivalent unless configured
+LATENCY_FALLBACK = {
+    'verify_disaster_binary': 'verify_disaster',
+    'predict_binary': 'predict_base64'
 }
 
+def load_mock_config(config_path=None):
+    """Load the 'mock' section of model_config.json on top of the defaults"""
+    config_path = Path(config_path) if config_path else Path(__file__).parent / 'model_config.json'
+    try:
+        with open(config_path, 'r') as f:
+            section = json.load(f).get('mock', {})
+    except Exception as e:
+        print(f"⚠️  Could not read mock config from {config_path}: {e}")
+        section = {}
+    config = dict(DEFAULT_MOCK_CONFIG, **section)
+    config['latency'] = dict(DEFAULT_MOCK_CONFIG['latency'], **section.get('latency', {}))
+    return config
+
+class LatencyModel:
+    """
+    Samples service times (seconds) from one distribution:
+    constant (ms), uniform (min_ms, max_ms), normal (mean_ms, std_ms) or
+    lognormal (median_ms, sigma of the underlying normal)
+    """
+
+    def __init__(self, spec, rng, rng_lock):
+        self.spec = spec
+        self.rng = rng
+        self.rng_lock = rng_lock
+
+    def sample(self):
+        spec = self.spec
+        distribution = spec.get('distribution', 'constant')
+        with self.rng_lock:
+            if distribution == 'constant':
+                value_ms = spec['ms']
+            elif distribution == 'uniform':
+                value_ms = self.rng.uniform(spec['min_ms'], spec['max_ms'])
+            elif distribution == 'normal':
+                value_ms = self.rng.gauss(spec['mean_ms'], spec['std_ms'])
+            elif distribution == 'lognormal':
+                value_ms = self.rng.lognormvariate(math.log(spec['median_ms']), spec['sigma'])
+            else:
+                raise ValueError(f"Unknown latency distribution '{distribution}'")
+        return max(value_ms, 0.0) / 1000
+
+class InferenceSlots:
+    """
+    A fixed number of concurrent 'forward passes'. Requests beyond that wait
+    in a FIFO-ish queue; once max_queue requests are waiting, new ones are
+    turned away, like an overloaded model server.
+    """
+
+    def __init__(self, slots, max_queue):
+        self.slots = max(1, int(slots))
+        self.max_queue = int(max_queue)
+        self._semaphore = threading.BoundedSemaphore(self.slots)
+        self._lock = threading.Lock()
+        self._stats = {'busy': 0, 'waiting': 0, 'completed': 0, 'rejected': 0}
+
+    def run(self, service_time):
+        """Hold a slot for service_time; returns the queue wait, or None if the queue was full"""
+        with self._lock:
+            if self._stats['waiting'] >= self.max_queue:
+                self._stats['rejected'] += 1
+                return None
+            self._stats['waiting'] += 1
+
+        start = time.perf_counter()
+        self._semaphore.acquire()
+        queue_wait = time.perf_counter() - start
+        with self._lock:
+            self._stats['waiting'] -= 1
+            self._stats['busy'] += 1
+        try:
+            time.sleep(service_time)
+        finally:
+            with self._lock:
+                self._stats['busy'] -= 1
+                self._stats['completed'] += 1
+            self._semaphore.release()
+        return queue_wait
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats, slots=self.slots, max_queue=self.max_queue)
+
+def configure(config):
+    """(Re)build the latency models, slots and fault generator from a mock config"""
+    global mock_config, latency_models, inference_slots, fault_rng
+    mock_config = config
+    rng_lock = threading.Lock()
+    seed = config.get('seed')
+    latency_models = {
+        endpoint: LatencyModel(spec, random.Random(None if seed is None else f'{seed}:{endpoint}'), rng_lock)
+        for endpoint, spec in config['latency'].items()
+    }
+    inference_slots = InferenceSlots(config['inference_slots'], config['max_queue'])
+    fault_rng = (random.Random(seed), rng_lock)
+
+configure(load_mock_config())
+
+def verdict_from_hash(image_bytes):
+    """Deterministic P(real) in [0.02, 0.98] from the SHA-256 of the image bytes"""
+    digest = hashlib.sha256(image_bytes).digest()
+    fraction = int.from_bytes(digest[:8], 'big') / 2 ** 64
+    p_real = round(0.02 + 0.96 * fraction, 4)
+    is_real = p_real >= 0.5
+    return {
+        'prediction': 'real' if is_real else 'fake',
+        'confidence': p_real if is_real else round(1 - p_real, 4),
+        'probabilities': {'fake': round(1 - p_real, 4), 'real': p_real}
+    }
+
+def simulate_inference(endpoint, verify_style):
+    """
+    Inject faults, then wait for an inference slot and hold it for a sampled
+    service time. Returns {'processing_time': seconds}, or {'response': body,
+    'http_status': status} like the real API's request stages.
+    """
+    rng, rng_lock = fault_rng
+    with rng_lock:
+        draw = rng.random()
+
+    if draw < mock_config['timeout_rate']:
+        # Hold the connection past the client's timeout
+        time.sleep(mock_config['timeout_seconds'])
+        message, status = 'Mock: injected timeout', 504
+    elif draw < mock_config['timeout_rate'] + mock_config['error_rate']:
+        message, status = 'Mock: injected server error', 500
+    else:
+        model = latency_models.get(endpoint) or latency_models[LATENCY_FALLBACK[endpoint]]
+        service_time = model.sample()
+        queue_wait = inference_slots.run(service_time)
+        if queue_wait is not None:
+            return {'processing_time': queue_wait + service_time}
+        message, status = 'Mock: inference queue full', 503
+
+    if verify_style:
+        return {'response': {'success': False, 'error': 'MOCK_PROCESSING_ERROR', 'message': message}, 'http_status': status}
+    return {'response': {'error': message, 'status': 'error'}, 'http_status': status}
+
+def build_verification_result(image_bytes, processing_time):
+    verdict = verdict_from_hash(image_bytes)
+    is_authentic = verdict['prediction'] == 'real'
+    return {
+        'success': True,
+        'capture_validation': {
+            'is_fresh_capture': True,
+            'capture_confidence': 0.85,
+            'validation_details': 'Mock: Fresh capture detected'
+        },
+        'disaster_analysis': {
+            'is_authentic': is_authentic,
+            'authenticity_score': verdict['confidence'],
+            'confidence_level': 'HIGH' if verdict['confidence'] > 0.8 else 'MEDIUM',
+            'status': 'VERIFIED_AUTHENTIC' if is_authentic else 'LIKELY_FAKE',
+            'probabilities': verdict['probabilities']
+        },
+        'recommendation': {
+            'action': 'PROCEED_WITH_REPORT' if is_authentic else 'REJECT_SUBMISSION',
+            'message': 'Mock: Image verified as authentic disaster documentation' if is_authentic else 'Mock: Image appears to be manipulated'
+        },
+        'metadata': {
+            'processing_time': round(processing_time, 4),
+            'model_version': 'MOCK_1.0',
+            'timestamp': datetime.now().isoformat(),
+            'mode': 'TESTING'
+        }
+    }
+
+def build_prediction_result(image_bytes, processing_time):
+    result = verdict_from_hash(image_bytes)
+    result.update({
+        'prediction_time': round(processing_time, 4),
+        'status': 'success',
+        'image_size': [224, 224],
+        'file_size': len(image_bytes),
+        'timestamp': time.time(),
+        'model_version': 'MOCK_1.0',
+        'mode': 'TESTING'
+    })
+    return result
+
+def decode_base64_image(data):
+    """Image bytes from a JSON body's 'image' field, or None if absent or not base64"""
+    if not data or 'image' not in data:
+        return None
+    try:
+        return base64.b64decode(data['image'])
+    except (binascii.Error, TypeError, ValueError):
+        return None
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -41,6 +249,11 @@ def health_check():
             'Base64 image processing',
             'Real-time API simulation'
         ],
+        'inference_slots': inference_slots.get_stats(),
+        'faults': {
+            'error_rate': mock_config['error_rate'],
+            'timeout_rate': mock_config['timeout_rate']
+        },
         'timestamp': time.time()
     })
 
@@ -51,49 +264,45 @@ def verify_disaster():
     Returns realistic responses for testing
     """
     try:
-        data = request.get_json()
-        
-        if 'image' not in data:
+        image_bytes = decode_base64_image(request.get_json(silent=True))
+        if image_bytes is None:
             return jsonify({
                 'success': False,
                 'error': 'No image provided'
             }), 400
 
-        # Simulate processing time
-        time.sleep(0.5)
-        
-        # Randomly choose authentic or fake for testing
-        is_authentic = random.choice([True, False])
-        mock_data = MOCK_RESPONSES['authentic_disaster'] if is_authentic else MOCK_RESPONSES['fake_disaster']
-        
-        result = {
-            'success': True,
-            'capture_validation': {
-                'is_fresh_capture': True,
-                'capture_confidence': 0.85,
-                'validation_details': 'Mock: Fresh capture detected'
-            },
-            'disaster_analysis': {
-                'is_authentic': is_authentic,
-                'authenticity_score': mock_data['confidence'],
-                'confidence_level': 'HIGH' if mock_data['confidence'] > 0.8 else 'MEDIUM',
-                'status': 'VERIFIED_AUTHENTIC' if is_authentic else 'LIKELY_FAKE',
-                'probabilities': mock_data['probabilities']
-            },
-            'recommendation': {
-                'action': 'PROCEED_WITH_REPORT' if is_authentic else 'REJECT_SUBMISSION',
-                'message': 'Mock: Image verified as authentic disaster documentation' if is_authentic else 'Mock: Image appears to be manipulated'
-            },
-            'metadata': {
-                'processing_time': 0.5,
-                'model_version': 'MOCK_1.0',
-                'timestamp': datetime.now().isoformat(),
-                'mode': 'TESTING'
-            }
-        }
-        
-        return jsonify(result)
-        
+        # Simulate queueing and processing time
+        outcome = simulate_inference('verify_disaster', verify_style=True)
+        if 'response' in outcome:
+            return jsonify(outcome['response']), outcome['http_status']
+
+        return jsonify(build_verification_result(image_bytes, outcome['processing_time']))
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': 'MOCK_PROCESSING_ERROR',
+            'message': str(e)
+        }), 500
+
+@app.route('/verify_disaster_binary', methods=['POST'])
+def verify_disaster_binary():
+    """Mock raw-body verification endpoint"""
+    try:
+        image_bytes = request.get_data(cache=False)
+        if not image_bytes:
+            return jsonify({
+                'success': False,
+                'error': 'INVALID_IMAGE',
+                'message': 'No image provided'
+            }), 400
+
+        outcome = simulate_inference('verify_disaster_binary', verify_style=True)
+        if 'response' in outcome:
+            return jsonify(outcome['response']), outcome['http_status']
+
+        return jsonify(build_verification_result(image_bytes, outcome['processing_time']))
+
     except Exception as e:
         return jsonify({
             'success': False,
@@ -104,44 +313,30 @@ def verify_disaster():
 @app.route('/predict', methods=['POST'])
 def predict_disaster_authenticity():
     """Mock prediction endpoint for file uploads"""
-    
+
     try:
         if 'image' not in request.files:
             return jsonify({
                 'error': 'No image provided',
                 'status': 'error'
             }), 400
-        
+
         image_file = request.files['image']
-        
+
         if image_file.filename == '':
             return jsonify({
-                'error': 'No image selected', 
+                'error': 'No image selected',
                 'status': 'error'
             }), 400
 
-        # Simulate processing
-        time.sleep(0.3)
-        
-        # Random prediction for testing
-        is_real = random.choice([True, False])
-        mock_data = MOCK_RESPONSES['authentic_disaster'] if is_real else MOCK_RESPONSES['fake_disaster']
-        
-        result = {
-            'prediction': mock_data['prediction'],
-            'confidence': mock_data['confidence'],
-            'probabilities': mock_data['probabilities'],
-            'prediction_time': 0.3,
-            'status': 'success',
-            'image_size': [224, 224],
-            'file_size': 1024,
-            'timestamp': time.time(),
-            'model_version': 'MOCK_1.0',
-            'mode': 'TESTING'
-        }
-        
-        return jsonify(result)
-        
+        # Simulate queueing and processing
+        image_bytes = image_file.read()
+        outcome = simulate_inference('predict', verify_style=False)
+        if 'response' in outcome:
+            return jsonify(outcome['response']), outcome['http_status']
+
+        return jsonify(build_prediction_result(image_bytes, outcome['processing_time']))
+
     except Exception as e:
         return jsonify({
             'error': f'Mock error: {str(e)}',
@@ -151,37 +346,47 @@ def predict_disaster_authenticity():
 @app.route('/predict_base64', methods=['POST'])
 def predict_from_base64():
     """Mock base64 prediction endpoint"""
-    
+
     try:
-        data = request.get_json()
-        
-        if 'image' not in data:
+        image_bytes = decode_base64_image(request.get_json(silent=True))
+        if image_bytes is None:
             return jsonify({
                 'error': 'No base64 image provided',
                 'status': 'error'
             }), 400
-        
-        # Simulate processing
-        time.sleep(0.2)
-        
-        # Random prediction
-        is_real = random.choice([True, False])
-        mock_data = MOCK_RESPONSES['authentic_disaster'] if is_real else MOCK_RESPONSES['fake_disaster']
-        
-        result = {
-            'prediction': mock_data['prediction'],
-            'confidence': mock_data['confidence'], 
-            'probabilities': mock_data['probabilities'],
-            'prediction_time': 0.2,
-            'status': 'success',
-            'image_size': [224, 224],
-            'timestamp': time.time(),
-            'model_version': 'MOCK_1.0',
-            'mode': 'TESTING'
-        }
-        
+
+        # Simulate queueing and processing
+        outcome = simulate_inference('predict_base64', verify_style=False)
+        if 'response' in outcome:
+            return jsonify(outcome['response']), outcome['http_status']
+
+        result = build_prediction_result(image_bytes, outcome['processing_time'])
+        del result['file_size']
         return jsonify(result)
-        
+
+    except Exception as e:
+        return jsonify({
+            'error': f'Mock error: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@app.route('/predict_binary', methods=['POST'])
+def predict_from_binary():
+    """Mock raw-body prediction endpoint"""
+    try:
+        image_bytes = request.get_data(cache=False)
+        if not image_bytes:
+            return jsonify({
+                'error': 'No image provided',
+                'status': 'error'
+            }), 400
+
+        outcome = simulate_inference('predict_binary', verify_style=False)
+        if 'response' in outcome:
+            return jsonify(outcome['response']), outcome['http_status']
+
+        return jsonify(build_prediction_result(image_bytes, outcome['processing_time']))
+
     except Exception as e:
         return jsonify({
             'error': f'Mock error: {str(e)}',
@@ -204,34 +409,102 @@ def get_model_info():
         'features': [
             'Mock disaster verification',
             'Laravel integration testing',
-            'Random predictions for testing',
+            'Deterministic predictions from the image hash',
+            'Configurable latency, concurrency and fault injection',
             'All endpoints functional'
         ],
         'api_endpoints': {
             'verify_disaster': '/verify_disaster',
+            'verify_disaster_binary': '/verify_disaster_binary',
             'predict': '/predict',
             'predict_base64': '/predict_base64',
+            'predict_binary': '/predict_binary',
             'health': '/health',
             'model_info': '/model_info'
         },
+        'mock_config': mock_config,
         'testing_note': 'This is a mock API for Week 1 testing. Actual ML model integration will be completed in Week 2.'
     })
 
+def fit_lognormal(buckets):
+    """
+    Fit (median_ms, sigma) to cumulative [(upper_bound, count), ...] buckets:
+    for a lognormal, ln(bound) = mu + sigma * z where z is the standard normal
+    quantile of the fraction of samples at or below the bound, so a straight
+    line through those points gives mu and sigma
+    """
+    total = buckets[-1][1]
+    points = [(NormalDist().inv_cdf(count / total), math.log(bound))
+              for bound, count in buckets if not math.isinf(bound) and 0 < count < total]
+    if len(points) < 2:
+        return None
+    mean_z = sum(z for z, _ in points) / len(points)
+    mean_log = sum(log_bound for _, log_bound in points) / len(points)
+    spread = sum((z - mean_z) ** 2 for z, _ in points)
+    if spread == 0:
+        return None
+    sigma = sum((z - mean_z) * (log_bound - mean_log) for z, log_bound in points) / spread
+    mu = mean_log - sigma * mean_z
+    return round(math.exp(mu) * 1000, 1), round(max(sigma, 0.01), 3)
+
+def fit_latency_from_metrics(metrics_text, min_samples=20):
+    """Lognormal latency per endpoint fitted to the request latency histograms of a real API's /metrics"""
+    pattern = re.compile(r'^disaster_api_request_duration_seconds_bucket\{endpoint="/([^"]+)",le="([^"]+)"\} (\S+)$')
+    buckets = {}
+    for line in metrics_text.splitlines():
+        match = pattern.match(line)
+        if match:
+            endpoint, bound, count = match.groups()
+            buckets.setdefault(endpoint, []).append((float(bound), float(count)))
+
+    latency = {}
+    for endpoint, rows in buckets.items():
+        if endpoint not in DEFAULT_MOCK_CONFIG['latency'] and endpoint not in LATENCY_FALLBACK:
+            continue
+        rows.sort()
+        if rows[-1][1] < min_samples:
+            continue
+        fitted = fit_lognormal(rows)
+        if fitted:
+            latency[endpoint] = {'distribution': 'lognormal', 'median_ms': fitted[0], 'sigma': fitted[1]}
+    return latency
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mock DisasterLink ML API')
+    parser.add_argument('--config', help='JSON file with a "mock" section (default: model_config.json)')
+    parser.add_argument('--port', type=int, help='Port (default: mock.port, 5001)')
+    parser.add_argument('--fit-from', metavar='URL',
+                        help='Print a latency config fitted to the /metrics of a running real API, then exit')
+    args = parser.parse_args()
+
+    if args.fit_from:
+        import requests
+        metrics_text = requests.get(args.fit_from.rstrip('/') + '/metrics', timeout=10).text
+        print(json.dumps({'latency': fit_latency_from_metrics(metrics_text)}, indent=2))
+        raise SystemExit(0)
+
+    if args.config:
+        configure(load_mock_config(args.config))
+
     print("🧪 Starting DisasterLink MOCK ML API for Week 1 Testing...")
     print("✅ Mock Model loaded: TRUE")
     print("🔧 Mode: TESTING")
     print("📡 Available endpoints:")
     print("- POST /verify_disaster - Mock disaster verification")
+    print("- POST /verify_disaster_binary - Mock raw-body verification")
     print("- POST /predict - Mock image upload prediction")
     print("- POST /predict_base64 - Mock base64 prediction")
+    print("- POST /predict_binary - Mock raw-body prediction")
     print("- GET /model_info - Mock model information")
     print("- GET /health - Health check")
-    print("\n🎯 Week 1 Testing Features:")
-    print("- Mock ML predictions (random authentic/fake)")
-    print("- Laravel integration testing")
-    print("- All API endpoints functional")
-    print("- Realistic response simulation")
+    print("\n🎯 Performance simulation:")
+    print(f"- Inference slots: {mock_config['inference_slots']} (queue up to {mock_config['max_queue']}, then 503)")
+    for endpoint, spec in mock_config['latency'].items():
+        print(f"- {endpoint} latency: {json.dumps(spec)}")
+    print(f"- Injected faults: {mock_config['error_rate'] * 100:.1f}% 5xx, "
+          f"{mock_config['timeout_rate'] * 100:.1f}% timeouts ({mock_config['timeout_seconds']}s)")
+    print("- Deterministic predictions from the image hash")
     print("\n🚀 Ready for Laravel integration testing!")
-    
-    app.run(host='0.0.0.0', port=5001, debug=True)
+
+    # Threaded, without the debug reloader, so concurrency behaves like the real server
+    app.run(host='0.0.0.0', port=args.port or mock_config['port'], threaded=True)
@@ -0,0 +1,72 @@
+"""
+DisasterLink ML API - Model Artifact Watcher
+Polls model_status.json (written by train_model.py once a training run has
+saved every artifact) so a retrained model is picked up without restarting
+the API.
+"""
+
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+class ModelWatcher:
+    """
+    Calls on_change(changed_paths) once a watched file has changed and its
+    size and modification time have then stayed the same for a whole poll
+    interval, so a checkpoint that is still being written is never loaded.
+    """
+
+    def __init__(self, paths, on_change, poll_interval_seconds=5):
+        self.paths = [Path(path) for path in paths]
+        self.on_change = on_change
+        self.poll_interval = max(0.1, float(poll_interval_seconds))
+        self._current = self._signatures()
+        self._pending = None
+
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+        self._thread.start()
+        logger.info(f"Watching {', '.join(map(str, self.paths))} for new models "
+                    f"(every {self.poll_interval:g}s)")
+
+    def _signatures(self):
+        signatures = {}
+        for path in self.paths:
+            try:
+                stat = path.stat()
+                signatures[str(path)] = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                signatures[str(path)] = None
+        return signatures
+
+    def check(self):
+        """One poll; returns the changed paths if on_change was called"""
+        signatures = self._signatures()
+        if signatures == self._current:
+            self._pending = None
+            return []
+        if signatures != self._pending:
+            # Changed since the last poll: wait for the writer to finish
+            self._pending = signatures
+            return []
+
+        changed = [path for path, signature in signatures.items()
+                   if signature is not None and signature != self._current.get(path)]
+        self._current = signatures
+        self._pending = None
+        if changed:
+            self.on_change(changed)
+        return changed
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join(timeout=1.0)
+
+    def _run(self):
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Model watcher error: {e}")
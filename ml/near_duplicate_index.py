@@ -0,0 +1,275 @@
+"""
+DisasterLink ML API - Near-Duplicate Index
+Perceptual hashes (pHash/dHash) of scored images in a multi-index hashing
+table, so recompressed, resized or slightly cropped copies of an image that
+was already verified get its verdict back without running the model.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from array import array
+from itertools import combinations
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+HASH_BITS = 64
+HASH_ALGORITHMS = ('phash', 'dhash')
+DIGEST_BYTES = 32  # SHA-256 of the original upload, used as its image id
+
+def _dct_matrix(size):
+    """Orthonormal DCT-II matrix"""
+    n = np.arange(size)
+    matrix = np.cos(np.pi * (2 * n[np.newaxis, :] + 1) * n[:, np.newaxis] / (2 * size)) * np.sqrt(2 / size)
+    matrix[0] /= np.sqrt(2)
+    return matrix.astype(np.float32)
+
+_PHASH_SIZE = 32
+_DCT = _dct_matrix(_PHASH_SIZE)
+
+_POPCOUNT8 = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+
+def _popcount(values):
+    """Set bits per uint64"""
+    if hasattr(np, 'bitwise_count'):  # NumPy 2.0+
+        return np.bitwise_count(values)
+    return _POPCOUNT8[values.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+def _bits_to_int(bits):
+    return int.from_bytes(np.packbits(bits.flatten()).tobytes(), 'big')
+
+def phash(image):
+    """
+    64-bit perceptual hash: sign of the 8x8 lowest DCT frequencies of a
+    32x32 grayscale thumbnail relative to their median. Survives
+    recompression, rescaling, small crops and colour adjustments.
+    """
+    thumbnail = image.convert('L').resize((_PHASH_SIZE, _PHASH_SIZE), Image.BILINEAR)
+    pixels = np.asarray(thumbnail, dtype=np.float32)
+    low = (_DCT @ pixels @ _DCT.T)[:8, :8]
+    return _bits_to_int(low > np.median(low))
+
+def dhash(image):
+    """64-bit difference hash: brightness gradient between neighbours of a 9x8 thumbnail"""
+    pixels = np.asarray(image.convert('L').resize((9, 8), Image.BILINEAR), dtype=np.int16)
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+class HammingIndex:
+    """
+    Multi-index hashing over 64-bit hashes. Each hash is split into four
+    16-bit chunks, each with its own table. Two hashes within Hamming distance
+    r differ by at most r // 4 bits in at least one chunk (pigeonhole), so a
+    query probes every chunk value within that radius and only verifies the
+    few candidates found there, instead of scanning every stored hash.
+    """
+
+    CHUNKS = 4
+    CHUNK_BITS = HASH_BITS // CHUNKS
+    CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+    def __init__(self, max_distance):
+        self.max_distance = max_distance
+        self.hashes = array('Q')
+        self.tables = [{} for _ in range(self.CHUNKS)]
+
+        # XOR masks for every chunk value within the probe radius
+        radius = max_distance // self.CHUNKS
+        self.probe_masks = [0] + [
+            sum(1 << bit for bit in bits)
+            for flipped in range(1, radius + 1)
+            for bits in combinations(range(self.CHUNK_BITS), flipped)
+        ]
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def _chunks(self, value):
+        return [(value >> (chunk * self.CHUNK_BITS)) & self.CHUNK_MASK for chunk in range(self.CHUNKS)]
+
+    def add(self, value):
+        """Store a hash; returns its position"""
+        position = len(self.hashes)
+        self.hashes.append(value)
+        for table, chunk in zip(self.tables, self._chunks(value)):
+            bucket = table.get(chunk)
+            if bucket is None:
+                bucket = table[chunk] = array('I')
+            bucket.append(position)
+        return position
+
+    def search(self, value):
+        """(position, distance) of the closest stored hash within max_distance, or None"""
+        buckets = [
+            bucket
+            for table, chunk in zip(self.tables, self._chunks(value))
+            for bucket in (table.get(chunk ^ mask) for mask in self.probe_masks)
+            if bucket is not None
+        ]
+        if not buckets:
+            return None
+
+        # Candidates are verified in one vectorised pass: at millions of hashes
+        # there are thousands of them, too many for a Python loop
+        candidates = np.concatenate([np.frombuffer(bucket, dtype=np.uint32) for bucket in buckets])
+        stored = np.frombuffer(self.hashes, dtype=np.uint64)[candidates]
+        distances = _popcount(stored ^ np.uint64(value))
+        closest = int(np.argmin(distances))
+        if distances[closest] > self.max_distance:
+            return None
+        return int(candidates[closest]), int(distances[closest])
+
+class NearDuplicateIndex:
+    """
+    Perceptual hash -> verdict store for one model version. Holds the
+    original image id (SHA-256 of its bytes) and P(real) per entry, which is
+    all that is needed to answer a near-duplicate. Optionally persisted to an
+    .npz file (loaded at startup, rewritten periodically and at exit).
+    """
+
+    def __init__(self, model_version, algorithm='phash', max_distance=6, max_entries=5_000_000,
+                 index_path=None, persist_interval_seconds=300, classes=('fake', 'real')):
+        if algorithm not in HASH_ALGORITHMS:
+            raise ValueError(f"Unknown perceptual hash '{algorithm}' (choose from {', '.join(HASH_ALGORITHMS)})")
+        self.model_version = model_version
+        self.algorithm = algorithm
+        self.hash_fn = phash if algorithm == 'phash' else dhash
+        self.max_entries = int(max_entries)
+        self.index_path = index_path
+        self.classes = list(classes)
+
+        self._lock = threading.Lock()
+        self._index = HammingIndex(max_distance)
+        self._image_ids = bytearray()
+        self._p_real = array('f')
+        self._dirty = False
+        self._stats = {'lookups': 0, 'hits': 0, 'inserts': 0, 'full': 0}
+
+        if index_path:
+            self.load(index_path)
+            if persist_interval_seconds:
+                threading.Thread(target=self._persist_loop, args=(persist_interval_seconds,),
+                                 name='near-duplicate-persist', daemon=True).start()
+            atexit.register(self.save)
+
+    def __len__(self):
+        return len(self._index)
+
+    def hash_image(self, image):
+        return self.hash_fn(image)
+
+    def lookup(self, image_hash):
+        """
+        Verdict of the closest stored near-duplicate, or None. The result has
+        the same fields as a model prediction plus near_duplicate_of (the id
+        of the stored image) and hamming_distance.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            self._stats['lookups'] += 1
+            match = self._index.search(image_hash)
+            if match is None:
+                return None
+            position, distance = match
+            self._stats['hits'] += 1
+            image_id = self._image_ids[position * DIGEST_BYTES:(position + 1) * DIGEST_BYTES].hex()
+            p_real = float(self._p_real[position])
+
+        predicted = 1 if p_real > 0.5 else 0
+        probabilities = {'fake': 1.0 - p_real, 'real': p_real}
+        return {
+            'prediction': self.classes[predicted],
+            'confidence': probabilities[self.classes[predicted]],
+            'probabilities': probabilities,
+            'prediction_time': time.perf_counter() - start,
+            'status': 'success',
+            'decided_by': 'near_duplicate_index',
+            'model_version': self.model_version,
+            'near_duplicate_of': image_id,
+            'hamming_distance': distance
+        }
+
+    def add(self, image_hash, image_id, result):
+        """Remember a successful prediction under the image's perceptual hash"""
+        if result.get('status') != 'success' or not image_id:
+            return
+        with self._lock:
+            if len(self._index) >= self.max_entries:
+                self._stats['full'] += 1
+                return
+            self._index.add(image_hash)
+            self._image_ids += bytes.fromhex(image_id)
+            self._p_real.append(result['probabilities']['real'])
+            self._stats['inserts'] += 1
+            self._dirty = True
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._index))
+        stats.update({
+            'algorithm': self.algorithm,
+            'max_distance': self._index.max_distance,
+            'max_entries': self.max_entries,
+            'hit_rate': stats['hits'] / stats['lookups'] if stats['lookups'] else 0.0,
+            'persisted_to': self.index_path
+        })
+        return stats
+
+    def save(self, path=None):
+        """Write the index atomically (temporary file + rename)"""
+        path = path or self.index_path
+        if not path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            hashes = np.frombuffer(self._index.hashes, dtype=np.uint64).copy()
+            image_ids = np.frombuffer(bytes(self._image_ids), dtype=np.uint8).reshape(-1, DIGEST_BYTES)
+            p_real = np.frombuffer(self._p_real, dtype=np.float32).copy()
+            self._dirty = False
+
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as f:
+            np.savez(f, hashes=hashes, image_ids=image_ids, p_real=p_real,
+                     model_version=np.array(self.model_version), algorithm=np.array(self.algorithm))
+        os.replace(temporary, path)
+        logger.info(f"Near-duplicate index saved ({len(hashes)} entries) to {path}")
+
+    def close(self):
+        """Final save, then stop persisting (the index is being replaced by one for a new model)"""
+        self.save()
+        self.index_path = None
+
+    def load(self, path):
+        """Load a saved index; ignored if missing or built for another model version or hash"""
+        if not os.path.exists(path):
+            return
+        try:
+            with np.load(path) as data:
+                if str(data['model_version']) != str(self.model_version) or str(data['algorithm']) != self.algorithm:
+                    logger.info(f"Ignoring near-duplicate index {path}: built for another model version or hash")
+                    return
+                hashes, image_ids, p_real = data['hashes'], data['image_ids'], data['p_real']
+        except Exception as e:
+            logger.warning(f"Could not load near-duplicate index from {path}: {e}")
+            return
+
+        with self._lock:
+            for value in hashes[:self.max_entries].tolist():
+                self._index.add(value)
+            count = len(self._index)
+            self._image_ids = bytearray(image_ids[:count].tobytes())
+            self._p_real = array('f', p_real[:count].tobytes())
+        logger.info(f"Near-duplicate index loaded ({count} entries) from {path}")
+
+    def _persist_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.save()
+            except Exception as e:
+                logger.warning(f"Could not save near-duplicate index: {e}")
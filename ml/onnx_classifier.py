@@ -0,0 +1,193 @@
+"""
+DisasterLink ML - ONNX Runtime Classifier
+Serves the ONNX export of DisasterAuthenticityModel with ONNX Runtime.
+Has the same interface and response structure as DisasterImageClassifier
+but never imports torch: preprocessing is PIL + NumPy and follows the
+contract embedded in the ONNX file (matching model_config_web.json).
+"""
+
+import json
+import logging
+import time
+
+import numpy as np
+import onnxruntime as ort
+from PIL import Image
+
+from prediction_cache import PredictionCache
+from image_ingestion import reduce_for_model
+
+logger = logging.getLogger(__name__)
+
+# Used when the ONNX file carries no preprocessing metadata
+DEFAULT_PREPROCESSING = {
+    'resize': [224, 224],
+    'normalize': {
+        'mean': [0.485, 0.456, 0.406],
+        'std': [0.229, 0.224, 0.225]
+    }
+}
+
+class OnnxImageClassifier:
+    def __init__(self, model_path='disaster_authenticity_model.onnx', cache_config=None, reduced_decode=True,
+                 num_threads=0):
+        self.model_path = model_path
+        self.backend = 'onnx'
+        self.num_threads = num_threads
+        self.num_interop_threads = 0
+
+        try:
+            self._create_session(num_threads)
+            metadata = self.session.get_modelmeta().custom_metadata_map
+            self.model_version = metadata.get('model_version', '1.0')
+            self.preprocessing = json.loads(metadata['preprocessing']) if 'preprocessing' in metadata else DEFAULT_PREPROCESSING
+            self.classes = json.loads(metadata['classes']) if 'classes' in metadata else ['fake', 'real']
+            logger.info(f"ONNX model loaded successfully ({', '.join(self.session.get_providers())})")
+        except Exception as e:
+            logger.error(f"Error loading ONNX model: {e}")
+            raise
+
+        self.embedding_dim = None
+
+        self.input_name = self.session.get_inputs()[0].name
+        self.output_name = self.session.get_outputs()[0].name
+        # (width, height) like PIL; fixed spatial dims of the graph's (N, C, H, W) input win over the metadata
+        _, _, height, width = self.session.get_inputs()[0].shape
+        if isinstance(height, int) and isinstance(width, int):
+            self.input_size = (width, height)
+        else:
+            self.input_size = tuple(self.preprocessing['resize'])
+        self.mean = np.array(self.preprocessing['normalize']['mean'], dtype=np.float32).reshape(3, 1, 1)
+        self.std = np.array(self.preprocessing['normalize']['std'], dtype=np.float32).reshape(3, 1, 1)
+
+        # Decode JPEGs at reduced resolution (DCT scaling) when they are far larger than the input size
+        self.reduced_decode = reduced_decode
+
+        # Result cache keyed on raw image bytes + model version
+        cache_config = cache_config or {}
+        self.result_cache = None
+        if cache_config.get('enabled', True):
+            self.result_cache = PredictionCache(
+                max_entries=cache_config.get('max_entries', 10000),
+                max_memory_mb=cache_config.get('max_memory_mb', 64),
+                ttl_seconds=cache_config.get('ttl_seconds', 3600)
+            )
+
+    def _create_session(self, num_threads):
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = self.num_interop_threads
+        self.session = ort.InferenceSession(self.model_path, sess_options=options,
+                                            providers=['CPUExecutionProvider'])
+
+    def set_num_threads(self, num_threads, num_interop_threads=None):
+        """Rebuild the session with fixed thread counts (ORT thread pools don't survive fork)"""
+        self.num_threads = num_threads
+        self.num_interop_threads = num_interop_threads or 0
+        self._create_session(num_threads)
+
+    def get_thread_info(self):
+        """Active thread configuration, reported by /model_info (0 = ONNX Runtime default)"""
+        return {
+            'intra_op_threads': self.num_threads,
+            'inter_op_threads': self.num_interop_threads
+        }
+
+    def share_weights(self):
+        """Weights live inside the ORT session; nothing to move into shared memory"""
+        return 0
+
+    def enable_embeddings(self, dim=128):
+        """The ONNX export only outputs logits, so embeddings are unavailable"""
+        logger.warning("Embeddings need the eager backend, not available with 'onnx'")
+        return False
+
+    def get_cascade_stats(self):
+        """No cascade with ONNX Runtime"""
+        return None
+
+    def cache_key(self, image_bytes):
+        """Result cache key for the raw bytes of an uploaded image"""
+        return PredictionCache.make_key(image_bytes, self.model_version)
+
+    def preprocess_image(self, image):
+        """Resize, scale to [0, 1] and normalize into a (1, 3, H, W) float32 array"""
+        try:
+            if self.reduced_decode:
+                image = reduce_for_model(image, self.input_size)
+
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+
+            # Same filter torchvision's Resize uses for PIL images
+            image = image.resize(self.input_size, Image.BILINEAR)
+            pixels = np.asarray(image, dtype=np.float32).transpose(2, 0, 1) / 255.0
+            return ((pixels - self.mean) / self.std)[np.newaxis]
+        except Exception as e:
+            logger.error(f"Error preprocessing image: {e}")
+            raise
+
+    def predict(self, image):
+        """Predict if disaster image is real or fake"""
+        try:
+            image_tensor = self.preprocess_image(image)
+        except Exception as e:
+            logger.error(f"Error during prediction: {e}")
+            return self._error_result(e)
+
+        return self.predict_preprocessed([image_tensor])[0]
+
+    def predict_preprocessed(self, image_tensors):
+        """Run one forward pass over a list of preprocessed (1, C, H, W) arrays"""
+        try:
+            batch = np.ascontiguousarray(np.concatenate(image_tensors, axis=0), dtype=np.float32)
+
+            start_time = time.time()
+            logits = self.session.run([self.output_name], {self.input_name: batch})[0]
+            prediction_time = time.time() - start_time
+
+            exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probabilities = exp / exp.sum(axis=1, keepdims=True)
+            predicted_indices = probabilities.argmax(axis=1)
+
+            results = []
+            for confidence_scores, predicted_class_idx in zip(probabilities, predicted_indices):
+                predicted_class = self.classes[predicted_class_idx]
+                results.append({
+                    'prediction': predicted_class,
+                    'confidence': float(confidence_scores[predicted_class_idx]),
+                    'probabilities': {
+                        'fake': float(confidence_scores[0]),
+                        'real': float(confidence_scores[1])
+                    },
+                    'prediction_time': prediction_time,
+                    'decided_by': 'full_model',
+                    'model_version': self.model_version,
+                    'status': 'success'
+                })
+            return results
+
+        except Exception as e:
+            logger.error(f"Error during prediction: {e}")
+            return [self._error_result(e) for _ in image_tensors]
+
+    def warmup(self, batch_sizes=(1,), iterations=3):
+        """Run dummy forward passes at the serving batch sizes; returns seconds per pass"""
+        timings = {}
+        for batch_size in batch_sizes:
+            dummy = [np.zeros((1, 3, *self.input_size[::-1]), dtype=np.float32)] * batch_size
+            start_time = time.perf_counter()
+            for _ in range(iterations):
+                self.predict_preprocessed(dummy)
+            timings[str(batch_size)] = (time.perf_counter() - start_time) / max(iterations, 1)
+            logger.info(f"Warm-up batch size {batch_size}: {timings[str(batch_size)] * 1000:.1f} ms/pass")
+        return timings
+
+    def _error_result(self, error):
+        return {
+            'prediction': None,
+            'confidence': None,
+            'error': str(error),
+            'status': 'error'
+        }
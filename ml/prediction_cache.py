@@ -0,0 +1,194 @@
+"""
+DisasterLink ML API - Prediction Result Cache
+Bounded LRU + TTL cache keyed on image content, with single-flight inference
+"""
+
+import copy
+import hashlib
+import json
+import threading
+import time
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from serving_metrics import stage
+
+logger = logging.getLogger(__name__)
+
+class CoalescedComputationFailed(Exception):
+    """The request computing a shared result failed; requests waiting on it compute their own"""
+
+class PredictionCache:
+    """
+    In-process cache of prediction results.
+    Entries are evicted least-recently-used once max_entries or max_memory_mb
+    is exceeded, and expire ttl_seconds after they were stored. Concurrent
+    lookups for the same key share a single computation.
+    """
+
+    def __init__(self, max_entries=10000, max_memory_mb=64, ttl_seconds=3600):
+        self.max_entries = max(1, int(max_entries))
+        self.max_memory_bytes = int(float(max_memory_mb) * 1024 * 1024)
+        self.ttl_seconds = float(ttl_seconds)
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, size_bytes, result)
+        self._in_flight = {}  # key -> Future
+        self._memory_bytes = 0
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'evictions': 0,
+            'expirations': 0
+        }
+
+    @staticmethod
+    def make_key(image_bytes, model_version):
+        """Cache key: SHA-256 of the raw image bytes plus the model version"""
+        with stage('cache_key'):
+            digest = hashlib.sha256(image_bytes).hexdigest()
+        return f"{model_version}:{digest}"
+
+    def get(self, key):
+        """Return a copy of the cached result or None"""
+        with self._lock:
+            result = self._lookup(key)
+            if result is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['hits'] += 1
+            return copy.deepcopy(result)
+
+    def put(self, key, result):
+        """Store a successful prediction result"""
+        if result.get('status') != 'success':
+            return
+
+        stored = copy.deepcopy({k: v for k, v in result.items() if k not in ('batching', 'cache')})
+        size_bytes = len(key) + len(json.dumps(stored, default=str))
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, size_bytes, stored)
+            self._memory_bytes += size_bytes
+            self._evict()
+
+    def get_or_compute(self, key, compute_fn):
+        """
+        Return (result, cache_status) where cache_status is 'hit', 'miss' or
+        'coalesced'. Only the first caller for a key runs compute_fn; identical
+        requests arriving meanwhile wait for its result. Only successful
+        results are shared: an error or expired deadline belongs to the
+        request that hit it, so its waiters then compute their own.
+        """
+        while True:
+            status, value = self.claim(key)
+            if status == 'hit':
+                return value, 'hit'
+            if status == 'coalesced':
+                try:
+                    return copy.deepcopy(value.result()), 'coalesced'
+                except Exception:
+                    continue
+
+            try:
+                result = compute_fn()
+            except Exception as e:
+                self.complete(key, value, error=e)
+                raise
+            self.complete(key, value, result)
+            return result, 'miss'
+
+    def claim(self, key):
+        """
+        The lookup half of get_or_compute, for callers that compute elsewhere
+        (the async routes, batch requests). Returns ('hit', copy of the result),
+        ('coalesced', Future of another caller's result) or ('miss', Future the
+        caller now owns and must settle with complete()).
+        """
+        with self._lock:
+            result = self._lookup(key)
+            if result is not None:
+                self._counters['hits'] += 1
+                return 'hit', copy.deepcopy(result)
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._counters['coalesced'] += 1
+                return 'coalesced', future
+
+            self._counters['misses'] += 1
+            future = Future()
+            self._in_flight[key] = future
+            return 'miss', future
+
+    def complete(self, key, future, result=None, error=None):
+        """
+        Settle a claimed computation. A successful result is cached and waiters
+        get their own copy (the caller goes on to add per-request fields to
+        result); an error or unsuccessful result fails the Future, so waiters
+        compute their own.
+        """
+        if error is None:
+            self.put(key, result)
+            if result.get('status') != 'success':
+                error = CoalescedComputationFailed(result.get('error'))
+        # Unregister before waking waiters, so a retrying waiter never finds the finished future
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(copy.deepcopy(result))
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+
+    def get_stats(self):
+        """Hit/miss/eviction counters for /health"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update({
+                'entries': len(self._entries),
+                'memory_bytes': self._memory_bytes,
+                'max_entries': self.max_entries,
+                'max_memory_bytes': self.max_memory_bytes,
+                'ttl_seconds': self.ttl_seconds
+            })
+
+        lookups = stats['hits'] + stats['misses'] + stats['coalesced']
+        stats['hit_rate'] = (stats['hits'] + stats['coalesced']) / lookups if lookups else 0.0
+        return stats
+
+    def _lookup(self, key):
+        """Find a live entry and mark it recently used (lock must be held)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, _, result = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self._counters['expirations'] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return result
+
+    def _remove(self, key):
+        _, size_bytes, _ = self._entries.pop(key)
+        self._memory_bytes -= size_bytes
+
+    def _evict(self):
+        """Evict least-recently-used entries until within limits (lock must be held)"""
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or self._memory_bytes > self.max_memory_bytes):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self._counters['evictions'] += 1
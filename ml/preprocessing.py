@@ -0,0 +1,81 @@
+"""
+DisasterLink ML - Fused Input Preprocessing
+Request threads only resize images to uint8. When a batch runs, each image is
+cast to float and normalized in place, straight inside a pooled channels-last
+batch buffer, so no per-request float tensors are allocated.
+"""
+
+import threading
+
+import numpy as np
+import torch
+from PIL import Image
+
+from image_ingestion import MODEL_INPUT_SIZE
+
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+def resize_to_uint8(image, size=MODEL_INPUT_SIZE):
+    """RGB (H, W, 3) uint8 array resized like transforms.Resize (bilinear, antialiased)"""
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    # np.array rather than np.asarray: torch.from_numpy needs a writable array
+    return np.array(image.resize(size, Image.BILINEAR))
+
+class InputBufferPool:
+    """
+    Reusable (N, 3, H, W) float32 batch buffers in channels-last memory format.
+    acquire(n) hands out a free buffer holding at least n images (capacities
+    are powers of two) and release() returns it; up to max_free buffers per
+    capacity are kept.
+    """
+
+    def __init__(self, size=MODEL_INPUT_SIZE, mean=IMAGENET_MEAN, std=IMAGENET_STD, max_free=2):
+        self.width, self.height = size
+        std = np.asarray(std, dtype=np.float32)
+        # (x / 255 - mean) / std == x * scale + bias, one multiply-add per value
+        self.scale = torch.from_numpy(1.0 / (255.0 * std))
+        self.bias = torch.from_numpy(-np.asarray(mean, dtype=np.float32) / std)
+        self.max_free = max_free
+        self._free = {}
+        self._lock = threading.Lock()
+        self.allocated = 0
+
+    def acquire(self, count):
+        capacity = 1 << max(0, int(count) - 1).bit_length()
+        with self._lock:
+            free = self._free.get(capacity)
+            if free:
+                return free.pop()
+            self.allocated += 1
+        # NHWC storage seen as NCHW: the strides of torch.channels_last
+        return torch.empty(capacity, self.height, self.width, 3).permute(0, 3, 1, 2)
+
+    def release(self, buffer):
+        with self._lock:
+            free = self._free.setdefault(buffer.shape[0], [])
+            if len(free) < self.max_free:
+                free.append(buffer)
+
+    def fill(self, buffer, index, image):
+        """
+        Write one image into slot index: a uint8 (H, W, 3) array from
+        resize_to_uint8 is cast and normalized in place; a float (1, 3, H, W)
+        tensor (tuning inputs, older callers) is copied as is.
+        """
+        slot = buffer[index]
+        if isinstance(image, np.ndarray):
+            # copy_ casts inside the kernel; addcmul with uint8 inputs would allocate a float temporary
+            pixels = slot.permute(1, 2, 0)
+            pixels.copy_(torch.from_numpy(image))
+            torch.addcmul(self.bias, pixels, self.scale, out=pixels)
+        else:
+            slot.copy_(image.reshape(slot.shape))
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'allocated': self.allocated,
+                'free': {str(capacity): len(buffers) for capacity, buffers in sorted(self._free.items())}
+            }
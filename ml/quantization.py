@@ -0,0 +1,99 @@
+"""
+DisasterLink ML - INT8 Post-Training Quantization
+Static (FX graph mode) quantization calibrated on training images, with
+dynamic quantization of the fully connected head as a fallback. Quantized
+models are saved as TorchScript with their metadata embedded, so serving
+only needs torch to load them.
+"""
+
+import copy
+import io
+import json
+import logging
+import time
+
+import torch
+import torch.nn as nn
+
+from image_ingestion import MODEL_INPUT_SIZE
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_MODES = ('static', 'dynamic')
+METADATA_FILE = 'metadata.json'
+
+def default_quantized_engine():
+    """Prefer the x86 (fbgemm + oneDNN) engine, then fbgemm, then whatever the build supports"""
+    supported = torch.backends.quantized.supported_engines
+    for engine in ('x86', 'fbgemm', 'qnnpack'):
+        if engine in supported:
+            return engine
+    return supported[0]
+
+def quantize_static(model, calibration_batches, engine=None):
+    """
+    Insert observers, run the calibration batches through the model to
+    collect activation ranges, then convert conv/linear layers to int8.
+    """
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+    engine = engine or default_quantized_engine()
+    torch.backends.quantized.engine = engine
+
+    model = copy.deepcopy(model).cpu().eval()
+    example = (torch.randn(1, 3, *MODEL_INPUT_SIZE),)
+    prepared = prepare_fx(model, get_default_qconfig_mapping(engine), example)
+
+    with torch.no_grad():
+        for batch in calibration_batches:
+            prepared(batch)
+    return convert_fx(prepared)
+
+def quantize_dynamic_head(model):
+    """Quantize only the Linear layers (weights int8, activations quantized on the fly)"""
+    model = copy.deepcopy(model).cpu().eval()
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+def to_torchscript(model):
+    """Trace a (quantized) model so it can be saved and loaded without its Python class"""
+    with torch.no_grad():
+        return torch.jit.freeze(torch.jit.trace(model.eval(), torch.randn(1, 3, *MODEL_INPUT_SIZE)))
+
+def serialized_size(model):
+    """Size in bytes of a model as it would be written to disk"""
+    buffer = io.BytesIO()
+    if isinstance(model, torch.jit.ScriptModule):
+        torch.jit.save(model, buffer)
+    else:
+        torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+def measure_latency(model, batch_size=1, iterations=30, warmup=5):
+    """Median CPU forward-pass latency in milliseconds"""
+    example = torch.randn(batch_size, 3, *MODEL_INPUT_SIZE)
+    timings = []
+    with torch.no_grad():
+        for i in range(warmup + iterations):
+            start = time.perf_counter()
+            model(example)
+            if i >= warmup:
+                timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+def save_quantized_model(scripted_model, path, metadata):
+    """Write the TorchScript model with its metadata (mode, engine, accuracy) embedded"""
+    torch.jit.save(scripted_model, str(path), _extra_files={METADATA_FILE: json.dumps(metadata)})
+
+def load_quantized_model(path):
+    """Load a quantized TorchScript model; returns (model, metadata)"""
+    extra_files = {METADATA_FILE: ''}
+    model = torch.jit.load(str(path), map_location='cpu', _extra_files=extra_files)
+    metadata = json.loads(extra_files[METADATA_FILE] or '{}')
+
+    engine = metadata.get('engine')
+    if engine and engine in torch.backends.quantized.supported_engines:
+        torch.backends.quantized.engine = engine
+    model.eval()
+    return model, metadata
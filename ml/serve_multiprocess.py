@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+DisasterLink Web API - Pre-fork multi-process server
+Loads the ResNet50 weights once in a parent process, moves them into shared
+memory and forks worker processes that all serve disaster_api.app from one
+listening socket. Workers map the parent's weight pages instead of each
+loading their own copy, and each pins its torch intra-op threads so the
+workers together do not oversubscribe the CPU cores. Linux/macOS only (fork).
+
+Run with:  py serve_multiprocess.py --workers 4
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+# Workers receive the parent's model; importing the API must not start its own loader
+os.environ['DISASTER_API_EXTERNAL_MODEL_LOAD'] = '1'
+
+import disaster_api as api
+from werkzeug.serving import make_server
+
+logger = logging.getLogger(__name__)
+
+def available_cores():
+    """Cores this process may run on (respects container CPU affinity)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def default_threads_per_worker(workers):
+    """Split the cores evenly between workers"""
+    return max(1, available_cores() // max(1, workers))
+
+def read_process_memory(pid):
+    """
+    RSS, PSS and private (USS) memory of a process in bytes.
+    RSS counts shared weight pages in every worker; PSS splits them between
+    the processes mapping them, so summing PSS gives the real total.
+    """
+    fields = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == 'kB':
+                    fields[parts[0].rstrip(':')] = int(parts[1]) * 1024
+    except OSError:
+        return None
+
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'uss': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+        'shared': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0)
+    }
+
+class PreforkServer:
+    """Parent process: owns the model, the listening socket and the worker processes"""
+
+    def __init__(self, host='0.0.0.0', port=5000, threads_per_worker=None, backlog=2048):
+        self.host = host
+        self.port = port
+        self.threads_per_worker = threads_per_worker
+        self.backlog = backlog
+        self.classifier = None
+        self.shared_bytes = 0
+        self.socket = None
+        self.workers = {}  # pid -> worker index
+        self.worker_count = 0
+        self.stopping = False
+
+    def load_model(self, cache_config=None):
+        """Load the checkpoint once and move its tensors into shared memory"""
+        load_start = time.time()
+        self.classifier = api.create_classifier(cache_config)
+
+        # Keep the parent single-threaded so no OpenMP pool exists when workers are forked
+        self.classifier.set_num_threads(1)
+        self.shared_bytes = self.classifier.share_weights()
+        logger.info(f"Model loaded in {time.time() - load_start:.2f}s, "
+                    f"{self.shared_bytes / 1024 / 1024:.1f} MB of weights in shared memory")
+
+    def bind(self):
+        """Create the listening socket every worker accepts from"""
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((self.host, self.port))
+        self.socket.listen(self.backlog)
+        self.socket.set_inheritable(True)
+        self.port = self.socket.getsockname()[1]
+
+    def start(self, workers):
+        """Fork the workers and wait until each one has warmed up"""
+        if self.classifier is None:
+            self.load_model()
+        if self.socket is None:
+            self.bind()
+
+        # Objects allocated so far are never collected, so the GC won't dirty their pages in workers
+        gc.collect()
+        gc.freeze()
+
+        self.worker_count = workers
+        num_threads = self.threads_per_worker or default_threads_per_worker(workers)
+        pending = [self._spawn(index, num_threads) for index in range(workers)]
+        for pid, ready_fd in pending:
+            self._wait_ready(pid, ready_fd, num_threads)
+
+    def _spawn(self, index, num_threads):
+        """Fork one worker; returns its pid and the pipe it reports readiness on"""
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            self._worker_main(write_fd, num_threads, index)
+            os._exit(0)
+
+        os.close(write_fd)
+        self.workers[pid] = index
+        return pid, read_fd
+
+    def _wait_ready(self, pid, ready_fd, num_threads):
+        """Block until a worker has warmed up and is accepting connections"""
+        with os.fdopen(ready_fd, 'rb') as ready:
+            status = ready.read()
+        index = self.workers[pid]
+        if status != b'ready':
+            raise RuntimeError(f"Worker {index} failed to start: {status.decode(errors='replace')}")
+        logger.info(f"Worker {index} (pid {pid}) ready with {num_threads} intra-op threads")
+
+    def _worker_main(self, ready_fd, num_threads, index):
+        """Runs in the forked child: pin threads, warm up, then serve until terminated"""
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # the parent handles Ctrl+C for everyone
+
+        try:
+            api.activate_classifier(self.classifier, num_threads=num_threads, workers=self.worker_count,
+                                    worker_index=index)
+            if api.model_status['state'] != 'ready':
+                raise RuntimeError(api.model_status['error'])
+
+            server = make_server(self.host, self.port, api.app, threaded=True, fd=self.socket.fileno())
+        except Exception as e:
+            os.write(ready_fd, f'error: {e}'.encode())
+            os.close(ready_fd)
+            os._exit(1)
+
+        os.write(ready_fd, b'ready')
+        os.close(ready_fd)
+        server.serve_forever()
+
+    def supervise(self):
+        """Block until stopped, replacing workers that exit unexpectedly"""
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            index = self.workers.pop(pid, None)
+            if index is None or self.stopping:
+                continue
+            logger.warning(f"Worker {index} (pid {pid}) exited with status {status}, restarting")
+            num_threads = self.threads_per_worker or default_threads_per_worker(self.worker_count)
+            self._wait_ready(*self._spawn(index, num_threads), num_threads)
+
+    def stop(self):
+        """Terminate every worker and wait for them to exit"""
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in list(self.workers):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self.workers.clear()
+        self.stopping = False
+        gc.unfreeze()
+
+    def close(self):
+        self.stop()
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+    def memory_report(self):
+        """Per-process memory of the parent and every worker"""
+        report = {'parent': read_process_memory(os.getpid()), 'workers': {}}
+        for pid, index in sorted(self.workers.items(), key=lambda item: item[1]):
+            report['workers'][index] = dict(read_process_memory(pid) or {}, pid=pid)
+        return report
+
+def print_memory_report(report, shared_bytes):
+    mb = 1024 * 1024
+    print(f"\n🧠 Shared model weights: {shared_bytes / mb:.1f} MB")
+    print(f"{'Worker':<8}{'PID':>8}{'RSS':>11}{'PSS':>11}{'Private':>11}")
+    for index, memory in report['workers'].items():
+        print(f"{index:<8}{memory['pid']:>8}{memory.get('rss', 0) / mb:>9.1f}MB"
+              f"{memory.get('pss', 0) / mb:>9.1f}MB{memory.get('uss', 0) / mb:>9.1f}MB")
+    total_pss = sum(memory.get('pss', 0) for memory in report['workers'].values())
+    if report['parent']:
+        total_pss += report['parent']['pss']
+    print(f"Total (PSS, parent + workers): {total_pss / mb:.1f} MB")
+
+def main():
+    # Topology from tune_threads.py, then the serving config, then one worker per core
+    workers_default = api.thread_config.get('workers', api.serving_config.get('multiprocess_workers', available_cores()))
+    parser = argparse.ArgumentParser(description='Serve the DisasterLink API from pre-forked worker processes')
+    parser.add_argument('--workers', type=int, default=workers_default)
+    parser.add_argument('--threads-per-worker', type=int,
+                        default=api.thread_config.get('intra_op_threads', api.serving_config.get('threads_per_worker')),
+                        help='torch intra-op threads per worker (default: cores / workers)')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+
+    if not hasattr(os, 'fork'):
+        sys.exit("serve_multiprocess.py needs fork(); use disaster_api.py on this platform")
+
+    print("Starting DisasterLink ML API (pre-fork mode)...")
+    server = PreforkServer(args.host, args.port, threads_per_worker=args.threads_per_worker)
+    server.load_model()
+    server.bind()
+
+    def handle_signal(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    try:
+        server.start(args.workers)
+        print(f"✅ {args.workers} workers listening on http://{args.host}:{server.port}")
+        print_memory_report(server.memory_report(), server.shared_bytes)
+        server.supervise()
+    except KeyboardInterrupt:
+        print("\nStopping workers...")
+    finally:
+        server.close()
+
+if __name__ == '__main__':
+    main()
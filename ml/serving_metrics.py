@@ -0,0 +1,204 @@
+"""
+DisasterLink ML API - Serving Metrics
+Counters, gauges and latency histograms rendered in the Prometheus text
+exposition format for /metrics. No client library needed: an observation is
+a bisect plus two additions under a per-metric lock, cheap enough to leave on.
+Each process keeps its own values (pre-fork workers are scraped individually).
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds, from a sub-millisecond header parse up to a slow forward pass under load
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class Metric:
+    """One metric family; label values are passed as keyword arguments"""
+    type_name = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def render(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}'] + self._samples()
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{self._labels(key)} {_format_value(value)}' for key, value in items]
+
+class Counter(Metric):
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    """Set directly, or computed at scrape time by a callback (e.g. a queue size)"""
+    type_name = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def _samples(self):
+        if self.callback is None:
+            return super()._samples()
+        try:
+            value = self.callback()
+        except Exception:
+            return []
+        return [f'{self.name} {_format_value(value)}']
+
+class Histogram(Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of a with-block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{self._labels(key, [("le", _format_value(bound))])} {cumulative}')
+            lines.append(f'{self.name}_sum{self._labels(key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{self._labels(key)} {cumulative}')
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """All metrics in Prometheus text format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
+
+REQUESTS = registry.register(Counter(
+    'disaster_api_requests_total', 'HTTP requests by endpoint and status code', ('endpoint', 'status')
+))
+REQUEST_ERRORS = registry.register(Counter(
+    'disaster_api_request_errors_total', 'HTTP requests answered with a 4xx or 5xx status', ('endpoint', 'status_class')
+))
+REQUEST_LATENCY = registry.register(Histogram(
+    'disaster_api_request_duration_seconds', 'End-to-end request latency by endpoint', ('endpoint',)
+))
+STAGE_LATENCY = registry.register(Histogram(
+    'disaster_api_stage_duration_seconds', 'Latency of each request processing stage', ('stage',)
+))
+IN_FLIGHT = registry.register(Gauge(
+    'disaster_api_requests_in_flight', 'Requests currently being handled'
+))
+REQUESTS_SHED = registry.register(Counter(
+    'disaster_api_requests_shed_total', 'Requests refused with 503 because the admission limit was reached', ('endpoint',)
+))
+REQUESTS_EXPIRED = registry.register(Counter(
+    'disaster_api_requests_expired_total', 'Requests dropped because their deadline passed, by the stage they were dropped at', ('stage',)
+))
+NEAR_DUPLICATE_HITS = registry.register(Counter(
+    'disaster_api_near_duplicate_hits_total', 'Predictions answered from the near-duplicate index without running the model'
+))
+CASCADE_DECISIONS = registry.register(Counter(
+    'disaster_api_cascade_decisions_total', 'Images decided by the cascade screener or escalated to the full model', ('stage',)
+))
+JOBS = registry.register(Counter(
+    'disaster_api_jobs_total', 'Asynchronous jobs submitted and finished', ('state',)
+))
+MODEL_RELOADS = registry.register(Counter(
+    'disaster_api_model_reloads_total', 'Hot model reloads by outcome', ('result',)
+))
+BATCH_SIZE = registry.register(Histogram(
+    'disaster_api_batch_size', 'Images per model forward pass', buckets=BATCH_SIZE_BUCKETS
+))
+
+def stage(name):
+    """Context manager timing one request stage"""
+    return STAGE_LATENCY.time(stage=name)
+
+def observe_stage(name, seconds):
+    STAGE_LATENCY.observe(seconds, stage=name)
+
+def record_request(endpoint, status, seconds):
+    REQUESTS.inc(endpoint=endpoint, status=status)
+    REQUEST_LATENCY.observe(seconds, endpoint=endpoint)
+    if status >= 400:
+        REQUEST_ERRORS.inc(endpoint=endpoint, status_class=f'{status // 100}xx')
+
+def register_gauge(name, documentation, callback):
+    """Gauge whose value is read from callback() at scrape time"""
+    return registry.register(Gauge(name, documentation, callback=callback))
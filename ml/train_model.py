@@ -11,7 +11,8 @@ from pathlib import Path
 # Add current directory to path
 sys.path.append(str(Path(__file__).parent))
 
-from disaster_model_trainer import DisasterModelTrainer
+from disaster_model_trainer import DisasterModelTrainer, training_run_version
+from datetime import datetime
 import json
 
 def main():
@@ -50,6 +51,7 @@ def main():
     print("✅ Dataset files found and ready")
     
     # Start training
+    model_version = training_run_version()
     try:
         # Load datasets first
         print("📂 Loading datasets...")
@@ -68,7 +70,20 @@ def main():
         
         # Save for web deployment
         print("💾 Saving model for deployment...")
-        trainer.save_web_model('disaster_authenticity_model.pth')
+        trainer.save_web_model('disaster_authenticity_model.pth', model_version=model_version)
+        trainer.export_onnx_model('disaster_authenticity_model.onnx', model_version=model_version)
+        
+        # INT8 variant for CPU serving, only published if accuracy holds up
+        quantization_config = config.get('quantization', {})
+        if quantization_config.get('enabled', False):
+            print("🔢 Quantizing model for CPU serving...")
+            trainer.export_quantized_model(
+                output_path=quantization_config.get('output_path', 'disaster_authenticity_model_int8.pt'),
+                mode=quantization_config.get('mode', 'static'),
+                calibration_samples=quantization_config.get('calibration_samples', 512),
+                max_accuracy_drop=quantization_config.get('max_accuracy_drop', 1.0),
+                model_version=model_version
+            )
         
         print("🎉 Training completed successfully!")
         print(f"🏆 Best validation accuracy: {history['best_val_acc']:.2f}%")
@@ -81,16 +96,18 @@ def main():
         model_info = {
             "model_loaded": True,
             "model_path": "disaster_authenticity_model.pth",
+            "model_version": model_version,
             "accuracy": f"Test accuracy: {test_acc:.2f}%",
             "best_val_accuracy": f"{history['best_val_acc']:.2f}%",
-            "training_date": "July 22, 2025"
+            "training_date": datetime.now().strftime('%B %d, %Y')
         }
         
+        # A running API watches this file and hot-reloads the new model
         with open('model_status.json', 'w') as f:
             json.dump(model_info, f, indent=2)
         
         print("✅ Model training pipeline completed!")
-        print("🚀 You can now restart the API to load the trained model")
+        print(f"🚀 Running APIs will hot-reload model version {model_version}")
         
     except Exception as e:
         print(f"❌ Training failed: {e}")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+DisasterLink ML - Thread Topology Tuner
+Benchmarks combinations of worker processes, intra-op threads per worker and
+inference batch size on this host, then writes the configuration with the
+best throughput whose p99 latency meets the SLO to thread_config.json.
+disaster_api.py and serve_multiprocess.py apply it at startup.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+# The tuner loads the model itself, like the pre-fork server
+os.environ['DISASTER_API_EXTERNAL_MODEL_LOAD'] = '1'
+
+import numpy as np
+from PIL import Image
+
+import disaster_api as api
+from serve_multiprocess import available_cores
+
+def powers_of_two(limit):
+    values = []
+    value = 1
+    while value <= limit:
+        values.append(value)
+        value *= 2
+    if values[-1] != limit:
+        values.append(limit)
+    return values
+
+def candidate_topologies(cores, workers_options, threads_options, allow_oversubscription):
+    """(workers, intra-op threads) pairs, by default only those that fit in the available cores"""
+    for workers in workers_options:
+        for threads in threads_options:
+            if allow_oversubscription or workers * threads <= cores:
+                yield workers, threads
+
+def _worker(classifier, num_threads, batch_size, duration, start_barrier, results):
+    """Forked benchmark worker: closed-loop forward passes at one batch size"""
+    classifier.set_num_threads(num_threads, 1)
+    sample = classifier.preprocess_image(Image.new('RGB', (640, 480), color=(128, 96, 64)))
+    batch = [sample] * batch_size
+    for _ in range(2):
+        classifier.predict_preprocessed(batch)
+
+    start_barrier.wait()
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        classifier.predict_preprocessed(batch)
+        latencies.append(time.perf_counter() - start)
+    results.put(latencies)
+
+def benchmark(classifier, workers, num_threads, batch_size, duration, batch_wait_ms):
+    """
+    Run one topology. Request latency is estimated as the forward-pass time of
+    a full batch plus the micro-batcher's maximum wait for the batch to fill.
+    """
+    context = multiprocessing.get_context('fork')
+    start_barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=_worker,
+                                 args=(classifier, num_threads, batch_size, duration, start_barrier, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    per_worker = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    latencies_ms = np.concatenate([np.array(latencies) for latencies in per_worker]) * 1000
+    throughput = sum(len(latencies) * batch_size / sum(latencies) for latencies in per_worker if latencies)
+    return {
+        'workers': workers,
+        'intra_op_threads': num_threads,
+        'max_batch_size': batch_size,
+        'throughput': throughput,
+        'latency_ms_p50': float(np.percentile(latencies_ms, 50)) + batch_wait_ms,
+        'latency_ms_p99': float(np.percentile(latencies_ms, 99)) + batch_wait_ms
+    }
+
+def main():
+    cores = available_cores()
+    parser = argparse.ArgumentParser(description='Tune worker/thread/batch topology for CPU inference')
+    parser.add_argument('--slo-ms', type=float, default=api.serving_config.get('latency_slo_ms', 500),
+                        help='p99 latency objective in milliseconds')
+    parser.add_argument('--workers', type=int, nargs='+', default=powers_of_two(cores))
+    parser.add_argument('--threads', type=int, nargs='+', default=powers_of_two(cores))
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per configuration')
+    parser.add_argument('--allow-oversubscription', action='store_true',
+                        help='Also try workers x threads > available cores')
+    parser.add_argument('--output', default=str(Path(__file__).parent / api.serving_config.get('thread_config_path', 'thread_config.json')))
+    parser.add_argument('--report', default='thread_tuning_report.json')
+    args = parser.parse_args()
+
+    print(f"🧵 DisasterLink thread topology tuner ({cores} cores, p99 SLO {args.slo_ms:.0f}ms)")
+    classifier = api.create_classifier(cache_config={'enabled': False})
+    # Single-threaded parent so no OpenMP pool exists when workers are forked
+    classifier.set_num_threads(1)
+    batch_wait_ms = api.serving_config.get('max_batch_wait_ms', 10)
+
+    results = []
+    topologies = list(candidate_topologies(cores, args.workers, args.threads, args.allow_oversubscription))
+    print(f"{'Workers':<9}{'Threads':<9}{'Batch':<7}{'Img/s':>9}{'p50':>10}{'p99':>10}")
+    for workers, num_threads in topologies:
+        for batch_size in args.batch_sizes:
+            result = benchmark(classifier, workers, num_threads, batch_size, args.duration, batch_wait_ms)
+            result['meets_slo'] = result['latency_ms_p99'] <= args.slo_ms
+            results.append(result)
+            print(f"{workers:<9}{num_threads:<9}{batch_size:<7}{result['throughput']:>9.1f}"
+                  f"{result['latency_ms_p50']:>8.0f}ms{result['latency_ms_p99']:>8.0f}ms"
+                  f"{'' if result['meets_slo'] else '  (misses SLO)'}")
+
+    within_slo = [result for result in results if result['meets_slo']]
+    if within_slo:
+        best = max(within_slo, key=lambda result: result['throughput'])
+    else:
+        best = min(results, key=lambda result: result['latency_ms_p99'])
+        print(f"⚠️  No configuration meets the {args.slo_ms:.0f}ms SLO, choosing the lowest p99 instead")
+
+    thread_config = {
+        'workers': best['workers'],
+        'intra_op_threads': best['intra_op_threads'],
+        'inter_op_threads': 1,
+        'max_batch_size': best['max_batch_size'],
+        'slo_ms': args.slo_ms,
+        'meets_slo': best['meets_slo'],
+        'expected_throughput': best['throughput'],
+        'expected_latency_ms_p99': best['latency_ms_p99'],
+        'backend': classifier.backend,
+        'cores': cores,
+        'tuned_at': datetime.now().isoformat()
+    }
+    with open(args.output, 'w') as f:
+        json.dump(thread_config, f, indent=2)
+    with open(args.report, 'w') as f:
+        json.dump({'selected': thread_config, 'results': results}, f, indent=2)
+
+    print(f"\n✅ Selected {best['workers']} worker(s) x {best['intra_op_threads']} thread(s), "
+          f"batch {best['max_batch_size']}: {best['throughput']:.1f} img/s, p99 {best['latency_ms_p99']:.0f}ms")
+    print(f"💾 Thread config saved to {args.output} (all results in {args.report})")
+
+if __name__ == '__main__':
+    main()